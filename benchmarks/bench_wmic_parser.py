@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WMIC / CIM 解析合并性能测试
+用合成的 10k 行 wmic CSV 与 PowerShell JSON 输出对比旧的逐行拆分 + 线性去重实现
+与 src/core/wmic_parser.py 的流式解析 + 索引去重实现，只需要文本数据，可在 Linux 上运行
+
+用法:
+    python benchmarks/bench_wmic_parser.py [行数]
+"""
+
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.wmic_parser import (  # noqa: E402
+    DeviceMerger, iter_wmic_csv, iter_cim_json, STORAGE_COLUMNS, PNP_COLUMNS
+)
+
+
+def make_disk_csv(rows: int) -> str:
+    lines = ['', 'Node,Caption,InterfaceType,Manufacturer,PNPDeviceID,SerialNumber']
+    for i in range(rows):
+        lines.append(f"HOST,Generic Flash Disk {i},USB,(Standard disk drives),"
+                     f"USBSTOR\\DISK&VEN_GENERIC&PROD_FLASH&REV_{i % 10000:04d}\\VID_{i % 65536:04X}&PID_{(i * 7) % 65536:04X}\\SN{i:08d},SN{i:08d}")
+    return '\r\r\n'.join(lines)
+
+
+def make_pnp_csv(rows: int) -> str:
+    lines = ['', 'Node,DeviceID,Manufacturer,Name']
+    for i in range(rows):
+        lines.append(f"HOST,USB\\VID_{(i * 3) % 65536:04X}&PID_{(i * 11) % 65536:04X}\\{i:08X},"
+                     f"Vendor {i % 50},USB Input Device {i}")
+    return '\r\r\n'.join(lines)
+
+
+def make_pnp_json(rows: int) -> str:
+    return json.dumps([
+        {'Name': f"USB Input Device {i}", 'Manufacturer': f"Vendor {i % 50}",
+         'DeviceID': f"USB\\VID_{(i * 3) % 65536:04X}&PID_{(i * 11) % 65536:04X}\\{i:08X}"}
+        for i in range(rows)
+    ])
+
+
+# --- 旧实现（与重构前的 USBScanner 相同的算法） ---
+
+def legacy_parse(output, required_cols):
+    results = []
+    lines = [line.strip() for line in output.strip().split('\n') if line.strip()]
+    if len(lines) < 2:
+        return results
+    header = [h.strip() for h in lines[0].split(',')]
+    col_indices = {col: (header.index(col) if col in header else -1) for col in required_cols}
+    for line in lines[1:]:
+        parts = line.split(',')
+        results.append({col: (parts[idx].strip() if idx != -1 and idx < len(parts) else '')
+                        for col, idx in col_indices.items()})
+    return results
+
+
+def legacy_vid_pid(device_id):
+    vid_match = re.search(r'VID_([0-9A-Fa-f]{4})', device_id, re.IGNORECASE)
+    pid_match = re.search(r'PID_([0-9A-Fa-f]{4})', device_id, re.IGNORECASE)
+    if vid_match and pid_match:
+        return f"{vid_match.group(1)}:{pid_match.group(1)}".upper()
+    return 'N/A'
+
+
+def legacy_merge(disk_csv, pnp_csv):
+    devices = []
+    for row in legacy_parse(disk_csv, STORAGE_COLUMNS):
+        devices.append({'vid_pid': legacy_vid_pid(row['PNPDeviceID']), 'name': row['Caption']})
+    for row in legacy_parse(pnp_csv, PNP_COLUMNS):
+        vid_pid = legacy_vid_pid(row['DeviceID'])
+        if any(d['vid_pid'] == vid_pid and d['vid_pid'] != 'N/A' for d in devices):
+            continue
+        devices.append({'vid_pid': vid_pid, 'name': row['Name']})
+    return devices
+
+
+def new_merge(disk_csv, pnp_csv):
+    merger = DeviceMerger()
+    merger.add_storage_rows(iter_wmic_csv(disk_csv, STORAGE_COLUMNS))
+    merger.add_pnp_rows(iter_wmic_csv(pnp_csv, PNP_COLUMNS))
+    return merger.devices
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    disk_csv = make_disk_csv(rows)
+    pnp_csv = make_pnp_csv(rows)
+    pnp_json = make_pnp_json(rows)
+
+    print(f"合成数据: {rows} 行磁盘 CSV + {rows} 行 PnP CSV / JSON")
+
+    new_time, new_devices = timed(new_merge, disk_csv, pnp_csv)
+    print(f"新实现 CSV 解析+合并: {new_time * 1000:8.1f} ms, {len(new_devices)} 个设备")
+
+    json_time, _ = timed(lambda: DeviceMerger().add_pnp_rows(iter_cim_json(pnp_json)))
+    print(f"新实现 JSON 解析+合并: {json_time * 1000:7.1f} ms")
+
+    # 旧实现是平方复杂度，行数很大时只跑一小部分再按比例估算
+    legacy_rows = min(rows, 2000)
+    legacy_time, legacy_devices = timed(legacy_merge, make_disk_csv(legacy_rows), make_pnp_csv(legacy_rows))
+    print(f"旧实现 CSV 解析+合并: {legacy_time * 1000:8.1f} ms ({legacy_rows} 行), "
+          f"{len(legacy_devices)} 个设备")
+    if legacy_rows < rows:
+        estimate = legacy_time * (rows / legacy_rows) ** 2
+        print(f"旧实现按平方复杂度估算 {rows} 行: {estimate * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
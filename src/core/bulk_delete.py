@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量删除
+一次删除多个文件和整个目录树：目录由线程池并行清空，空目录再按深度从深到浅删除。
+与 shutil.rmtree 的 fd 遍历相同，所有操作都相对于父目录的文件描述符进行:
+子目录用 O_NOFOLLOW 打开并核对扫描时记录的 (st_dev, st_ino)，文件用 unlink(name, dir_fd=...) 删除，
+目录在删除过程中被换成符号链接时不会跟随到树外。
+为避免同时打开过多描述符，每个目录只在处理时从所在的顶层目录逐级重新打开。
+平台不支持 dir_fd 时（Windows）退回按完整路径删除
+"""
+
+import errno
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 是否支持基于目录文件描述符的相对操作
+_HAS_DIR_FD = (os.unlink in os.supports_dir_fd and os.rmdir in os.supports_dir_fd
+               and os.open in os.supports_dir_fd and os.stat in os.supports_dir_fd
+               and os.scandir in os.supports_fd
+               and hasattr(os, 'O_DIRECTORY') and hasattr(os, 'O_NOFOLLOW'))
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+# 目录在树中的位置: (顶层路径所在的目录, 从该目录起的各级名称)
+_Location = Tuple[str, Tuple[str, ...]]
+# 目录的身份 (st_dev, st_ino)
+_Identity = Tuple[int, int]
+
+
+class DeleteStats:
+    """批量删除的统计"""
+
+    def __init__(self):
+        self.files_deleted = 0
+        self.dirs_deleted = 0
+        self.errors: List[Tuple[str, str]] = []   # (路径, 错误信息)
+        self.cancelled = False
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.cancelled
+
+    def __repr__(self) -> str:
+        return (f"DeleteStats(files={self.files_deleted}, dirs={self.dirs_deleted}, "
+                f"errors={len(self.errors)}, cancelled={self.cancelled}, {self.elapsed:.2f}s)")
+
+
+class BulkDeleter:
+    """批量 / 递归删除"""
+
+    def __init__(self, max_workers: int = 4):
+        """
+        Args:
+            max_workers: 并行清空目录的线程数（U 盘上过多线程只会增加争用）
+        """
+        self.max_workers = max_workers
+
+    def delete(self, paths: List[str], cancel_event: Optional[threading.Event] = None,
+               progress: Optional[Callable[[DeleteStats], None]] = None,
+               progress_interval: float = 0.1) -> DeleteStats:
+        """
+        删除一组文件或目录（目录连同其中全部内容）
+
+        不跟随符号链接：指向目录的链接只删除链接本身
+
+        Args:
+            paths: 要删除的路径
+            cancel_event: 被设置后停止删除（已删除的内容无法恢复）
+            progress: 进度回调（在调用线程中执行）
+            progress_interval: 回调的最小间隔（秒）
+
+        Returns:
+            DeleteStats
+        """
+        start = time.perf_counter()
+        stats = DeleteStats()
+        lock = threading.Lock()
+        outstanding = [0]
+        done = threading.Event()
+        # 顶层路径所在目录的描述符，整个删除过程中保持打开
+        base_fds: Dict[str, Optional[int]] = {}
+        # 待删除的目录 (深度, 位置, 父目录身份)
+        directories: List[Tuple[int, _Location, Optional[_Identity]]] = []
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+
+        def submit(location: _Location, identity: Optional[_Identity], parent_identity: Optional[_Identity],
+                   depth: int) -> None:
+            with lock:
+                outstanding[0] += 1
+                directories.append((depth, location, parent_identity))
+            pool.submit(clear, location, identity, depth)
+
+        def clear(location: _Location, identity: Optional[_Identity], depth: int) -> None:
+            try:
+                if not cancelled():
+                    for name, child in self._clear_files(base_fds[location[0]], location, identity,
+                                                         stats, lock, cancel_event):
+                        submit((location[0], location[1] + (name,)), child, identity, depth + 1)
+            finally:
+                with lock:
+                    outstanding[0] -= 1
+                    if outstanding[0] == 0:
+                        done.set()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                # 顶层路径：文件和链接直接删除，目录交给线程池清空
+                with lock:
+                    outstanding[0] += 1
+                for path in paths:
+                    path = os.path.abspath(path)
+                    base, name = os.path.split(path)
+                    try:
+                        if base not in base_fds:
+                            base_fds[base] = os.open(base, os.O_RDONLY | os.O_DIRECTORY) if _HAS_DIR_FD else None
+                        base_fd = base_fds[base]
+                        st = os.stat(name if base_fd is not None else path, dir_fd=base_fd, follow_symlinks=False)
+                        if stat.S_ISDIR(st.st_mode):
+                            submit((base, (name,)), (st.st_dev, st.st_ino), None, 0)
+                        else:
+                            self._unlink(name if base_fd is not None else path, base_fd, path)
+                            with lock:
+                                stats.files_deleted += 1
+                    except OSError as e:
+                        with lock:
+                            stats.errors.append((path, str(e)))
+                with lock:
+                    outstanding[0] -= 1
+                    if outstanding[0] == 0:
+                        done.set()
+
+                while not done.wait(progress_interval):
+                    if progress is not None:
+                        progress(stats)
+                if progress is not None:
+                    progress(stats)
+
+                # 目录已清空，从最深的一层开始删除；同一层内按父目录并行
+                if not cancelled():
+                    self._remove_directories(pool, base_fds, directories, stats, lock)
+        finally:
+            for base_fd in base_fds.values():
+                if base_fd is not None:
+                    os.close(base_fd)
+
+        stats.cancelled = cancelled()
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    @staticmethod
+    def _open_dir(base_fd: int, names: Tuple[str, ...], identity: Optional[_Identity]) -> int:
+        """
+        从 base_fd 逐级打开目录，每一级都不跟随符号链接
+
+        最终打开的目录与扫描时记录的身份不一致（被替换成了别的目录）时抛出 OSError
+        """
+        fd = base_fd
+        opened = []
+        try:
+            for name in names:
+                fd = os.open(name, _DIR_FLAGS, dir_fd=fd)
+                opened.append(fd)
+            st = os.fstat(fd)
+            if identity is not None and (st.st_dev, st.st_ino) != identity:
+                raise OSError(errno.ESTALE, "目录在删除过程中被替换")
+            return opened.pop()
+        finally:
+            for fd in opened:
+                os.close(fd)
+
+    def _clear_files(self, base_fd: Optional[int], location: _Location, identity: Optional[_Identity],
+                     stats: DeleteStats, lock: threading.Lock,
+                     cancel_event: Optional[threading.Event]) -> List[Tuple[str, Optional[_Identity]]]:
+        """删除目录中的文件和链接，返回子目录 (名称, 身份)"""
+        directory = os.path.join(location[0], *location[1])
+        subdirs = []
+        deleted = 0
+        dir_fd = None
+        try:
+            if base_fd is not None:
+                dir_fd = self._open_dir(base_fd, location[1], identity)
+            with os.scandir(dir_fd if dir_fd is not None else directory) as it:
+                entries = list(it)
+            for entry in entries:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                path = os.path.join(directory, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        subdirs.append((entry.name, (st.st_dev, st.st_ino) if dir_fd is not None else None))
+                        continue
+                    self._unlink(entry.name if dir_fd is not None else path, dir_fd, path)
+                    deleted += 1
+                except OSError as e:
+                    with lock:
+                        stats.errors.append((path, str(e)))
+        except OSError as e:
+            with lock:
+                stats.errors.append((directory, str(e)))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+            with lock:
+                stats.files_deleted += deleted
+        return subdirs
+
+    def _remove_directories(self, pool: ThreadPoolExecutor, base_fds: Dict[str, Optional[int]],
+                            directories: List[Tuple[int, _Location, Optional[_Identity]]],
+                            stats: DeleteStats, lock: threading.Lock) -> None:
+        by_depth = {}
+        for depth, (base, names), parent_identity in directories:
+            parent = (base, names[:-1], parent_identity)
+            by_depth.setdefault(depth, {}).setdefault(parent, []).append(names[-1])
+
+        def remove_children(parent: Tuple[str, Tuple[str, ...], Optional[_Identity]], names: List[str]) -> None:
+            base, parent_names, parent_identity = parent
+            directory = os.path.join(base, *parent_names)
+            base_fd = base_fds[base]
+            removed = 0
+            parent_fd = None
+            try:
+                if base_fd is not None:
+                    parent_fd = self._open_dir(base_fd, parent_names, parent_identity) if parent_names else base_fd
+                for name in names:
+                    path = os.path.join(directory, name)
+                    try:
+                        os.rmdir(name if parent_fd is not None else path, dir_fd=parent_fd)
+                        removed += 1
+                    except OSError as e:
+                        with lock:
+                            stats.errors.append((path, str(e)))
+            except OSError as e:
+                with lock:
+                    stats.errors.append((directory, str(e)))
+            finally:
+                if parent_fd is not None and parent_fd != base_fd:
+                    os.close(parent_fd)
+                with lock:
+                    stats.dirs_deleted += removed
+
+        for depth in sorted(by_depth, reverse=True):
+            # 等这一层全部删除后再处理上一层
+            list(pool.map(lambda item: remove_children(*item), by_depth[depth].items()))
+
+    @staticmethod
+    def _unlink(target: str, dir_fd: Optional[int], path: str) -> None:
+        try:
+            os.unlink(target, dir_fd=dir_fd)
+        except PermissionError:
+            # Windows 上只读文件需要先去掉只读属性
+            if os.name != 'nt':
+                raise
+            os.chmod(path, stat.S_IWRITE)
+            os.unlink(path)
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量删除线程
+在后台删除选中的文件和文件夹，删除过程中持续发出进度
+"""
+
+import threading
+from typing import List
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .bulk_delete import BulkDeleter
+
+
+class BulkDeleteThread(QThread):
+    """批量删除线程"""
+
+    # 信号定义
+    progress = pyqtSignal(int, int)  # 已删除的文件数、目录数
+    delete_finished = pyqtSignal(object)  # DeleteStats
+
+    def __init__(self, paths: List[str], max_workers: int = 4):
+        """
+        Args:
+            paths: 要删除的文件或文件夹路径
+            max_workers: 并行清空目录的线程数
+        """
+        super().__init__()
+        self.paths = paths
+        self.deleter = BulkDeleter(max_workers)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        stats = self.deleter.delete(
+            self.paths, self._cancel_event,
+            lambda partial: self.progress.emit(partial.files_deleted, partial.dirs_deleted))
+        self.delete_finished.emit(stats)
+
+    def cancel(self):
+        """取消删除（已删除的内容无法恢复）"""
+        self._cancel_event.set()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件复制引擎
+优先在内核中完成复制，数据不经过 Python:
+1. os.copy_file_range（Linux，同一文件系统上还可能直接共享数据块）
+2. os.sendfile（Linux 支持文件到文件；macOS 只支持发送到 socket，会自动跳过）
+3. readinto 循环，复用同一块按页对齐的缓冲区（支持时用 preadv/pwrite 按位置读写）
+
+每种方式都按 chunk_size 分片执行，分片之间检查取消并回报进度；
+某种方式不被当前平台或文件系统支持时，从已复制的位置继续使用下一种方式
+"""
+
+import errno
+import io
+import os
+import threading
+from typing import Callable, Optional
+
+from .io_profile import aligned_buffer
+
+# 这些错误表示当前方式不适用（而不是 I/O 失败），应改用下一种方式
+_UNSUPPORTED_ERRNOS = {
+    errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP,
+    getattr(errno, 'ENOTSUP', errno.EOPNOTSUPP), errno.ENOTSOCK, errno.EBADF,
+}
+
+METHOD_COPY_FILE_RANGE = 'copy_file_range'
+METHOD_SENDFILE = 'sendfile'
+METHOD_READINTO = 'readinto'
+
+
+class CopyResult:
+    """一次复制的结果"""
+
+    def __init__(self):
+        self.copied = 0
+        self.method = ''          # 最终使用的方式
+        self.cancelled = False
+
+    def __repr__(self) -> str:
+        return f"CopyResult({self.copied} B, {self.method}, cancelled={self.cancelled})"
+
+
+class CopyEngine:
+    """按分片复制文件描述符之间的数据"""
+
+    def __init__(self, chunk_size: int = 1024 * 1024, methods: Optional[list] = None):
+        """
+        Args:
+            chunk_size: 每个分片的字节数（进度与取消的粒度）
+            methods: 按顺序尝试的方式，默认依次尝试全部三种
+        """
+        self.chunk_size = chunk_size
+        self.methods = methods or [METHOD_COPY_FILE_RANGE, METHOD_SENDFILE, METHOD_READINTO]
+
+    def copy(self, src_fd: int, dst_fd: int, size: int, offset: int = 0,
+             cancel_event: Optional[threading.Event] = None,
+             progress: Optional[Callable[[int], None]] = None) -> CopyResult:
+        """
+        从 src_fd 的 offset 处复制到 dst_fd 的同一位置，直到 size 字节或源文件结束
+
+        Args:
+            src_fd: 源文件描述符（可读）
+            dst_fd: 目标文件描述符（可写）
+            size: 源文件大小
+            offset: 起始位置（续传时为已复制的字节数）
+            cancel_event: 被设置后在当前分片结束时停止
+            progress: 每个分片后回调，参数为已复制到的位置
+
+        Returns:
+            CopyResult（copied 为结束时的位置）
+        """
+        result = CopyResult()
+        result.copied = offset
+        for method in self.methods:
+            func = getattr(self, f'_copy_{method}', None)
+            if func is None:
+                continue
+            result.method = method
+            if func(src_fd, dst_fd, size, result, cancel_event, progress):
+                break
+        return result
+
+    def _run(self, step: Callable[[int, int], int], size: int, result: CopyResult,
+             cancel_event: Optional[threading.Event],
+             progress: Optional[Callable[[int], None]]) -> bool:
+        """
+        反复执行 step(位置, 长度) 直到完成；返回 False 表示该方式不可用
+
+        只有在这种方式一个字节都还没复制时遇到“不支持”类错误才退回下一种方式，
+        之后的错误照常抛出
+        """
+        started = result.copied
+        while result.copied < size:
+            if cancel_event is not None and cancel_event.is_set():
+                result.cancelled = True
+                return True
+            try:
+                count = step(result.copied, min(self.chunk_size, size - result.copied))
+            except OSError as e:
+                if result.copied == started and e.errno in _UNSUPPORTED_ERRNOS:
+                    return False
+                raise
+            if count == 0:
+                # 某些伪文件系统对 copy_file_range 直接返回 0，视为不支持
+                if result.copied == started and started < size:
+                    return False
+                break  # 源文件被截短
+            result.copied += count
+            if progress is not None:
+                progress(result.copied)
+        return True
+
+    def _copy_copy_file_range(self, src_fd, dst_fd, size, result, cancel_event, progress) -> bool:
+        if not hasattr(os, 'copy_file_range'):
+            return False
+        return self._run(
+            lambda position, count: os.copy_file_range(src_fd, dst_fd, count, position, position),
+            size, result, cancel_event, progress)
+
+    def _copy_sendfile(self, src_fd, dst_fd, size, result, cancel_event, progress) -> bool:
+        if not hasattr(os, 'sendfile'):
+            return False
+        # sendfile 从给定位置读取源文件，写入目标文件的当前位置
+        os.lseek(dst_fd, result.copied, os.SEEK_SET)
+        return self._run(
+            lambda position, count: os.sendfile(dst_fd, src_fd, position, count),
+            size, result, cancel_event, progress)
+
+    def _copy_readinto(self, src_fd, dst_fd, size, result, cancel_event, progress) -> bool:
+        buffer = aligned_buffer(self.chunk_size)
+        view = memoryview(buffer)
+
+        if hasattr(os, 'preadv') and hasattr(os, 'pwrite'):
+            # 按位置读写，不依赖也不改变文件位置
+            def step(position: int, count: int) -> int:
+                read = os.preadv(src_fd, [view[:count]], position)
+                written = 0
+                while written < read:
+                    written += os.pwrite(dst_fd, view[written:read], position + written)
+                return read
+        else:
+            src = io.FileIO(src_fd, 'rb', closefd=False)
+            os.lseek(src_fd, result.copied, os.SEEK_SET)
+            os.lseek(dst_fd, result.copied, os.SEEK_SET)
+
+            def step(position: int, count: int) -> int:
+                read = src.readinto(view[:count]) or 0
+                written = 0
+                while written < read:
+                    written += os.write(dst_fd, view[written:read])
+                return read
+
+        try:
+            return self._run(step, size, result, cancel_event, progress)
+        finally:
+            view.release()
+            buffer.close()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复文件查找
+分阶段缩小范围，尽量少读数据:
+1. 按文件大小分组，大小唯一的文件直接排除
+2. 对同大小的文件计算首尾各 64 KiB 的哈希
+3. 只有首尾哈希也相同的文件才计算完整哈希
+
+哈希在线程池中计算（hashlib 处理大块数据时会释放 GIL），并统计因此少读的字节数
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# 首尾各读取的字节数
+PARTIAL_SIZE = 64 * 1024
+# 完整哈希的读取块大小
+READ_CHUNK = 1024 * 1024
+
+
+class DuplicateGroup:
+    """一组内容相同的文件"""
+
+    def __init__(self, size: int, digest: str, paths: List[str]):
+        self.size = size
+        self.digest = digest
+        self.paths = sorted(paths)
+
+    @property
+    def wasted_bytes(self) -> int:
+        """除保留一份外其余副本占用的空间"""
+        return self.size * (len(self.paths) - 1)
+
+    def __repr__(self) -> str:
+        return f"DuplicateGroup({self.size} B x {len(self.paths)}, {self.digest[:12]})"
+
+
+class DedupStats:
+    """查找过程的统计"""
+
+    def __init__(self):
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.size_candidates = 0      # 大小相同、进入首尾哈希阶段的文件数
+        self.partial_candidates = 0   # 首尾哈希相同、进入完整哈希阶段的文件数
+        self.bytes_read = 0           # 实际读取的字节数
+        self.errors = 0
+        self.stage = ''
+        self.complete = False
+
+    @property
+    def bytes_avoided(self) -> int:
+        """与对每个文件计算完整哈希相比少读的字节数"""
+        return max(0, self.bytes_scanned - self.bytes_read)
+
+    def __repr__(self) -> str:
+        return (f"DedupStats(files={self.files_scanned}, size_candidates={self.size_candidates}, "
+                f"partial_candidates={self.partial_candidates}, read={self.bytes_read}, "
+                f"avoided={self.bytes_avoided})")
+
+
+def walk_files(root: str, cancel_event: Optional[threading.Event] = None) -> Iterator[Tuple[str, os.stat_result]]:
+    """递归列出普通文件 (路径, stat)，不跟随符号链接"""
+    pending = [root]
+    while pending:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class DuplicateFinder:
+    """分阶段重复文件查找"""
+
+    def __init__(self, max_workers: int = 4, min_size: int = 1, algorithm: str = 'blake2b'):
+        """
+        Args:
+            max_workers: 哈希线程数
+            min_size: 小于该大小的文件不参与比较（默认忽略空文件）
+            algorithm: hashlib 算法名称
+        """
+        self.max_workers = max_workers
+        self.min_size = min_size
+        self.algorithm = algorithm
+
+    def find(self, roots: List[str], cancel_event: Optional[threading.Event] = None,
+             progress: Optional[Callable[[DedupStats], None]] = None,
+             progress_interval: float = 0.1) -> Tuple[List[DuplicateGroup], DedupStats]:
+        """
+        在一个或多个目录（例如 U 盘与本机文件夹）中查找重复文件
+
+        同一文件的硬链接、以及重叠的目录只计一次
+
+        Args:
+            roots: 要比较的目录
+            cancel_event: 被设置后停止查找
+            progress: 进度回调（在调用线程中执行），每个阶段开始时以及遍历期间定期调用
+            progress_interval: 遍历期间回调的最小间隔（秒）
+
+        Returns:
+            (按浪费空间从大到小排列的重复组, 统计)
+        """
+        stats = DedupStats()
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+
+        last_report = [time.monotonic()]
+
+        def report(stage: str) -> None:
+            stats.stage = stage
+            last_report[0] = time.monotonic()
+            if progress is not None:
+                progress(stats)
+
+        # 阶段 1: 按大小分组
+        report('size')
+        by_size: Dict[int, List[str]] = {}
+        seen_inodes = set()
+        for root in roots:
+            for path, st in walk_files(root, cancel_event):
+                key = (st.st_dev, st.st_ino)
+                if key in seen_inodes:
+                    continue
+                seen_inodes.add(key)
+                stats.files_scanned += 1
+                stats.bytes_scanned += st.st_size
+                if st.st_size >= self.min_size:
+                    by_size.setdefault(st.st_size, []).append(path)
+                # 大容量硬盘上遍历可能持续很久，期间定期汇报已扫描的文件数
+                if progress is not None and time.monotonic() - last_report[0] >= progress_interval:
+                    report('size')
+        if cancelled():
+            return [], stats
+
+        candidates = {size: paths for size, paths in by_size.items() if len(paths) > 1}
+        stats.size_candidates = sum(len(paths) for paths in candidates.values())
+
+        groups: List[DuplicateGroup] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # 阶段 2: 首尾哈希
+            report('partial')
+            partial_groups = self._group_by_hash(pool, candidates, self._partial_hash, stats, cancel_event)
+            if cancelled():
+                return [], stats
+
+            full_candidates: Dict[int, List[str]] = {}
+            for (size, digest), paths in partial_groups.items():
+                if size <= 2 * PARTIAL_SIZE:
+                    # 首尾两段已覆盖整个文件，首尾哈希即完整哈希
+                    groups.append(DuplicateGroup(size, digest, paths))
+                else:
+                    full_candidates.setdefault(size, []).extend(paths)
+            stats.partial_candidates = sum(len(paths) for paths in full_candidates.values())
+
+            # 阶段 3: 完整哈希；同大小下不同首尾哈希的文件会在这里自然分开
+            report('full')
+            full_groups = self._group_by_hash(pool, full_candidates, self._full_hash, stats, cancel_event)
+            if cancelled():
+                return [], stats
+            for (size, digest), paths in full_groups.items():
+                groups.append(DuplicateGroup(size, digest, paths))
+
+        groups.sort(key=lambda group: group.wasted_bytes, reverse=True)
+        stats.complete = True
+        report('done')
+        return groups, stats
+
+    def _group_by_hash(self, pool: ThreadPoolExecutor, candidates: Dict[int, List[str]],
+                       hash_func: Callable[[str, int, Optional[threading.Event]], Tuple[Optional[str], int]],
+                       stats: DedupStats, cancel_event: Optional[threading.Event]) -> Dict[Tuple[int, str], List[str]]:
+        """并行计算哈希，返回 {(大小, 哈希): [路径...]} 中多于一个文件的组"""
+        jobs = [(size, path) for size, paths in candidates.items() for path in paths]
+        results = pool.map(lambda job: hash_func(job[1], job[0], cancel_event), jobs)
+
+        grouped: Dict[Tuple[int, str], List[str]] = {}
+        for (size, path), (digest, bytes_read) in zip(jobs, results):
+            stats.bytes_read += bytes_read
+            if digest is None:
+                stats.errors += 1
+                continue
+            grouped.setdefault((size, digest), []).append(path)
+        return {key: paths for key, paths in grouped.items() if len(paths) > 1}
+
+    def _partial_hash(self, path: str, size: int,
+                      cancel_event: Optional[threading.Event]) -> Tuple[Optional[str], int]:
+        """首尾各 PARTIAL_SIZE 字节的哈希，返回 (哈希, 读取字节数)"""
+        if cancel_event is not None and cancel_event.is_set():
+            return None, 0
+        digest = hashlib.new(self.algorithm)
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(PARTIAL_SIZE)
+                digest.update(head)
+                read = len(head)
+                if size > PARTIAL_SIZE:
+                    f.seek(max(PARTIAL_SIZE, size - PARTIAL_SIZE))
+                    tail = f.read(PARTIAL_SIZE)
+                    digest.update(tail)
+                    read += len(tail)
+        except OSError:
+            return None, 0
+        return digest.hexdigest(), read
+
+    def _full_hash(self, path: str, size: int,
+                   cancel_event: Optional[threading.Event]) -> Tuple[Optional[str], int]:
+        """完整内容的哈希，返回 (哈希, 读取字节数)"""
+        digest = hashlib.new(self.algorithm)
+        buffer = bytearray(READ_CHUNK)
+        view = memoryview(buffer)
+        read = 0
+        try:
+            with open(path, 'rb', buffering=0) as f:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return None, read
+                    count = f.readinto(buffer)
+                    if not count:
+                        break
+                    digest.update(view[:count])
+                    read += count
+        except OSError:
+            return None, read
+        return digest.hexdigest(), read
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+重复文件查找线程
+"""
+
+import threading
+from typing import List
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .dedup import DuplicateFinder
+
+
+class DedupThread(QThread):
+    """重复文件查找线程"""
+
+    # 信号定义
+    progress = pyqtSignal(str, int)             # 当前阶段、已扫描文件数
+    dedup_finished = pyqtSignal(list, object)   # DuplicateGroup 列表、DedupStats
+
+    def __init__(self, roots: List[str], max_workers: int = 4):
+        """
+        Args:
+            roots: 要比较的目录（U 盘挂载路径、本机文件夹）
+            max_workers: 哈希线程数
+        """
+        super().__init__()
+        self.roots = roots
+        self.finder = DuplicateFinder(max_workers)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        groups, stats = self.finder.find(
+            self.roots, self._cancel_event,
+            lambda current: self.progress.emit(current.stage, current.files_scanned))
+        if stats.complete:
+            self.dedup_finished.emit(groups, stats)
+
+    def cancel(self):
+        """取消查找"""
+        self._cancel_event.set()
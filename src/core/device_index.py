@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+USB 设备 ↔ 块设备 ↔ 挂载点 关联索引
+/sys/block/* 的真实路径位于所属 USB 设备目录之下（例如 .../usb1/1-1/1-1.2/1-1.2:1.0/host6/.../block/sdb），
+据此把块设备及其分区归到 "总线号-端口路径"，再结合挂载表得到每个 USB 设备的挂载点；
+热插拔和挂载变化时只更新受影响的条目
+"""
+
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+from .mountinfo import MountEntry, MountTable
+
+# sysfs 中 USB 设备目录名，例如 "1-1.2"（接口目录 "1-1.2:1.0" 不匹配）
+_USB_DEVICE_DIR_RE = re.compile(r'^\d+-\d+(?:\.\d+)*$')
+
+
+def usb_device_name(busnum: Optional[int], port_path: str) -> Optional[str]:
+    """由总线号和端口路径得到 sysfs 中的 USB 设备名（与 DeviceRecord.busnum / port_path 对应）"""
+    if busnum is None or not port_path:
+        return None
+    return f"{busnum}-{port_path}"
+
+
+class BlockDevice:
+    """一个整盘块设备及其分区"""
+
+    def __init__(self, name: str, usb_device: Optional[str], partitions: List[str]):
+        self.name = name
+        self.usb_device = usb_device
+        self.partitions = partitions
+
+    def __repr__(self) -> str:
+        return f"BlockDevice({self.name!r}, usb={self.usb_device!r}, partitions={self.partitions!r})"
+
+
+class DeviceIndex:
+    """USB 设备、块设备和挂载点的关联索引（线程安全）"""
+
+    def __init__(self, sysfs_root: str = '/sys', proc_root: str = '/proc'):
+        self.sysfs_root = sysfs_root
+        self.mount_table = MountTable(proc_root, sysfs_root)
+        self._lock = threading.Lock()
+        self._disks: Dict[str, BlockDevice] = {}
+        # 块设备（整盘或分区）名称 -> 整盘名称
+        self._block_to_disk: Dict[str, str] = {}
+        # 挂载点 -> 块设备名称
+        self._mounts: Dict[str, str] = {}
+
+    @property
+    def block_dir(self) -> str:
+        return os.path.join(self.sysfs_root, 'block')
+
+    def is_available(self) -> bool:
+        return os.path.isdir(self.block_dir)
+
+    # ---------- 构建与增量更新 ----------
+
+    def refresh(self) -> None:
+        """重新读取全部块设备和挂载"""
+        try:
+            names = os.listdir(self.block_dir)
+        except OSError:
+            names = []
+
+        disks = {}
+        for name in names:
+            disk = self._read_disk(name)
+            if disk is not None:
+                disks[name] = disk
+
+        mounts = self._read_mounts(self.mount_table.read())
+
+        with self._lock:
+            self._disks = disks
+            self._block_to_disk = self._build_block_map(disks)
+            self._mounts = mounts
+
+    def apply_uevents(self, events: List[Dict[str, str]]) -> None:
+        """
+        根据热插拔事件更新索引
+
+        block 事件只重新读取对应的整盘；usb 移除事件删除该设备下的所有整盘
+        """
+        with self._lock:
+            disks = dict(self._disks)
+
+        for event in events:
+            subsystem = event.get('SUBSYSTEM')
+            action = event.get('ACTION')
+            devpath = event.get('DEVPATH', '')
+            if subsystem == 'block':
+                # 分区事件也归到整盘上重新读取
+                name = event.get('DEVNAME') or os.path.basename(devpath)
+                disk_name = os.path.basename(os.path.dirname(devpath)) if event.get('DEVTYPE') == 'partition' else name
+                # 整盘移除事件发出时 sysfs 目录可能尚未删除，不能靠重新读取判断
+                disk = None
+                if not (action == 'remove' and disk_name == name):
+                    disk = self._read_disk(disk_name)
+                if disk is None:
+                    disks.pop(disk_name, None)
+                else:
+                    disks[disk_name] = disk
+            elif subsystem == 'usb' and action == 'remove':
+                usb_name = os.path.basename(devpath)
+                for disk_name in [n for n, d in disks.items() if d.usb_device == usb_name]:
+                    del disks[disk_name]
+
+        with self._lock:
+            self._disks = disks
+            self._block_to_disk = self._build_block_map(disks)
+
+    def apply_mount_changes(self, added: List[MountEntry], removed: List[MountEntry]) -> None:
+        """根据挂载监听的结果更新挂载点"""
+        new_mounts = self._read_mounts(added)
+        with self._lock:
+            for entry in removed:
+                self._mounts.pop(entry.mount_point, None)
+            self._mounts.update(new_mounts)
+
+    def _read_disk(self, name: str) -> Optional[BlockDevice]:
+        disk_dir = os.path.join(self.block_dir, name)
+        if not os.path.exists(disk_dir):
+            return None
+
+        real_dir = os.path.realpath(disk_dir)
+        usb_device = None
+        for part in real_dir.split(os.sep):
+            if _USB_DEVICE_DIR_RE.match(part):
+                usb_device = part
+
+        partitions = []
+        try:
+            for entry in sorted(os.listdir(real_dir)):
+                if os.path.exists(os.path.join(real_dir, entry, 'partition')):
+                    partitions.append(entry)
+        except OSError:
+            pass
+        return BlockDevice(name, usb_device, partitions)
+
+    def _read_mounts(self, entries: List[MountEntry]) -> Dict[str, str]:
+        mounts = {}
+        for entry in entries:
+            if not entry.is_block_device:
+                continue
+            device_dir = self.mount_table.block_device_dir(entry)
+            name = os.path.basename(device_dir) if device_dir else os.path.basename(entry.source)
+            mounts.setdefault(entry.mount_point, name)
+        return mounts
+
+    @staticmethod
+    def _build_block_map(disks: Dict[str, BlockDevice]) -> Dict[str, str]:
+        block_map = {}
+        for name, disk in disks.items():
+            block_map[name] = name
+            for partition in disk.partitions:
+                block_map[partition] = name
+        return block_map
+
+    # ---------- 查询 ----------
+
+    def mounts_for(self, busnum: Optional[int], port_path: str) -> List[str]:
+        """某个 USB 设备的全部挂载点（按挂载点排序）"""
+        usb_name = usb_device_name(busnum, port_path)
+        if usb_name is None:
+            return []
+        with self._lock:
+            return sorted(point for point, block in self._mounts.items()
+                          if self._usb_device_of(block) == usb_name)
+
+    def mounts_for_device(self, device) -> List[str]:
+        """某个 DeviceRecord 的全部挂载点"""
+        return self.mounts_for(device.busnum, device.port_path)
+
+    def _usb_device_of(self, block: str) -> Optional[str]:
+        disk = self._disks.get(self._block_to_disk.get(block, ''))
+        return disk.usb_device if disk else None
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+USB 设备记录
+使用 __slots__ 和驻留字符串的紧凑设备记录，预先计算稳定 Key 和哈希值，
+在保留大量快照做差异比较时节省内存并加快比较
+"""
+
+import re
+import sys
+from typing import Any, Dict, Optional
+
+
+# macOS system_profiler 的 device_speed 取值 (Mbps)
+_NAMED_SPEEDS = {
+    'low_speed': 1.5,
+    'full_speed': 12.0,
+    'high_speed': 480.0,
+    'super_speed': 5000.0,
+    'super_speed_plus': 10000.0,
+    'super_speed_plus_by2': 20000.0,
+}
+# SuperSpeed 的最低速率 (Mbps)
+SUPER_SPEED_MBPS = 5000.0
+
+_SPEED_RE = re.compile(r'([0-9]+(?:\.[0-9]+)?)\s*(G|M)?', re.IGNORECASE)
+
+
+def parse_speed_mbps(speed: str) -> Optional[float]:
+    """
+    把速度文本解析为 Mbps 数值
+
+    支持 "480"、"480 Mb/s"、"5 Gb/s"、"up_to_480_Mb_per_sec"、"high_speed" 等形式，
+    "USB 3.0" 这类协议版本名不是协商速率，返回 None
+    """
+    if not speed or speed == 'N/A':
+        return None
+
+    text = speed.strip().lower()
+    if text in _NAMED_SPEEDS:
+        return _NAMED_SPEEDS[text]
+    if text.startswith('usb'):
+        return None
+
+    match = _SPEED_RE.search(text)
+    if not match:
+        return None
+    value = float(match.group(1))
+    if (match.group(2) or '').lower() == 'g':
+        value *= 1000
+    return value
+
+
+def capability_from_version(version: str) -> Optional[float]:
+    """
+    由 bcdUSB 版本推算设备能达到的速率档位 (Mbps)
+
+    只区分 USB 1.x / 2.0 / 3.x 三档：3.1、3.2 的设备可能只支持 Gen 1，
+    按 5 Gb/s 计算可以避免误报
+    """
+    try:
+        value = float(version.strip())
+    except (AttributeError, ValueError):
+        return None
+    if value >= 3.0:
+        return SUPER_SPEED_MBPS
+    if value >= 2.0:
+        return 480.0
+    return 12.0
+
+
+def _intern(value: Any, default: str) -> str:
+    return sys.intern(str(value)) if value not in (None, '') else default
+
+
+class DeviceRecord:
+    """
+    单个 USB 设备
+
+    字段创建后视为不可变（Key 和哈希值已预先计算），需要修改时使用 replace()；
+    支持 record['name'] / record.get('name') 的字典式读取，兼容原有的调用方
+    """
+
+    __slots__ = ('name', 'manufacturer', 'serial', 'bus', 'speed', 'vid_pid',
+                 'speed_mbps', 'capability_mbps', 'busnum', 'port_path', 'key', '_hash')
+
+    FIELDS = ('name', 'manufacturer', 'serial', 'bus', 'speed', 'vid_pid',
+              'speed_mbps', 'capability_mbps', 'busnum', 'port_path')
+
+    def __init__(self, name: str, manufacturer: str = 'N/A', serial: str = 'N/A',
+                 bus: str = 'USB', speed: str = 'N/A', vid_pid: str = 'N/A',
+                 speed_mbps: Optional[float] = None, capability_mbps: Optional[float] = None,
+                 busnum: Optional[int] = None, port_path: str = ''):
+        """
+        Args:
+            name: 设备名称
+            manufacturer: 制造商
+            serial: 序列号
+            bus: 总线描述（'USB Storage' 表示存储设备）
+            speed: 显示用的速度文本
+            vid_pid: "VID:PID"
+            speed_mbps: 协商速率 (Mbps)，None 时从 speed 文本解析
+            capability_mbps: 描述符 (bcdUSB) 声明的速率档位 (Mbps)，未知时为 None
+            busnum: USB 总线号
+            port_path: 端口路径（sysfs devpath，例如 "1.2"）
+        """
+        self.name = _intern(name, 'Unknown')
+        self.manufacturer = _intern(manufacturer, 'N/A')
+        self.serial = _intern(serial, 'N/A')
+        self.bus = _intern(bus, 'USB')
+        self.speed = _intern(speed, 'N/A')
+        self.vid_pid = _intern(vid_pid, 'N/A')
+        self.speed_mbps = speed_mbps if speed_mbps is not None else parse_speed_mbps(self.speed)
+        self.capability_mbps = capability_mbps
+        self.busnum = busnum
+        self.port_path = sys.intern(port_path) if port_path else ''
+        self.key = self._make_key()
+        self._hash = hash(self.key)
+
+    def _make_key(self) -> str:
+        # 优先使用序列号；否则用 名称_VID:PID，并附加物理端口位置区分同型号设备
+        if self.serial != 'N/A':
+            return self.serial
+        key = f"{self.name}_{self.vid_pid}"
+        if self.busnum is not None and self.port_path:
+            key = f"{key}@{self.busnum}-{self.port_path}"
+        return sys.intern(key)
+
+    @property
+    def is_storage(self) -> bool:
+        """是否被后端识别为存储设备"""
+        return self.bus == 'USB Storage'
+
+    @property
+    def is_below_capability(self) -> bool:
+        """支持 SuperSpeed 却以更低速率运行（例如 USB 3 U 盘协商在 480 Mb/s）"""
+        return (self.capability_mbps is not None and self.speed_mbps is not None and
+                self.capability_mbps >= SUPER_SPEED_MBPS and self.speed_mbps < SUPER_SPEED_MBPS)
+
+    def replace(self, **changes) -> 'DeviceRecord':
+        """返回修改了部分字段的新记录"""
+        fields = {name: getattr(self, name) for name in self.FIELDS}
+        if 'speed' in changes and 'speed_mbps' not in changes:
+            fields['speed_mbps'] = None
+        fields.update(changes)
+        return DeviceRecord(**fields)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self.FIELDS:
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        if name in self.FIELDS:
+            return getattr(self, name)
+        return default
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DeviceRecord):
+            return NotImplemented
+        if self is other:
+            return True
+        return (self._hash == other._hash and
+                all(getattr(self, name) == getattr(other, name) for name in self.FIELDS))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"DeviceRecord({self.key!r}, name={self.name!r}, bus={self.bus!r}, speed={self.speed!r})"
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+USB 设备快照与差异比较
+以 DeviceRecord.key 为索引保存一次扫描的结果，比较两次扫描只得到增删改的设备
+"""
+
+from typing import List, Dict, Optional, Tuple
+
+from .device_record import DeviceRecord
+
+
+class DeviceSnapshot:
+    """一次扫描结果的快照，保持扫描顺序"""
+
+    def __init__(self, devices: Optional[List[DeviceRecord]] = None):
+        self.devices: Dict[str, DeviceRecord] = {}
+        for device in devices or []:
+            key = device.key
+            # 同型号且无序列号的设备会得到相同的 Key，追加序号区分
+            if key in self.devices:
+                index = 2
+                while f"{key}#{index}" in self.devices:
+                    index += 1
+                key = f"{key}#{index}"
+            self.devices[key] = device
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.devices
+
+    def __iter__(self):
+        return iter(self.devices.items())
+
+    def keys(self) -> List[str]:
+        return list(self.devices.keys())
+
+    def get(self, key: str) -> Optional[DeviceRecord]:
+        return self.devices.get(key)
+
+
+class SnapshotDiff:
+    """两次快照之间的差异"""
+
+    def __init__(self):
+        self.added: List[Tuple[str, DeviceRecord]] = []
+        self.removed: List[str] = []
+        self.changed: List[Tuple[str, DeviceRecord]] = []
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+    def __repr__(self) -> str:
+        return (f"SnapshotDiff(added={len(self.added)}, removed={len(self.removed)}, "
+                f"changed={len(self.changed)})")
+
+
+def diff(previous: Optional[DeviceSnapshot], current: DeviceSnapshot) -> SnapshotDiff:
+    """
+    比较两次快照
+
+    Args:
+        previous: 上一次的快照，None 表示首次扫描（全部视为新增）
+        current: 本次快照
+
+    Returns:
+        SnapshotDiff，added/changed 按本次扫描顺序，removed 按上次扫描顺序
+    """
+    result = SnapshotDiff()
+    old_devices = previous.devices if previous is not None else {}
+
+    for key, device in current.devices.items():
+        old = old_devices.get(key)
+        if old is None:
+            result.added.append((key, device))
+        elif old != device:
+            result.changed.append((key, device))
+
+    for key in old_devices:
+        if key not in current.devices:
+            result.removed.append(key)
+
+    return result
@@ -6,6 +6,7 @@
 """
 
 import os
+import json
 import shutil
 import subprocess
 import platform
@@ -13,26 +14,47 @@ import string
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from .scan_cache import scan_cache, MOUNTED_DRIVES
+from .probe_runner import Probe, probe_runner
+from .scan_metrics import scan_metrics
+from .mountinfo import MountEntry, MountTable
+from .file_listing import format_size, iter_entries
+from .io_profile import IOProfile
+
+# 无法确定文件系统类型时显示的值（各平台统一）
+UNKNOWN_FILESYSTEM = "未知"
+
 
 class DriveManager:
     """存储设备管理器类"""
     
     @staticmethod
-    def scan_mounted_drives() -> List[Dict[str, str]]:
+    def scan_mounted_drives(use_cache: bool = True) -> List[Dict[str, str]]:
         """
         扫描已挂载的 U 盘
         
+        Args:
+            use_cache: 是否允许复用 TTL 时间窗口内的扫描结果
+            
         Returns:
             驱动器信息列表
         """
+        if not use_cache:
+            scan_cache.invalidate(MOUNTED_DRIVES)
+        return list(scan_cache.get(MOUNTED_DRIVES, DriveManager._scan_all_drives))
+    
+    @staticmethod
+    def _scan_all_drives() -> List[Dict[str, str]]:
+        """实际执行扫描（不经过缓存）"""
         system = platform.system()
         
-        if system == "Darwin":  # macOS
-            return DriveManager._scan_macos_drives()
-        elif system == "Windows":
-            return DriveManager._scan_windows_drives()
-        elif system == "Linux":
-            return DriveManager._scan_linux_drives()
+        with scan_metrics.timer('scan.drives'):
+            if system == "Darwin":  # macOS
+                return DriveManager._scan_macos_drives()
+            elif system == "Windows":
+                return DriveManager._scan_windows_drives()
+            elif system == "Linux":
+                return DriveManager._scan_linux_drives()
         
         return []
     
@@ -41,62 +63,153 @@ class DriveManager:
         """扫描 macOS 上的驱动器"""
         volumes_path = Path('/Volumes')
         drives = []
-        
+
         if not volumes_path.exists():
             return drives
-        
+
+        volumes = []
         for volume in volumes_path.iterdir():
             # 跳过系统卷和隐藏卷
             if volume.name == 'Macintosh HD' or volume.name.startswith('.'):
                 continue
-                
+
             if volume.is_dir():
-                drive_info = DriveManager._get_drive_info(volume)
-                if drive_info:
-                    drives.append(drive_info)
-        
+                volumes.append(volume)
+
+        # 每个卷的 diskutil 查询并发执行
+        results = probe_runner.run(
+            [Probe(str(volume), ['diskutil', 'info', str(volume)], timeout=5, metric_name='subprocess.diskutil')
+             for volume in volumes],
+            deadline=5
+        )
+
+        for volume in volumes:
+            result = results[str(volume)]
+            filesystem = DriveManager._parse_diskutil_filesystem(result.stdout) if result.ok else ""
+            drive_info = DriveManager._get_drive_info(volume, filesystem=filesystem or UNKNOWN_FILESYSTEM)
+            if drive_info:
+                drives.append(drive_info)
+
         return drives
-    
+
     @staticmethod
     def _scan_windows_drives() -> List[Dict[str, str]]:
         """扫描 Windows 上的驱动器"""
         drives = []
-        
+
         # 扫描所有磁盘驱动器（A-Z）
+        drive_paths = []
         for drive_letter in string.ascii_uppercase:
             drive_path = Path(f"{drive_letter}:/")
             if drive_path.exists():
-                try:
-                    drive_info = DriveManager._get_drive_info(drive_path)
-                    if drive_info:
-                        drives.append(drive_info)
-                except Exception:
-                    pass
-        
+                drive_paths.append(drive_path)
+
+        # 一次查询所有卷的卷标和文件系统，而不是每个卷各启动几个子进程
+        volume_info = DriveManager._query_windows_volumes()
+
+        for drive_path in drive_paths:
+            try:
+                label, filesystem = volume_info.get(str(drive_path)[0], (None, None))
+                drive_info = DriveManager._get_drive_info(drive_path, filesystem=filesystem, label=label)
+                if drive_info:
+                    drives.append(drive_info)
+            except Exception:
+                pass
+
         return drives
+
+    @staticmethod
+    def _query_windows_volumes() -> Dict[str, tuple]:
+        """
+        批量查询 Windows 卷标和文件系统
+        wmic 与 PowerShell 并发查询，wmic 无结果时使用 PowerShell 的结果
+
+        Returns:
+            {盘符: (卷标, 文件系统)}，查询失败时为空字典
+        """
+        volumes = {}
+        results = probe_runner.run([
+            Probe('wmic', 'wmic logicaldisk get Name,VolumeName,FileSystem /format:csv',
+                  timeout=5, shell=True, encodings=('gbk',), metric_name='subprocess.wmic.logicaldisk'),
+            Probe('powershell',
+                  ["powershell", "-Command",
+                   "Get-Volume | Where-Object DriveLetter | "
+                   "Select-Object DriveLetter,FileSystemLabel,FileSystem | ConvertTo-Json -Compress"],
+                  timeout=5, encodings=('gbk', 'utf-8'), metric_name='subprocess.powershell.volume'),
+        ], deadline=5)
+
+        # 方法 1: WMIC (CSV格式)
+        result = results['wmic']
+        if result.ok:
+            lines = [line.strip() for line in result.stdout.splitlines() if line.strip()]
+            if len(lines) >= 2:
+                header = [h.strip() for h in lines[0].split(',')]
+                for line in lines[1:]:
+                    row = dict(zip(header, [v.strip() for v in line.split(',')]))
+                    name = row.get('Name', '')
+                    if name:
+                        volumes[name[0].upper()] = (row.get('VolumeName', ''), row.get('FileSystem') or None)
+
+        # 方法 2: PowerShell 回退 (解决 Win11 上没有 wmic 的问题)
+        result = results['powershell']
+        if not volumes and result.ok and result.stdout.strip():
+            try:
+                data = json.loads(result.stdout)
+                if isinstance(data, dict): data = [data]
+                for item in data:
+                    letter = str(item.get('DriveLetter') or '')
+                    if letter:
+                        volumes[letter[0].upper()] = (item.get('FileSystemLabel') or '', item.get('FileSystem') or None)
+            except json.JSONDecodeError:
+                pass
+
+        return volumes
+
+    @staticmethod
+    def _scan_linux_drives(proc_root: str = '/proc', sysfs_root: str = '/sys') -> List[Dict[str, str]]:
+        """
+        扫描 Linux 上的驱动器
+        一次解析 /proc/self/mountinfo，找出 USB / 可移动设备的挂载
+        （包括桌面环境使用的 /media/$USER、/run/media/$USER）
+        """
+        return DriveManager.drives_from_mounts(MountTable(proc_root, sysfs_root).removable_mounts())
     
     @staticmethod
-    def _scan_linux_drives() -> List[Dict[str, str]]:
-        """扫描 Linux 上的驱动器"""
+    def drives_from_mounts(mounts: List[MountEntry]) -> List[Dict[str, str]]:
+        """
+        为 mountinfo 中的挂载项生成驱动器信息（挂载监听增量更新时也使用）
+        
+        Args:
+            mounts: MountEntry 列表
+        """
         drives = []
-        mount_path = Path('/mnt')
         
-        if mount_path.exists():
-            for mount_point in mount_path.iterdir():
-                if mount_point.is_dir():
-                    try:
-                        drive_info = DriveManager._get_drive_info(mount_point)
-                        if drive_info:
-                            drives.append(drive_info)
-                    except Exception:
-                        pass
+        for mount in mounts:
+            try:
+                drive_info = DriveManager._get_drive_info(Path(mount.mount_point), filesystem=mount.fs_type)
+                if drive_info:
+                    drive_info.update({
+                        'device': mount.source,
+                        'device_number': mount.device_number,
+                        'mount_id': mount.mount_id,
+                        'options': mount.options,
+                    })
+                    drives.append(drive_info)
+            except Exception:
+                pass
         
         return drives
     
     @staticmethod
-    def _get_drive_info(volume: Path) -> Optional[Dict[str, str]]:
+    def _get_drive_info(volume: Path, filesystem: Optional[str] = None,
+                        label: Optional[str] = None) -> Optional[Dict[str, str]]:
         """
         获取驱动器详细信息
+        
+        Args:
+            volume: 卷路径
+            filesystem: 已知的文件系统类型，None 时单独查询
+            label: 已知的 Windows 卷标，None 时单独查询
         """
         try:
             # 获取磁盘使用情况
@@ -106,13 +219,14 @@ class DriveManager:
             free_gb = stat.free / (1024**3)
             
             # 获取文件系统类型
-            filesystem = DriveManager._get_filesystem_type(volume)
+            if filesystem is None:
+                filesystem = DriveManager._get_filesystem_type(volume)
             
             # 获取设备名称 (卷标)
             # Windows 下 Path('E:/').name 是空的，需要特殊处理
             name = volume.name
             if not name and platform.system() == "Windows":
-                name = DriveManager._get_windows_volume_label(volume)
+                name = label if label is not None else DriveManager._get_windows_volume_label(volume)
             
             # 如果还是获取不到，显示为 本地磁盘 (X:)
             if not name:
@@ -124,7 +238,7 @@ class DriveManager:
             return {
                 'name': name,
                 'path': str(volume),
-                'filesystem': filesystem if filesystem else "未知",
+                'filesystem': filesystem if filesystem else UNKNOWN_FILESYSTEM,
                 'total': f"{total_gb:.2f} GB",
                 'used': f"{used_gb:.2f} GB",
                 'free': f"{free_gb:.2f} GB",
@@ -197,9 +311,9 @@ class DriveManager:
                 )
                 
                 if result.returncode == 0:
-                    for line in result.stdout.split('\n'):
-                        if 'File System Personality' in line or 'Type (Bundle)' in line:
-                            return line.split(':')[-1].strip()
+                    filesystem = DriveManager._parse_diskutil_filesystem(result.stdout)
+                    if filesystem:
+                        return filesystem
             except Exception:
                 pass
         
@@ -248,24 +362,19 @@ class DriveManager:
                 pass
         
         elif system == "Linux":
-            try:
-                result = subprocess.run(
-                    ['df', '-T', str(volume)],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                if result.returncode == 0:
-                    lines = result.stdout.strip().split('\n')
-                    if len(lines) >= 2:
-                        parts = lines[1].split()
-                        if len(parts) >= 2:
-                            return parts[1] # df -T 输出的第二列是类型
-            except Exception:
-                pass
+            mount = MountTable().find(str(volume))
+            if mount is not None:
+                return mount.fs_type
         
-        return "Unknown"
+        return UNKNOWN_FILESYSTEM
+    
+    @staticmethod
+    def _parse_diskutil_filesystem(output: str) -> str:
+        """从 diskutil info 输出中取出文件系统类型"""
+        for line in output.split('\n'):
+            if 'File System Personality' in line or 'Type (Bundle)' in line:
+                return line.split(':')[-1].strip()
+        return ""
     
     @staticmethod
     def list_files(drive_path: str, show_hidden: bool = False) -> List[Dict[str, str]]:
@@ -280,24 +389,12 @@ class DriveManager:
             文件信息列表
         """
         files = []
-        path = Path(drive_path)
         
-        if not path.exists():
+        if not os.path.isdir(drive_path):
             return files
         
         try:
-            for item in path.iterdir():
-                if not show_hidden and item.name.startswith('.'):
-                    continue
-                
-                file_info = {
-                    'name': item.name,
-                    'type': "📁 文件夹" if item.is_dir() else "📄 文件",
-                    'size': DriveManager._format_size(item),
-                    'path': str(item),
-                    'is_dir': item.is_dir()
-                }
-                files.append(file_info)
+            files = [entry.to_dict() for entry in iter_entries(drive_path, show_hidden)]
         except Exception as e:
             print(f"读取文件列表失败: {str(e)}")
         
@@ -318,16 +415,7 @@ class DriveManager:
             return "N/A"
         
         try:
-            size_bytes = path.stat().st_size
-            
-            if size_bytes < 1024:
-                return f"{size_bytes} B"
-            elif size_bytes < 1024**2:
-                return f"{size_bytes/1024:.2f} KB"
-            elif size_bytes < 1024**3:
-                return f"{size_bytes/(1024**2):.2f} MB"
-            else:
-                return f"{size_bytes/(1024**3):.2f} GB"
+            return format_size(path.stat().st_size)
         except Exception:
             return "N/A"
     
@@ -353,6 +441,39 @@ class DriveManager:
             print(f"写入文件失败: {str(e)}")
             return False
     
+    @staticmethod
+    def get_io_profile(path: str) -> IOProfile:
+        """
+        获取路径所在卷的 I/O 参数（块大小、扇区大小、单文件大小上限等）
+
+        Args:
+            path: 卷上的任意路径
+
+        Returns:
+            IOProfile
+        """
+        # 不启动子进程: Linux 上由 IOProfile 从挂载表读取文件系统类型，
+        # 其他平台使用最近一次驱动器扫描的结果，扫描中没有时由 IOProfile 用系统调用查询
+        fs_type = None
+        if platform.system() != "Linux":
+            fs_type = DriveManager._cached_filesystem_type(path)
+        return IOProfile.probe(path, fs_type)
+
+    @staticmethod
+    def _cached_filesystem_type(path: str) -> Optional[str]:
+        """从最近一次驱动器扫描结果中查找路径所在卷的文件系统类型，找不到时返回 None"""
+        target = os.path.normcase(os.path.abspath(path))
+        best, best_len = None, -1
+        for drive in scan_cache.last(MOUNTED_DRIVES) or []:
+            root = os.path.normcase(os.path.abspath(drive.get('path', '')))
+            stripped = root.rstrip('\\/')
+            if target != stripped and not target.startswith(stripped + os.sep):
+                continue
+            if len(stripped) > best_len:
+                best, best_len = drive, len(stripped)
+        filesystem = best.get('filesystem') if best is not None else None
+        return filesystem if filesystem and filesystem != UNKNOWN_FILESYSTEM else None
+    
     @staticmethod
     def delete_file(file_path: str) -> bool:
         """
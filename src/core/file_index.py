@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卷文件索引
+把卷上每个文件的路径、大小、修改时间和 inode 记录到本地 SQLite 数据库，按文件系统 UUID 区分卷；
+再次插入同一个 U 盘时增量扫描，修改时间未变的目录直接沿用索引中的内容，不再读取闪存
+
+说明: 目录的修改时间只在其中增删、重命名条目时改变，原地改写文件内容不会改变它，
+这类修改要等所在目录发生变化或执行完整扫描 (full=True) 才会进入索引
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from .mountinfo import MountTable
+
+# 每个事务最多处理的目录数
+BATCH_DIRS = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS volumes (
+    uuid TEXT PRIMARY KEY,
+    mount_point TEXT,
+    last_scan REAL,
+    files INTEGER DEFAULT 0,
+    bytes INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    volume TEXT NOT NULL,
+    path TEXT NOT NULL,
+    parent TEXT,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    PRIMARY KEY (volume, path)
+);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (volume, parent);
+CREATE TABLE IF NOT EXISTS files (
+    volume TEXT NOT NULL,
+    path TEXT NOT NULL,
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (volume, path)
+);
+CREATE INDEX IF NOT EXISTS files_dir ON files (volume, dir);
+"""
+
+# 文件名的三元组全文索引（rowid 与 files 表一致），由触发器与 files 表保持同步
+_TRIGRAM_SCHEMA = """
+CREATE VIRTUAL TABLE file_names USING fts5(name, tokenize='trigram');
+CREATE TRIGGER IF NOT EXISTS files_names_insert AFTER INSERT ON files BEGIN
+    INSERT INTO file_names (rowid, name) VALUES (new.rowid, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS files_names_delete AFTER DELETE ON files BEGIN
+    DELETE FROM file_names WHERE rowid = old.rowid;
+END;
+INSERT INTO file_names (rowid, name) SELECT rowid, name FROM files;
+"""
+
+
+def default_db_path() -> str:
+    """索引数据库的默认位置"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'usb_monitor', 'file_index.sqlite3')
+
+
+def volume_uuid(mount_point: str, dev_root: str = '/dev', proc_root: str = '/proc') -> str:
+    """
+    卷的文件系统 UUID
+
+    Linux 上通过 /dev/disk/by-uuid 查找挂载源对应的 UUID；找不到时退回 statvfs 的 f_fsid，
+    再不行则使用挂载点路径的哈希（此时换个挂载点会被视为新卷）
+    """
+    by_uuid = os.path.join(dev_root, 'disk', 'by-uuid')
+    mount_point = os.path.abspath(mount_point)
+    source = None
+    for entry in MountTable(proc_root).read():
+        if entry.mount_point == mount_point and entry.is_block_device:
+            source = entry.source
+            break
+
+    if source:
+        try:
+            real_source = os.path.realpath(source)
+            for name in os.listdir(by_uuid):
+                if os.path.realpath(os.path.join(by_uuid, name)) == real_source:
+                    return name
+        except OSError:
+            pass
+
+    if hasattr(os, 'statvfs'):
+        try:
+            fsid = os.statvfs(mount_point).f_fsid
+            if fsid:
+                return f"fsid-{fsid:x}"
+        except OSError:
+            pass
+
+    return "path-" + hashlib.sha1(mount_point.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+
+
+class IndexStats:
+    """一次索引扫描的统计"""
+
+    def __init__(self, uuid: str):
+        self.uuid = uuid
+        self.dirs_scanned = 0
+        self.dirs_skipped = 0
+        self.files_added = 0
+        self.files_changed = 0
+        self.files_removed = 0
+        self.elapsed = 0.0
+        self.complete = False
+
+    def __repr__(self) -> str:
+        return (f"IndexStats({self.uuid!r}, scanned={self.dirs_scanned}, skipped={self.dirs_skipped}, "
+                f"+{self.files_added} ~{self.files_changed} -{self.files_removed}, {self.elapsed:.2f}s)")
+
+
+class FileIndex:
+    """基于 SQLite 的卷文件索引（同一实例可在多个线程中使用）"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or default_db_path()
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        # INSERT OR REPLACE 删除旧行时也要触发同步文件名索引的触发器
+        self._conn.execute('PRAGMA recursive_triggers=ON')
+        self._conn.executescript(_SCHEMA)
+        self.has_trigram = self._ensure_trigram_index()
+        self._conn.commit()
+
+    def _ensure_trigram_index(self) -> bool:
+        """创建文件名三元组索引；SQLite 不支持 FTS5 trigram（低于 3.34）时返回 False"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'file_names'").fetchone()
+        if exists:
+            return True
+        try:
+            self._conn.executescript(_TRIGRAM_SCHEMA)
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---------- 扫描 ----------
+
+    def scan(self, mount_point: str, uuid: Optional[str] = None, full: bool = False,
+             cancel_event: Optional[threading.Event] = None,
+             progress: Optional[Callable[[IndexStats], None]] = None) -> IndexStats:
+        """
+        增量扫描一个卷并更新索引
+
+        Args:
+            mount_point: 卷的挂载路径
+            uuid: 卷标识，默认由 volume_uuid() 得到
+            full: 忽略目录修改时间，重新读取所有目录
+            cancel_event: 被设置后停止扫描（已提交的批次保留，下次继续增量）
+            progress: 每提交一批后的回调
+
+        Returns:
+            IndexStats
+        """
+        start = time.perf_counter()
+        uuid = uuid or volume_uuid(mount_point)
+        stats = IndexStats(uuid)
+
+        with self._lock:
+            known_dirs: Dict[str, Tuple[int, int]] = {
+                path: (mtime_ns, inode) for path, mtime_ns, inode in
+                self._conn.execute('SELECT path, mtime_ns, inode FROM dirs WHERE volume = ?', (uuid,))
+            }
+
+        pending = ['']
+        batch = 0
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            rel_dir = pending.pop()
+            abs_dir = os.path.join(mount_point, rel_dir) if rel_dir else mount_point
+            try:
+                dir_stat = os.stat(abs_dir)
+            except OSError:
+                continue
+
+            signature = (dir_stat.st_mtime_ns, dir_stat.st_ino)
+            if not full and known_dirs.get(rel_dir) == signature:
+                stats.dirs_skipped += 1
+                with self._lock:
+                    pending.extend(path for (path,) in self._conn.execute(
+                        'SELECT path FROM dirs WHERE volume = ? AND parent = ?', (uuid, rel_dir)))
+                continue
+
+            subdirs = self._index_dir(uuid, mount_point, rel_dir, abs_dir, dir_stat, stats)
+            pending.extend(subdirs)
+            stats.dirs_scanned += 1
+            batch += 1
+            if batch >= BATCH_DIRS:
+                with self._lock:
+                    self._conn.commit()
+                batch = 0
+                if progress is not None:
+                    progress(stats)
+
+        stats.complete = not pending
+        with self._lock:
+            if stats.complete:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO volumes (uuid, mount_point, last_scan, files, bytes) '
+                    'SELECT ?, ?, ?, COUNT(*), COALESCE(SUM(size), 0) FROM files WHERE volume = ?',
+                    (uuid, mount_point, time.time(), uuid))
+            self._conn.commit()
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def _index_dir(self, uuid: str, mount_point: str, rel_dir: str, abs_dir: str,
+                   dir_stat: os.stat_result, stats: IndexStats) -> List[str]:
+        """重新读取一个目录，更新其中的文件记录，返回子目录的相对路径"""
+        files: Dict[str, Tuple[str, int, int, int]] = {}
+        subdirs: List[str] = []
+        try:
+            with os.scandir(abs_dir) as it:
+                for entry in it:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(rel_path)
+                            continue
+                        if entry.is_symlink():
+                            continue
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    files[rel_path] = (entry.name, st.st_size, st.st_mtime_ns, st.st_ino)
+        except OSError as e:
+            print(f"索引目录失败 {abs_dir}: {e}")
+            return []
+
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            old = {path: (size, mtime_ns, inode) for path, size, mtime_ns, inode in conn.execute(
+                'SELECT path, size, mtime_ns, inode FROM files WHERE volume = ? AND dir = ?', (uuid, rel_dir))}
+
+            upserts = []
+            for path, (name, size, mtime_ns, inode) in files.items():
+                previous = old.get(path)
+                if previous is None:
+                    stats.files_added += 1
+                elif previous != (size, mtime_ns, inode):
+                    stats.files_changed += 1
+                else:
+                    continue
+                upserts.append((uuid, path, rel_dir, name, size, mtime_ns, inode, now))
+            removed = [(uuid, path) for path in old if path not in files]
+            stats.files_removed += len(removed)
+
+            conn.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)', upserts)
+            conn.executemany('DELETE FROM files WHERE volume = ? AND path = ?', removed)
+
+            # 已不存在的子目录连同其下的全部记录一起删除
+            current = set(subdirs)
+            for (path,) in conn.execute('SELECT path FROM dirs WHERE volume = ? AND parent = ?',
+                                        (uuid, rel_dir)).fetchall():
+                if path not in current:
+                    stats.files_removed += self._drop_subtree(uuid, path)
+            # 新子目录先登记为未扫描（修改时间为空），扫描中途取消时下次仍能找到它们
+            conn.executemany('INSERT OR IGNORE INTO dirs VALUES (?, ?, ?, NULL, NULL)',
+                             [(uuid, path, rel_dir) for path in subdirs])
+
+            conn.execute('INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?)',
+                         (uuid, rel_dir, os.path.dirname(rel_dir) if rel_dir else None,
+                          dir_stat.st_mtime_ns, dir_stat.st_ino))
+        return subdirs
+
+    def _drop_subtree(self, uuid: str, rel_dir: str) -> int:
+        """删除目录及其下全部记录，返回删除的文件数（调用方持有锁）"""
+        prefix = rel_dir.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'
+        removed = self._conn.execute(
+            "DELETE FROM files WHERE volume = ? AND (dir = ? OR dir LIKE ? ESCAPE '\\')",
+            (uuid, rel_dir, prefix)).rowcount
+        self._conn.execute(
+            "DELETE FROM dirs WHERE volume = ? AND (path = ? OR path LIKE ? ESCAPE '\\')",
+            (uuid, rel_dir, prefix))
+        return removed
+
+    # ---------- 查询 ----------
+
+    def search(self, uuid: str, query: str, limit: int = 1000,
+               batch_size: int = 200) -> Iterator[List[Tuple[str, int, int]]]:
+        """
+        按文件名子串搜索（不区分大小写），分批产出 [(相对路径, 字节数, 修改时间 ns)]
+
+        三个字符及以上的查询使用三元组索引；更短的查询或不支持 trigram 时退回 LIKE 扫描
+        """
+        query = query.strip()
+        if not query:
+            return
+        if self.has_trigram and len(query) >= 3:
+            # CROSS JOIN 固定先查全文索引，再按 rowid 取文件记录
+            sql = ('SELECT f.path, f.size, f.mtime_ns FROM file_names CROSS JOIN files f '
+                   'ON f.rowid = file_names.rowid WHERE file_names MATCH ? AND f.volume = ? LIMIT ?')
+            params = ('"' + query.replace('"', '""') + '"', uuid, limit)
+        else:
+            pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            sql = ("SELECT path, size, mtime_ns FROM files WHERE volume = ? AND name LIKE ? ESCAPE '\\' LIMIT ?")
+            params = (uuid, pattern, limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    def volume_info(self, uuid: str) -> Optional[Dict[str, object]]:
+        """卷的汇总信息，未索引过时返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT mount_point, last_scan, files, bytes FROM volumes WHERE uuid = ?', (uuid,)).fetchone()
+        if row is None:
+            return None
+        return {'uuid': uuid, 'mount_point': row[0], 'last_scan': row[1], 'files': row[2], 'bytes': row[3]}
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卷索引线程
+在后台增量更新所选卷的文件索引
+"""
+
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .file_index import FileIndex
+
+
+class FileIndexThread(QThread):
+    """卷索引线程"""
+
+    # 信号定义
+    progress = pyqtSignal(object)        # IndexStats（每提交一批）
+    index_finished = pyqtSignal(object)  # IndexStats
+    error_occurred = pyqtSignal(str)     # 错误信息
+
+    def __init__(self, index: FileIndex, mount_point: str):
+        """
+        Args:
+            index: 共享的 FileIndex
+            mount_point: 卷的挂载路径
+        """
+        super().__init__()
+        self.index = index
+        self.mount_point = mount_point
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            stats = self.index.scan(self.mount_point, cancel_event=self._cancel_event,
+                                    progress=self.progress.emit)
+            self.index_finished.emit(stats)
+        except Exception as e:
+            self.error_occurred.emit(str(e))
+
+    def cancel(self):
+        """取消索引（已提交的部分保留）"""
+        self._cancel_event.set()
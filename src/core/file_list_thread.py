@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件列表线程
+在后台读取目录，界面只在读取完成后显示第一页
+"""
+
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .file_listing import DirectoryListing
+
+
+class FileListThread(QThread):
+    """目录读取线程"""
+
+    # 信号定义
+    progress = pyqtSignal(int)           # 已读取的条目数
+    listing_ready = pyqtSignal(object)   # 读取完成的 DirectoryListing
+    error_occurred = pyqtSignal(str)     # 错误信息
+
+    def __init__(self, directory: str, show_hidden: bool = False,
+                 sort_key: str = 'name', descending: bool = False):
+        """
+        Args:
+            directory: 目录路径
+            show_hidden: 是否显示隐藏文件
+            sort_key: 排序键（见 file_listing.SORT_KEYS）
+            descending: 是否倒序
+        """
+        super().__init__()
+        self.listing = DirectoryListing(directory, show_hidden, sort_key, descending)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        if self.listing.load(self._cancel_event, self.progress.emit):
+            self.listing_ready.emit(self.listing)
+        elif self.listing.error:
+            self.error_occurred.emit(self.listing.error)
+
+    def cancel(self):
+        """取消读取（已切换到其他目录时）"""
+        self._cancel_event.set()
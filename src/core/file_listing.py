@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录列表
+基于 os.scandir，复用 DirEntry 缓存的类型信息，每个条目最多 stat 一次；
+返回原始的字节数和修改时间，由界面负责格式化，并支持排序、分页和取消，
+单个目录有数万个文件时也不会阻塞界面
+"""
+
+import os
+import threading
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+def format_size(size_bytes: Optional[int]) -> str:
+    """
+    格式化文件大小
+
+    Args:
+        size_bytes: 字节数，None 表示未知（例如文件夹）
+
+    Returns:
+        格式化的大小字符串
+    """
+    if size_bytes is None:
+        return "N/A"
+    if size_bytes < 1024:
+        return f"{size_bytes} B"
+    elif size_bytes < 1024**2:
+        return f"{size_bytes/1024:.2f} KB"
+    elif size_bytes < 1024**3:
+        return f"{size_bytes/(1024**2):.2f} MB"
+    else:
+        return f"{size_bytes/(1024**3):.2f} GB"
+
+
+class FileEntry:
+    """目录中的一个条目"""
+
+    __slots__ = ('name', 'path', 'is_dir', 'size', 'mtime')
+
+    def __init__(self, name: str, path: str, is_dir: bool, size: Optional[int], mtime: Optional[float]):
+        """
+        Args:
+            name: 文件名
+            path: 完整路径
+            is_dir: 是否为文件夹
+            size: 文件大小（字节），文件夹或无法读取时为 None
+            mtime: 修改时间（Unix 时间戳），无法读取时为 None
+        """
+        self.name = name
+        self.path = path
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry) -> 'FileEntry':
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        try:
+            # Windows 上 scandir 已带回 stat 信息，Linux 上这里是唯一一次 stat
+            stat = entry.stat()
+            size = None if is_dir else stat.st_size
+            mtime = stat.st_mtime
+        except OSError:
+            size = None
+            mtime = None
+        return cls(entry.name, entry.path, is_dir, size, mtime)
+
+    def to_dict(self) -> Dict[str, object]:
+        """兼容 DriveManager.list_files 原有的字典格式，并附带原始数值"""
+        return {
+            'name': self.name,
+            'type': "📁 文件夹" if self.is_dir else "📄 文件",
+            'size': format_size(self.size),
+            'path': self.path,
+            'is_dir': self.is_dir,
+            'size_bytes': self.size,
+            'mtime': self.mtime,
+        }
+
+    def __repr__(self) -> str:
+        return f"FileEntry({self.name!r}, dir={self.is_dir}, size={self.size})"
+
+
+# 排序键；文件夹始终排在文件前面
+SORT_KEYS: Dict[str, Callable[[FileEntry], object]] = {
+    'name': lambda entry: entry.name.lower(),
+    'type': lambda entry: (os.path.splitext(entry.name)[1].lower(), entry.name.lower()),
+    'size': lambda entry: (entry.size or 0, entry.name.lower()),
+    'mtime': lambda entry: (entry.mtime or 0.0, entry.name.lower()),
+}
+
+
+def iter_entries(directory: str, show_hidden: bool = False,
+                 cancel_event: Optional[threading.Event] = None) -> Iterator[FileEntry]:
+    """
+    按文件系统返回的顺序逐个产出目录条目
+
+    Args:
+        directory: 目录路径
+        show_hidden: 是否包含以 '.' 开头的条目
+        cancel_event: 被设置后停止产出
+
+    Raises:
+        OSError: 目录无法打开
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if not show_hidden and entry.name.startswith('.'):
+                continue
+            yield FileEntry.from_dir_entry(entry)
+
+
+class ListingPage:
+    """一页列表结果"""
+
+    def __init__(self, entries: List[FileEntry], offset: int, total: int):
+        self.entries = entries
+        self.offset = offset
+        self.total = total
+
+    @property
+    def has_more(self) -> bool:
+        return self.offset + len(self.entries) < self.total
+
+    def __repr__(self) -> str:
+        return f"ListingPage(offset={self.offset}, count={len(self.entries)}, total={self.total})"
+
+
+class DirectoryListing:
+    """
+    一个目录的完整列表，读取一次后可在内存中重新排序和分页
+
+    用法:
+        listing = DirectoryListing(path)
+        if listing.load(cancel_event):
+            first = listing.page(0, 500)
+    """
+
+    def __init__(self, directory: str, show_hidden: bool = False,
+                 sort_key: str = 'name', descending: bool = False):
+        self.directory = directory
+        self.show_hidden = show_hidden
+        self.sort_key = sort_key if sort_key in SORT_KEYS else 'name'
+        self.descending = descending
+        self.entries: List[FileEntry] = []
+        self.error: Optional[str] = None
+
+    @property
+    def total(self) -> int:
+        return len(self.entries)
+
+    def load(self, cancel_event: Optional[threading.Event] = None,
+             progress: Optional[Callable[[int], None]] = None, progress_every: int = 2000) -> bool:
+        """
+        读取目录
+
+        Args:
+            cancel_event: 被设置后中止读取
+            progress: 进度回调，参数为已读取的条目数
+            progress_every: 每读取多少条回调一次
+
+        Returns:
+            True 表示完整读取；被取消或目录无法打开时返回 False（后者记录在 error 中）
+        """
+        entries = []
+        try:
+            for entry in iter_entries(self.directory, self.show_hidden, cancel_event):
+                entries.append(entry)
+                if progress is not None and len(entries) % progress_every == 0:
+                    progress(len(entries))
+        except OSError as e:
+            self.error = str(e)
+            print(f"读取文件列表失败: {self.error}")
+            return False
+
+        if cancel_event is not None and cancel_event.is_set():
+            return False
+
+        self.entries = entries
+        self.sort(self.sort_key, self.descending)
+        return True
+
+    def sort(self, sort_key: str, descending: bool = False) -> None:
+        """按指定键重新排序（不重新读取磁盘）"""
+        self.sort_key = sort_key if sort_key in SORT_KEYS else 'name'
+        self.descending = descending
+        key = SORT_KEYS[self.sort_key]
+        self.entries.sort(key=key, reverse=descending)
+        # 稳定排序：再按是否为文件夹排一次，文件夹始终在前
+        self.entries.sort(key=lambda entry: not entry.is_dir)
+
+    def page(self, offset: int = 0, limit: int = 500) -> ListingPage:
+        """取出 [offset, offset + limit) 范围内的条目"""
+        offset = max(0, offset)
+        return ListingPage(self.entries[offset:offset + limit], offset, len(self.entries))
+
+
+def list_page(directory: str, offset: int = 0, limit: int = 500, sort_key: str = 'name',
+              descending: bool = False, show_hidden: bool = False,
+              cancel_event: Optional[threading.Event] = None) -> Optional[ListingPage]:
+    """
+    读取目录并返回其中一页
+
+    Returns:
+        ListingPage；被取消或目录无法打开时返回 None
+    """
+    listing = DirectoryListing(directory, show_hidden, sort_key, descending)
+    if not listing.load(cancel_event):
+        return None
+    return listing.page(offset, limit)
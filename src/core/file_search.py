@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件名搜索
+在所有已挂载的卷中按文件名子串搜索：已建立索引的卷查询 FileIndex 的三元组索引，
+没有索引的卷退回实时遍历；结果分批产出，界面可以边找边显示
+"""
+
+import os
+import threading
+import time
+from typing import Iterator, List, Optional
+
+from .file_index import FileIndex, volume_uuid
+
+
+class SearchHit:
+    """一条搜索结果"""
+
+    __slots__ = ('volume', 'path', 'size', 'mtime')
+
+    def __init__(self, volume: str, path: str, size: Optional[int], mtime: Optional[float]):
+        """
+        Args:
+            volume: 所在卷的挂载路径
+            path: 文件完整路径
+            size: 字节数
+            mtime: 修改时间（Unix 时间戳）
+        """
+        self.volume = volume
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    def __repr__(self) -> str:
+        return f"SearchHit({self.path!r}, {self.size})"
+
+
+class FileSearch:
+    """跨卷文件名搜索"""
+
+    def __init__(self, index: Optional[FileIndex] = None, limit: int = 2000,
+                 batch_size: int = 100, flush_interval: float = 0.1):
+        """
+        Args:
+            index: 文件索引，None 时所有卷都实时遍历
+            limit: 最多返回的结果数
+            batch_size: 每批产出的结果数
+            flush_interval: 实时遍历时未满一批的结果最长等待时间（秒）
+        """
+        self.index = index
+        self.limit = limit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def search(self, query: str, volumes: List[str],
+               cancel_event: Optional[threading.Event] = None) -> Iterator[List[SearchHit]]:
+        """
+        在多个卷中搜索，分批产出结果
+
+        先产出所有已索引卷的结果（毫秒级），再逐个实时遍历未索引的卷
+        """
+        query = query.strip()
+        if not query:
+            return
+
+        remaining = self.limit
+        unindexed = []
+        for volume in volumes:
+            uuid = self._indexed_uuid(volume)
+            if uuid is None:
+                unindexed.append(volume)
+                continue
+            for rows in self.index.search(uuid, query, remaining, self.batch_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                hits = [SearchHit(volume, os.path.join(volume, path), size,
+                                  mtime_ns / 1e9 if mtime_ns is not None else None)
+                        for path, size, mtime_ns in rows]
+                remaining -= len(hits)
+                yield hits
+            if remaining <= 0:
+                return
+
+        for volume in unindexed:
+            for hits in self.walk(volume, query, remaining, cancel_event):
+                remaining -= len(hits)
+                yield hits
+            if remaining <= 0 or (cancel_event is not None and cancel_event.is_set()):
+                return
+
+    def _indexed_uuid(self, volume: str) -> Optional[str]:
+        if self.index is None:
+            return None
+        uuid = volume_uuid(volume)
+        return uuid if self.index.volume_info(uuid) is not None else None
+
+    def walk(self, volume: str, query: str, limit: int,
+             cancel_event: Optional[threading.Event] = None) -> Iterator[List[SearchHit]]:
+        """实时遍历一个卷，按文件名子串（不区分大小写）匹配"""
+        needle = query.casefold()
+        batch: List[SearchHit] = []
+        found = 0
+        last_flush = time.monotonic()
+        pending = [volume]
+        while pending:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                                continue
+                        except OSError:
+                            continue
+                        if needle not in entry.name.casefold():
+                            continue
+                        try:
+                            st = entry.stat(follow_symlinks=False)
+                            size, mtime = st.st_size, st.st_mtime
+                        except OSError:
+                            size, mtime = None, None
+                        batch.append(SearchHit(volume, entry.path, size, mtime))
+                        found += 1
+                        if len(batch) >= self.batch_size or found >= limit:
+                            yield batch
+                            batch = []
+                        if found >= limit:
+                            return
+            except OSError:
+                continue
+            # 匹配稀少时也要及时把已找到的结果交给界面
+            if batch and time.monotonic() - last_flush >= self.flush_interval:
+                yield batch
+                batch = []
+                last_flush = time.monotonic()
+        if batch:
+            yield batch
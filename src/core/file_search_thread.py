@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件搜索线程
+在后台执行跨卷文件名搜索，找到一批结果就发出一批
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .file_index import FileIndex
+from .file_search import FileSearch
+
+
+class FileSearchThread(QThread):
+    """文件搜索线程"""
+
+    # 信号定义
+    results_found = pyqtSignal(list)           # 一批 SearchHit
+    search_finished = pyqtSignal(int, float)   # 结果总数、耗时（秒）
+
+    def __init__(self, query: str, volumes: List[str], index: Optional[FileIndex] = None):
+        """
+        Args:
+            query: 文件名中包含的文字
+            volumes: 要搜索的卷（挂载路径）
+            index: 文件索引，已索引的卷直接查询索引
+        """
+        super().__init__()
+        self.query = query
+        self.volumes = volumes
+        self.search = FileSearch(index)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        total = 0
+        for hits in self.search.search(self.query, self.volumes, self._cancel_event):
+            total += len(hits)
+            self.results_found.emit(hits)
+        if not self._cancel_event.is_set():
+            self.search_finished.emit(total, time.perf_counter() - start)
+
+    def cancel(self):
+        """取消搜索"""
+        self._cancel_event.set()
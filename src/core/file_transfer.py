@@ -2,74 +2,96 @@
 # -*- coding: utf-8 -*-
 """
 文件传输线程
-负责异步文件传输，支持进度显示和速度计算
+负责异步文件传输，支持进度显示和速度计算（进度按时间合并后以数值发出）；
+数据由 CopyEngine 尽量在内核中复制（copy_file_range / sendfile），不经过 Python；
+大文件的进度记录在传输日志中，取消或出错后再次上传同一文件会从断点继续
 """
 
 import os
-import time
+import threading
+from typing import Optional
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from .drive_manager import DriveManager
+from .file_listing import format_size
+from .copy_engine import CopyEngine
+from .transfer_journal import TransferJournal, part_path, resumable_copy
+from .transfer_progress import ProgressReporter
+
 
 class FileTransferThread(QThread):
     """文件传输线程类"""
     
     # 信号定义
-    progress = pyqtSignal(int, str)  # 进度百分比和传输速度
+    progress = pyqtSignal(object)  # TransferProgress（最多每秒 10 次）
     finished = pyqtSignal(bool, str)  # 是否成功和消息
     
-    def __init__(self, source: str, destination: str, chunk_size: int = 1024 * 1024):
+    def __init__(self, source: str, destination: str, chunk_size: Optional[int] = None):
         """
         初始化文件传输线程
         
         Args:
             source: 源文件路径
             destination: 目标文件路径
-            chunk_size: 每次读取的块大小（字节），默认 1MB
+            chunk_size: 每次读取的块大小（字节），None 时按目标卷的 I/O 参数选择
         """
         super().__init__()
         self.source = source
         self.destination = destination
         self.chunk_size = chunk_size
-        self._is_cancelled = False
+        self._cancel_event = threading.Event()
+        self.copy_method = ''  # 实际使用的复制方式
     
     def run(self):
         """执行文件传输"""
         try:
             file_size = os.path.getsize(self.source)
-            start_time = time.time()
             
-            with open(self.source, 'rb') as src:
-                with open(self.destination, 'wb') as dst:
-                    copied = 0
-                    
-                    while not self._is_cancelled:
-                        chunk = src.read(self.chunk_size)
-                        if not chunk:
-                            break
-                        
-                        dst.write(chunk)
-                        copied += len(chunk)
-                        
-                        # 计算进度和速度
-                        progress_percent = int((copied / file_size) * 100)
-                        elapsed = time.time() - start_time
-                        
-                        if elapsed > 0:
-                            speed = (copied / elapsed) / (1024 * 1024)  # MB/s
-                            self.progress.emit(progress_percent, f"{speed:.2f} MB/s")
+            profile = DriveManager.get_io_profile(os.path.dirname(os.path.abspath(self.destination)))
+            if not profile.fits(file_size):
+                self.finished.emit(False, f"文件过大: {profile.fs_type} 文件系统的单个文件不能超过 "
+                                          f"{format_size(profile.max_file_size)}")
+                return
+            engine = CopyEngine(self.chunk_size or profile.transfer_chunk_size)
+            reporter = ProgressReporter(file_size, self.progress.emit)
+            journal = TransferJournal()
+        except Exception as e:
+            self.finished.emit(False, f"文件传输失败: {str(e)}")
+            return
+        
+        try:
+            result = resumable_copy(engine, self.source, self.destination, file_size, journal,
+                                    cancel_event=self._cancel_event, progress=reporter.update,
+                                    on_start=reporter.resume_from)
+            self.copy_method = result.method
             
-            if self._is_cancelled:
-                # 如果被取消，删除部分传输的文件
-                if os.path.exists(self.destination):
-                    os.remove(self.destination)
-                self.finished.emit(False, "传输已取消")
+            if result.cancelled:
+                if TransferJournal.covers(file_size):
+                    self.finished.emit(False, f"传输已取消，已保留 {format_size(result.copied)}，"
+                                              f"再次上传同一文件时会从断点继续")
+                else:
+                    # 小文件不续传，删除 .part 文件
+                    self._remove_partial()
+                    self.finished.emit(False, "传输已取消")
             else:
+                reporter.finish()
                 filename = os.path.basename(self.source)
                 self.finished.emit(True, f"文件上传成功: {filename}")
                 
         except Exception as e:
+            if not TransferJournal.covers(file_size):
+                self._remove_partial()
             self.finished.emit(False, f"文件传输失败: {str(e)}")
+        finally:
+            journal.close()
+    
+    def _remove_partial(self):
+        try:
+            if os.path.exists(part_path(self.destination)):
+                os.remove(part_path(self.destination))
+        except OSError:
+            pass
     
     def cancel(self):
         """取消传输"""
-        self._is_cancelled = True
+        self._cancel_event.set()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件夹大小统计
+用线程池并行遍历子目录，统计过程中不断回报部分结果；
+每个目录自身的文件大小按 (设备号, inode, 修改时间) 缓存，
+再次统计时未变化的目录只需一次 stat，不必重新列出其中的文件；
+硬链接文件单独记录在缓存中，去重只在每次统计内进行，
+因此共享 inode 的不同子树分别统计时都能计入这些文件
+
+说明: 目录的修改时间只在其中增删、重命名条目时改变，原地改写文件内容不会改变它，
+这种情况下缓存的大小可能偏旧，手动刷新时可清空缓存
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class DirUsage:
+    """单个目录自身（不含子目录）的占用"""
+
+    __slots__ = ('mtime_ns', 'bytes', 'files', 'subdirs', 'links')
+
+    def __init__(self, mtime_ns: int, bytes_: int, files: int, subdirs: List[str],
+                 links: Optional[List[Tuple[int, int, int]]] = None):
+        """
+        Args:
+            mtime_ns: 目录的修改时间
+            bytes_: 链接数为 1 的文件的大小合计
+            files: 链接数为 1 的文件数
+            subdirs: 子目录路径
+            links: 硬链接文件 [(st_dev, st_ino, 大小)]，统计时再去重
+        """
+        self.mtime_ns = mtime_ns
+        self.bytes = bytes_
+        self.files = files
+        self.subdirs = subdirs
+        self.links = links or []
+
+
+class FolderSizeCache:
+    """按 (st_dev, st_ino) 索引、以 st_mtime_ns 校验的目录占用缓存（线程安全）"""
+
+    def __init__(self, max_entries: int = 200000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[int, int], DirUsage] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, stat: os.stat_result) -> Optional[DirUsage]:
+        with self._lock:
+            usage = self._entries.get((stat.st_dev, stat.st_ino))
+            if usage is not None and usage.mtime_ns == stat.st_mtime_ns:
+                self.hits += 1
+                return usage
+            self.misses += 1
+            return None
+
+    def put(self, stat: os.stat_result, usage: DirUsage) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                # 超出上限时整体丢弃，避免在大容量硬盘上无限增长
+                self._entries.clear()
+            self._entries[(stat.st_dev, stat.st_ino)] = usage
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FolderSize:
+    """一次统计的结果"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.bytes = 0
+        self.files = 0
+        self.dirs = 0
+        self.errors = 0
+        self.complete = False
+
+    def __repr__(self) -> str:
+        state = 'complete' if self.complete else 'partial'
+        return f"FolderSize({self.path!r}, {self.bytes} B, {self.files} files, {self.dirs} dirs, {state})"
+
+
+class FolderSizeEngine:
+    """并行文件夹大小统计"""
+
+    def __init__(self, max_workers: int = 4, cache: Optional[FolderSizeCache] = None):
+        """
+        Args:
+            max_workers: 并行遍历的线程数（U 盘上 2~4 个即可，过多反而增加寻道）
+            cache: 目录占用缓存，默认使用进程内共享的 folder_size_cache
+        """
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else folder_size_cache
+
+    def compute(self, path: str, cancel_event: Optional[threading.Event] = None,
+                progress: Optional[Callable[[FolderSize], None]] = None,
+                progress_interval: float = 0.2) -> FolderSize:
+        """
+        统计文件夹（含所有子目录）的大小
+
+        不跟随符号链接，不跨越到其他文件系统，硬链接文件只计算一次
+
+        Args:
+            path: 文件夹路径
+            cancel_event: 被设置后停止统计，返回的结果 complete 为 False
+            progress: 部分结果回调（在调用线程中执行）
+            progress_interval: 回调的最小间隔（秒）
+
+        Returns:
+            FolderSize
+        """
+        result = FolderSize(path)
+        try:
+            root_dev = os.stat(path).st_dev
+        except OSError:
+            result.errors += 1
+            return result
+
+        lock = threading.Lock()
+        outstanding = [0]
+        done = threading.Event()
+        seen_links = set()
+
+        def cancelled() -> bool:
+            return cancel_event is not None and cancel_event.is_set()
+
+        def submit(directory: str) -> None:
+            with lock:
+                outstanding[0] += 1
+            pool.submit(visit, directory)
+
+        def visit(directory: str) -> None:
+            try:
+                if cancelled():
+                    return
+                usage = self._dir_usage(directory, root_dev)
+                with lock:
+                    if usage is None:
+                        result.errors += 1
+                        return
+                    result.bytes += usage.bytes
+                    result.files += usage.files
+                    result.dirs += 1
+                    # 硬链接文件在本次统计中只计算一次
+                    for dev, ino, size in usage.links:
+                        if (dev, ino) not in seen_links:
+                            seen_links.add((dev, ino))
+                            result.bytes += size
+                            result.files += 1
+                for subdir in usage.subdirs:
+                    submit(subdir)
+            finally:
+                with lock:
+                    outstanding[0] -= 1
+                    if outstanding[0] == 0:
+                        done.set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            submit(path)
+            while not done.wait(progress_interval):
+                if progress is not None:
+                    progress(result)
+                if cancelled():
+                    break
+            # 取消时等待已开始的任务结束，未开始的任务会立即返回
+            done.wait()
+
+        result.complete = not cancelled()
+        return result
+
+    def _dir_usage(self, directory: str, root_dev: int) -> Optional[DirUsage]:
+        """读取单个目录自身的占用（优先使用缓存），硬链接文件不去重"""
+        try:
+            stat = os.stat(directory)
+        except OSError:
+            return None
+
+        usage = self.cache.get(stat)
+        if usage is not None:
+            return usage
+
+        total = 0
+        files = 0
+        subdirs = []
+        links = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                            continue
+                        if entry.is_symlink():
+                            continue
+                        entry_stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if entry_stat.st_nlink > 1:
+                        links.append((entry_stat.st_dev, entry_stat.st_ino, entry_stat.st_size))
+                        continue
+                    total += entry_stat.st_size
+                    files += 1
+        except OSError:
+            return None
+
+        # 其他文件系统挂载在子目录上时不统计
+        subdirs = [subdir for subdir in subdirs if self._same_device(subdir, root_dev)]
+        usage = DirUsage(stat.st_mtime_ns, total, files, subdirs, links)
+        self.cache.put(stat, usage)
+        return usage
+
+    @staticmethod
+    def _same_device(path: str, device: int) -> bool:
+        try:
+            return os.lstat(path).st_dev == device
+        except OSError:
+            return False
+
+
+# 进程内共享缓存
+folder_size_cache = FolderSizeCache()
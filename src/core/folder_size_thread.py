@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件夹大小统计线程
+依次统计当前页中的文件夹，统计过程中持续发出部分结果
+"""
+
+import threading
+from typing import List
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .folder_size import FolderSizeEngine
+
+
+class FolderSizeThread(QThread):
+    """文件夹大小统计线程"""
+
+    # 信号定义
+    size_updated = pyqtSignal(str, object, int, bool)  # 路径、字节数、文件数、是否已完成
+
+    def __init__(self, folders: List[str], max_workers: int = 4):
+        """
+        Args:
+            folders: 要统计的文件夹路径列表
+            max_workers: 每个文件夹并行遍历的线程数
+        """
+        super().__init__()
+        self.folders = folders
+        self.engine = FolderSizeEngine(max_workers)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        for folder in self.folders:
+            if self._cancel_event.is_set():
+                break
+            result = self.engine.compute(
+                folder, self._cancel_event,
+                lambda partial: self.size_updated.emit(partial.path, partial.bytes, partial.files, False))
+            if result.complete:
+                self.size_updated.emit(result.path, result.bytes, result.files, True)
+
+    def cancel(self):
+        """取消统计"""
+        self._cancel_event.set()
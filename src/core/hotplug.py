@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+热插拔监听
+在后台线程读取 uevent 事件，去抖后通知界面刷新；
+事件源无法打开时退回定时轮询
+"""
+
+from typing import List, Dict, Optional
+
+from PyQt6.QtCore import QObject, QThread, QTimer, pyqtSignal
+
+from .uevent import default_event_source, is_watched_event
+
+
+class HotplugThread(QThread):
+    """事件读取线程"""
+
+    # 信号: 单个 uevent 事件
+    event_received = pyqtSignal(dict)
+
+    def __init__(self, source, poll_timeout: float = 0.5):
+        """
+        Args:
+            source: 已打开的事件源（需实现 read(timeout) / close()）
+            poll_timeout: 每次读取的等待时间，决定停止线程的响应速度
+        """
+        super().__init__()
+        self.source = source
+        self.poll_timeout = poll_timeout
+        self._is_stopped = False
+
+    def run(self):
+        try:
+            while not self._is_stopped:
+                for event in self.source.read(self.poll_timeout):
+                    if is_watched_event(event):
+                        self.event_received.emit(event)
+        finally:
+            self.source.close()
+
+    def stop(self):
+        """停止读取"""
+        self._is_stopped = True
+
+
+class HotplugWatcher(QObject):
+    """热插拔监听器，对事件去抖后统一发出变化通知"""
+
+    # 信号: 去抖窗口内收到的事件列表；定时回退模式下为空列表
+    devices_changed = pyqtSignal(list)
+
+    def __init__(self, source=None, debounce_ms: int = 300,
+                 fallback_interval_ms: int = 10000, parent: Optional[QObject] = None):
+        """
+        Args:
+            source: 事件源，默认为 netlink uevent 套接字；测试时可传入 FakeUeventSource
+            debounce_ms: 去抖时间，一次插拔通常会产生十几个事件
+            fallback_interval_ms: 事件源不可用时的轮询间隔
+        """
+        super().__init__(parent)
+        self.source = source if source is not None else default_event_source()
+        self.fallback_interval_ms = fallback_interval_ms
+        self.thread = None
+        self._pending_events: List[Dict[str, str]] = []
+        self._paused = False
+        self._missed_poll = False
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._flush)
+
+        self._fallback_timer = QTimer(self)
+        self._fallback_timer.timeout.connect(self._on_poll)
+
+    @property
+    def is_event_driven(self) -> bool:
+        """是否正在使用事件源（而不是定时轮询）"""
+        return self.thread is not None
+
+    def start(self) -> bool:
+        """
+        开始监听
+
+        Returns:
+            True 表示事件驱动，False 表示已退回定时轮询
+        """
+        if self.source.open():
+            self.thread = HotplugThread(self.source)
+            self.thread.event_received.connect(self._on_event)
+            self.thread.start()
+            return True
+
+        self._fallback_timer.start(self.fallback_interval_ms)
+        return False
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused
+
+    def pause(self) -> None:
+        """暂停通知（例如测速期间）；期间收到的事件保留到 resume() 时一起发出"""
+        self._paused = True
+
+    def resume(self) -> None:
+        """恢复通知；暂停期间有事件或错过了轮询时补发一次变化通知"""
+        self._paused = False
+        if self._pending_events:
+            # 去抖计时仍在进行时由计时器发出
+            if not self._debounce_timer.isActive():
+                self._flush()
+        elif self._missed_poll:
+            self._missed_poll = False
+            self.devices_changed.emit([])
+
+    def stop(self) -> None:
+        """停止监听"""
+        self._fallback_timer.stop()
+        self._debounce_timer.stop()
+        if self.thread is not None:
+            self.thread.stop()
+            self.thread.wait()
+            self.thread = None
+
+    def _on_event(self, event: dict):
+        self._pending_events.append(event)
+        # 每个新事件都重新计时，直到事件流安静下来
+        self._debounce_timer.start()
+
+    def _on_poll(self):
+        if self._paused:
+            self._missed_poll = True
+            return
+        self.devices_changed.emit([])
+
+    def _flush(self):
+        if self._paused:
+            return
+        self._missed_poll = False
+        events = self._pending_events
+        self._pending_events = []
+        if events:
+            self.devices_changed.emit(events)
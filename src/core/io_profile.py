@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+卷的 I/O 参数
+汇总文件系统块大小 (statvfs)、簇大小、文件系统类型以及块设备 queue/ 下的
+扇区大小、最佳 I/O 大小、单次请求上限等，供文件传输和测速选择缓冲区大小与对齐方式
+"""
+
+import math
+import mmap
+import os
+import platform
+from typing import Optional
+
+from .mountinfo import MountTable
+
+# FAT32 单个文件的最大字节数 (4 GiB - 1)
+FAT32_MAX_FILE_SIZE = 4 * 1024 ** 3 - 1
+
+# 以该大小为上限的文件系统（名称小写比较）
+_FAT_TYPES = {'vfat', 'fat', 'fat12', 'fat16', 'fat32', 'msdos', 'msdos (fat32)', 'ms-dos fat32', 'ms-dos fat16'}
+
+KIB = 1024
+MIB = 1024 * 1024
+
+
+def _round_up(value: int, multiple: int) -> int:
+    return -(-value // multiple) * multiple if multiple > 1 else value
+
+
+def aligned_buffer(size: int) -> mmap.mmap:
+    """按内存页对齐的可写缓冲区（匿名 mmap），可直接用于 readinto / 无缓冲 I/O"""
+    return mmap.mmap(-1, size)
+
+
+class IOProfile:
+    """一个卷的 I/O 参数，未知的字段为 0"""
+
+    def __init__(self, path: str, fs_type: str = 'Unknown'):
+        self.path = path
+        self.fs_type = fs_type
+        self.block_size = 0            # statvfs f_bsize，文件系统建议的 I/O 块大小
+        self.fragment_size = 0         # statvfs f_frsize / Windows 簇大小，分配单位
+        self.logical_block_size = 0    # 逻辑扇区大小
+        self.physical_block_size = 0   # 物理扇区大小
+        self.optimal_io_size = 0       # 设备报告的最佳 I/O 大小（多数 U 盘为 0）
+        self.max_request_size = 0      # 单次请求上限 (max_sectors_kb)
+        self.read_ahead = 0            # 预读字节数
+        self.rotational = None         # 是否机械硬盘，未知为 None
+
+    @property
+    def is_fat(self) -> bool:
+        return self.fs_type.lower() in _FAT_TYPES
+
+    @property
+    def max_file_size(self) -> Optional[int]:
+        """单个文件的大小上限，没有已知限制时为 None"""
+        return FAT32_MAX_FILE_SIZE if self.is_fat else None
+
+    def fits(self, size: int) -> bool:
+        """该大小的文件能否写入此卷"""
+        limit = self.max_file_size
+        return limit is None or size <= limit
+
+    @property
+    def alignment(self) -> int:
+        """缓冲区大小应对齐到的字节数：扇区、簇与内存页中的最大者"""
+        return max(self.logical_block_size, self.physical_block_size,
+                   self.fragment_size, mmap.PAGESIZE)
+
+    def buffer_size(self, minimum: int = MIB, maximum: int = 8 * MIB) -> int:
+        """
+        推荐的读写缓冲区大小
+
+        取最佳 I/O 大小与 minimum 中的较大者，向上取整到单次请求上限与 alignment 的
+        公倍数（让每次写入恰好拆成完整、对齐的请求），不超过 maximum
+        """
+        unit = self.alignment
+        if self.max_request_size:
+            unit = unit * self.max_request_size // math.gcd(unit, self.max_request_size)
+            if unit > maximum:
+                # 请求上限与对齐无法同时满足时只保证对齐
+                unit = self.alignment
+        size = _round_up(max(minimum, self.optimal_io_size), unit)
+        if size > maximum:
+            size = max(unit, maximum // unit * unit)
+        return size
+
+    @property
+    def transfer_chunk_size(self) -> int:
+        """文件传输的块大小"""
+        return self.buffer_size(MIB, 8 * MIB)
+
+    @property
+    def speed_test_buffer_size(self) -> int:
+        """测速的块大小（大块以减少系统调用对结果的影响）"""
+        return self.buffer_size(4 * MIB, 16 * MIB)
+
+    def __repr__(self) -> str:
+        return (f"IOProfile({self.path!r}, {self.fs_type}, bsize={self.block_size}, "
+                f"frsize={self.fragment_size}, sector={self.logical_block_size}/{self.physical_block_size}, "
+                f"opt={self.optimal_io_size}, max_req={self.max_request_size})")
+
+    @staticmethod
+    def probe(path: str, fs_type: Optional[str] = None,
+              proc_root: str = '/proc', sysfs_root: str = '/sys') -> 'IOProfile':
+        """
+        读取路径所在卷的 I/O 参数，读取失败的字段保持为 0
+
+        Args:
+            path: 卷上的任意路径（通常是挂载点或目标目录）
+            fs_type: 已知的文件系统类型；Linux 上为 None 时从挂载表读取
+        """
+        profile = IOProfile(path, fs_type or 'Unknown')
+
+        if hasattr(os, 'statvfs'):
+            try:
+                st = os.statvfs(path)
+                profile.block_size = st.f_bsize
+                profile.fragment_size = st.f_frsize
+            except OSError:
+                pass
+        elif platform.system() == "Windows":
+            IOProfile._probe_windows(profile)
+
+        if platform.system() == "Linux":
+            table = MountTable(proc_root, sysfs_root)
+            mount = table.find(path) if table.is_available() else None
+            if mount is not None:
+                if fs_type is None:
+                    profile.fs_type = mount.fs_type
+                disk_dir = table.disk_dir(mount)
+                if disk_dir is not None:
+                    IOProfile._read_queue(profile, os.path.join(disk_dir, 'queue'))
+
+        return profile
+
+    @staticmethod
+    def _read_queue(profile: 'IOProfile', queue_dir: str) -> None:
+        """读取块设备 queue/ 下的属性"""
+        def read_int(name: str) -> int:
+            try:
+                with open(os.path.join(queue_dir, name), 'r') as f:
+                    return int(f.read().strip())
+            except (OSError, ValueError):
+                return 0
+
+        profile.logical_block_size = read_int('logical_block_size')
+        profile.physical_block_size = read_int('physical_block_size')
+        profile.optimal_io_size = read_int('optimal_io_size')
+        profile.max_request_size = read_int('max_sectors_kb') * KIB
+        profile.read_ahead = read_int('read_ahead_kb') * KIB
+        if os.path.exists(os.path.join(queue_dir, 'rotational')):
+            profile.rotational = read_int('rotational') == 1
+
+    @staticmethod
+    def _probe_windows(profile: 'IOProfile') -> None:
+        """Windows 上通过 GetDiskFreeSpaceW 读取扇区与簇大小"""
+        try:
+            import ctypes
+            root = os.path.splitdrive(os.path.abspath(profile.path))[0] + '\\'
+            sectors_per_cluster = ctypes.c_ulong(0)
+            bytes_per_sector = ctypes.c_ulong(0)
+            free_clusters = ctypes.c_ulong(0)
+            total_clusters = ctypes.c_ulong(0)
+            if ctypes.windll.kernel32.GetDiskFreeSpaceW(
+                    ctypes.c_wchar_p(root), ctypes.byref(sectors_per_cluster), ctypes.byref(bytes_per_sector),
+                    ctypes.byref(free_clusters), ctypes.byref(total_clusters)):
+                profile.logical_block_size = bytes_per_sector.value
+                profile.fragment_size = sectors_per_cluster.value * bytes_per_sector.value
+                profile.block_size = profile.fragment_size
+            if profile.fs_type == 'Unknown':
+                # 文件系统类型同样用系统调用读取，不启动 wmic / PowerShell
+                fs_name = ctypes.create_unicode_buffer(64)
+                if ctypes.windll.kernel32.GetVolumeInformationW(
+                        ctypes.c_wchar_p(root), None, 0, None, None, None, fs_name, len(fs_name)):
+                    profile.fs_type = fs_name.value or 'Unknown'
+        except Exception as e:
+            print(f"读取簇大小失败: {str(e)}")
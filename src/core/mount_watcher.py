@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+挂载表变化监听
+内核在挂载表变化时让 /proc/self/mounts 产生 POLLPRI / POLLERR 事件，
+后台线程阻塞在 poll() 上，空闲时不消耗 CPU；变化后重新读取 mountinfo，
+只把新增和移除的卷通知界面
+"""
+
+import os
+import select
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from .mountinfo import MountEntry, MountTable
+
+
+def diff_mounts(previous: Dict[str, MountEntry],
+                current: Dict[str, MountEntry]) -> Tuple[List[MountEntry], List[MountEntry]]:
+    """
+    比较两次挂载表（以挂载点为键）
+
+    Returns:
+        (新增的挂载, 移除的挂载)；同一挂载点换了设备视为先移除再新增
+    """
+    added = []
+    removed = []
+    for point, entry in current.items():
+        old = previous.get(point)
+        if old is None or old.device_number != entry.device_number:
+            added.append(entry)
+    for point, entry in previous.items():
+        new = current.get(point)
+        if new is None or new.device_number != entry.device_number:
+            removed.append(entry)
+    return added, removed
+
+
+class MountTablePoller:
+    """在 /proc/self/mounts 上等待挂载表变化"""
+
+    def __init__(self, mounts_path: str = '/proc/self/mounts'):
+        self.mounts_path = mounts_path
+        self._file = None
+        self._poll = None
+
+    def open(self) -> bool:
+        """打开挂载表，不支持 poll 的平台返回 False"""
+        if not hasattr(select, 'poll'):
+            return False
+        try:
+            self._file = open(self.mounts_path, 'rb')
+            # 先读一遍，之后只有真正的变化才会触发事件
+            self._file.read()
+            self._poll = select.poll()
+            self._poll.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+            return True
+        except OSError as e:
+            print(f"无法监听挂载表: {e}")
+            self.close()
+            return False
+
+    def wait(self, timeout: float) -> bool:
+        """
+        等待挂载表变化
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            True 表示挂载表已变化
+        """
+        if self._poll is None:
+            return False
+        try:
+            events = self._poll.poll(int(timeout * 1000))
+        except OSError:
+            return False
+        if not events:
+            return False
+        # 必须重新读取才能清除事件，否则 poll() 会立即再次返回
+        try:
+            self._file.seek(0)
+            self._file.read()
+        except OSError:
+            pass
+        return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+        self._file = None
+        self._poll = None
+
+
+class MountWatchThread(QThread):
+    """挂载表监听线程"""
+
+    # 信号: 新增的挂载列表, 移除的挂载列表 (MountEntry)
+    mounts_changed = pyqtSignal(list, list)
+
+    def __init__(self, poller: MountTablePoller, table: MountTable, poll_timeout: float = 0.5):
+        """
+        Args:
+            poller: 已打开的挂载表监听器
+            table: 用于读取可移动设备挂载的挂载表
+            poll_timeout: 每次 poll 的等待时间，决定停止线程的响应速度
+        """
+        super().__init__()
+        self.poller = poller
+        self.table = table
+        self.poll_timeout = poll_timeout
+        self._is_stopped = False
+
+    def run(self):
+        current = self._read_mounts()
+        try:
+            while not self._is_stopped:
+                if not self.poller.wait(self.poll_timeout):
+                    continue
+                previous, current = current, self._read_mounts()
+                added, removed = diff_mounts(previous, current)
+                if added or removed:
+                    self.mounts_changed.emit(added, removed)
+        finally:
+            self.poller.close()
+
+    def _read_mounts(self) -> Dict[str, MountEntry]:
+        return {entry.mount_point: entry for entry in self.table.removable_mounts()}
+
+    def stop(self):
+        """停止监听"""
+        self._is_stopped = True
+
+
+class MountWatcher(QObject):
+    """挂载表监听器"""
+
+    # 信号: 新增的挂载列表, 移除的挂载列表 (MountEntry)
+    volumes_changed = pyqtSignal(list, list)
+
+    def __init__(self, proc_root: str = '/proc', sysfs_root: str = '/sys',
+                 parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.table = MountTable(proc_root, sysfs_root)
+        self.poller = MountTablePoller(os.path.join(proc_root, 'self', 'mounts'))
+        self.thread = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.thread is not None
+
+    def start(self) -> bool:
+        """
+        开始监听
+
+        Returns:
+            False 表示当前平台不支持（非 Linux 或无法打开挂载表）
+        """
+        if not self.table.is_available() or not self.poller.open():
+            return False
+        self.thread = MountWatchThread(self.poller, self.table)
+        self.thread.mounts_changed.connect(self.volumes_changed)
+        self.thread.start()
+        return True
+
+    def stop(self) -> None:
+        """停止监听"""
+        if self.thread is not None:
+            self.thread.stop()
+            self.thread.wait()
+            self.thread = None
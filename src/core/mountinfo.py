@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linux 挂载表解析
+一次读取 /proc/self/mountinfo，同时得到挂载 ID、设备号、源设备、文件系统类型和挂载选项，
+再结合 sysfs 判断哪些挂载来自 USB / 可移动设备，取代遍历 /mnt 和逐个执行 df -T
+"""
+
+import os
+from typing import Dict, List, Optional
+
+# 桌面环境和用户常用的可移动设备挂载位置
+MEDIA_ROOTS = ('/media/', '/run/media/', '/mnt/')
+
+# 即使是块设备也不作为 U 盘展示的挂载点
+_SYSTEM_MOUNT_POINTS = ('/', '/boot', '/boot/efi', '/home', '/usr', '/var')
+
+
+def unescape_mount_path(path: str) -> str:
+    """还原 mountinfo 中的八进制转义（例如 \\040 表示空格）"""
+    if '\\' not in path:
+        return path
+    result = []
+    i = 0
+    while i < len(path):
+        chunk = path[i:i + 4]
+        if len(chunk) == 4 and chunk[0] == '\\' and chunk[1:].isdigit():
+            try:
+                result.append(chr(int(chunk[1:], 8)))
+                i += 4
+                continue
+            except ValueError:
+                pass
+        result.append(path[i])
+        i += 1
+    return ''.join(result)
+
+
+class MountEntry:
+    """mountinfo 中的一行"""
+
+    __slots__ = ('mount_id', 'parent_id', 'major', 'minor', 'root', 'mount_point',
+                 'options', 'fs_type', 'source', 'super_options')
+
+    def __init__(self, mount_id: int, parent_id: int, major: int, minor: int, root: str,
+                 mount_point: str, options: str, fs_type: str, source: str, super_options: str):
+        self.mount_id = mount_id
+        self.parent_id = parent_id
+        self.major = major
+        self.minor = minor
+        self.root = root
+        self.mount_point = mount_point
+        self.options = options
+        self.fs_type = fs_type
+        self.source = source
+        self.super_options = super_options
+
+    @property
+    def device_number(self) -> str:
+        """"主设备号:次设备号"，与 /sys/dev/block 下的名称一致"""
+        return f"{self.major}:{self.minor}"
+
+    @property
+    def is_block_device(self) -> bool:
+        return self.major != 0 and self.source.startswith('/dev/')
+
+    @property
+    def is_read_only(self) -> bool:
+        return 'ro' in self.options.split(',')
+
+    def __repr__(self) -> str:
+        return f"MountEntry({self.mount_id}, {self.source!r} -> {self.mount_point!r}, {self.fs_type})"
+
+
+def parse_mountinfo_line(line: str) -> Optional[MountEntry]:
+    """
+    解析 mountinfo 的一行，格式不正确时返回 None
+
+    格式: 挂载ID 父ID 主:次 根 挂载点 挂载选项 [可选字段...] - 文件系统 源设备 超级块选项
+    """
+    fields = line.split()
+    try:
+        separator = fields.index('-', 6)
+        major, _, minor = fields[2].partition(':')
+        return MountEntry(
+            mount_id=int(fields[0]),
+            parent_id=int(fields[1]),
+            major=int(major),
+            minor=int(minor),
+            root=unescape_mount_path(fields[3]),
+            mount_point=unescape_mount_path(fields[4]),
+            options=fields[5],
+            fs_type=fields[separator + 1],
+            source=unescape_mount_path(fields[separator + 2]) if len(fields) > separator + 2 else '',
+            super_options=fields[separator + 3] if len(fields) > separator + 3 else ''
+        )
+    except (ValueError, IndexError):
+        return None
+
+
+class MountTable:
+    """/proc/self/mountinfo 挂载表"""
+
+    def __init__(self, proc_root: str = '/proc', sysfs_root: str = '/sys'):
+        """
+        Args:
+            proc_root: proc 文件系统挂载点（测试时可指向样例目录）
+            sysfs_root: sysfs 挂载点
+        """
+        self.proc_root = proc_root
+        self.sysfs_root = sysfs_root
+
+    @property
+    def mountinfo_path(self) -> str:
+        return os.path.join(self.proc_root, 'self', 'mountinfo')
+
+    def is_available(self) -> bool:
+        return os.path.isfile(self.mountinfo_path)
+
+    def read(self) -> List[MountEntry]:
+        """读取全部挂载项，读取失败时返回空列表"""
+        try:
+            with open(self.mountinfo_path, 'r', encoding='utf-8', errors='replace') as f:
+                lines = f.read().splitlines()
+        except OSError as e:
+            print(f"读取挂载表失败: {e}")
+            return []
+
+        entries = []
+        for line in lines:
+            entry = parse_mountinfo_line(line)
+            if entry is not None:
+                entries.append(entry)
+        return entries
+
+    def removable_mounts(self) -> List[MountEntry]:
+        """
+        来自 USB / 可移动设备的挂载
+
+        同一设备被挂载多次（bind mount）时只保留第一个挂载点
+        """
+        mounts = []
+        seen_devices = set()
+        cache: Dict[str, bool] = {}
+        for entry in self.read():
+            if not entry.is_block_device or entry.mount_point in _SYSTEM_MOUNT_POINTS:
+                continue
+            if entry.device_number in seen_devices:
+                continue
+
+            removable = cache.get(entry.device_number)
+            if removable is None:
+                removable = cache[entry.device_number] = self._is_removable(entry)
+            if removable or entry.mount_point.startswith(MEDIA_ROOTS):
+                seen_devices.add(entry.device_number)
+                mounts.append(entry)
+        return mounts
+
+    def block_device_dir(self, entry: MountEntry) -> Optional[str]:
+        """挂载源在 sysfs 中的真实目录（分区或整盘），找不到时返回 None"""
+        candidates = [os.path.join(self.sysfs_root, 'dev', 'block', entry.device_number)]
+        if entry.source.startswith('/dev/'):
+            candidates.append(os.path.join(self.sysfs_root, 'class', 'block', os.path.basename(entry.source)))
+        for path in candidates:
+            if os.path.exists(path):
+                return os.path.realpath(path)
+        return None
+
+    def disk_dir(self, entry: MountEntry) -> Optional[str]:
+        """挂载源所在整盘在 sysfs 中的目录（分区的上一级目录是整盘）"""
+        device_dir = self.block_device_dir(entry)
+        if device_dir is not None and os.path.exists(os.path.join(device_dir, 'partition')):
+            return os.path.dirname(device_dir)
+        return device_dir
+
+    def find(self, path: str) -> Optional[MountEntry]:
+        """路径所在的挂载项（挂载点为该路径最长前缀者）"""
+        path = os.path.abspath(path)
+        best = None
+        best_len = -1
+        for mount in self.read():
+            point = mount.mount_point.rstrip('/') or '/'
+            if path == point or path.startswith(point.rstrip('/') + '/'):
+                # 同一挂载点被多次挂载时，后面的挂载覆盖前面的
+                if len(point) >= best_len:
+                    best, best_len = mount, len(point)
+        return best
+
+    def _is_removable(self, entry: MountEntry) -> bool:
+        """块设备位于 USB 总线下，或所在整盘的 removable 属性为 1"""
+        device_dir = self.block_device_dir(entry)
+        if device_dir is None:
+            return False
+
+        if any(part.startswith('usb') and part[3:].isdigit() for part in device_dir.split(os.sep)):
+            return True
+
+        disk_dir = self.disk_dir(entry)
+        try:
+            with open(os.path.join(disk_dir, 'removable'), 'r') as f:
+                return f.read().strip() == '1'
+        except OSError:
+            return False
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发探测执行器
+基于 asyncio 同时运行多个外部命令（wmic、PowerShell、diskutil 等），
+每个命令有自己的超时，整体还有一个总截止时间；超时的命令被终止，
+已完成的结果照常返回，最坏耗时由各超时之和降为其中的最大值
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Union
+
+from .scan_metrics import scan_metrics
+
+
+class Probe:
+    """一条待执行的探测命令"""
+
+    def __init__(self, name: str, cmd: Union[str, Sequence[str]], timeout: float = 10,
+                 shell: bool = False, encodings: Sequence[str] = ('utf-8',),
+                 metric_name: Optional[str] = None):
+        """
+        Args:
+            name: 结果字典中的键
+            cmd: 命令行；shell=True 时为字符串
+            timeout: 单条命令超时（秒）
+            shell: 是否经由 shell 执行
+            encodings: 依次尝试的输出编码（例如 Windows 上先 gbk 再 utf-8）
+            metric_name: 性能统计中使用的名称，默认为 "subprocess.<name>"
+        """
+        self.name = name
+        self.metric_name = metric_name or f"subprocess.{name}"
+        self.cmd = cmd
+        self.timeout = timeout
+        self.shell = shell
+        self.encodings = tuple(encodings)
+
+
+class ProbeResult:
+    """探测结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.returncode: Optional[int] = None
+        self.stdout = ''
+        self.stderr = ''
+        self.timed_out = False
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """命令正常结束且返回码为 0"""
+        return self.returncode == 0 and not self.timed_out and self.error is None
+
+    def __repr__(self) -> str:
+        state = 'timeout' if self.timed_out else (self.error or f"rc={self.returncode}")
+        return f"ProbeResult({self.name!r}, {state}, {self.elapsed:.3f}s)"
+
+
+def decode_output(data: bytes, encodings: Sequence[str]) -> str:
+    """按顺序尝试多种编码解码，全部失败时用最后一种编码忽略错误解码"""
+    for encoding in encodings:
+        try:
+            return data.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return data.decode(encodings[-1] if encodings else 'utf-8', errors='ignore')
+
+
+class ProbeRunner:
+    """并发执行探测命令"""
+
+    def __init__(self, max_concurrency: int = 8):
+        """
+        Args:
+            max_concurrency: 同时运行的子进程上限
+        """
+        self.max_concurrency = max_concurrency
+
+    def run(self, probes: List[Probe], deadline: Optional[float] = None) -> Dict[str, ProbeResult]:
+        """
+        同步执行一组探测
+
+        Args:
+            probes: 探测命令列表
+            deadline: 总截止时间（秒），None 表示只受各命令自身超时限制
+
+        Returns:
+            {名称: ProbeResult}，未在截止时间内完成的命令标记为 timed_out
+        """
+        if not probes:
+            return {}
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async(probes, deadline))
+
+        # 当前线程已有事件循环在运行，放到独立线程里执行
+        results = {}
+
+        def worker():
+            results.update(asyncio.run(self.run_async(probes, deadline)))
+
+        thread = threading.Thread(target=worker, daemon=True)
+        thread.start()
+        thread.join()
+        return results
+
+    async def run_async(self, probes: List[Probe], deadline: Optional[float] = None) -> Dict[str, ProbeResult]:
+        """异步执行一组探测，语义同 run()"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = {probe.name: ProbeResult(probe.name) for probe in probes}
+        started = time.monotonic()
+
+        tasks = [asyncio.ensure_future(self._run_one(probe, results[probe.name], semaphore))
+                 for probe in probes]
+        _, pending = await asyncio.wait(tasks, timeout=deadline)
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            for probe, task in zip(probes, tasks):
+                if task in pending:
+                    result = results[probe.name]
+                    result.timed_out = True
+                    result.elapsed = time.monotonic() - started
+
+        return results
+
+    async def _run_one(self, probe: Probe, result: ProbeResult, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            start = time.monotonic()
+            proc = None
+            try:
+                if probe.shell:
+                    proc = await asyncio.create_subprocess_shell(
+                        probe.cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+                else:
+                    proc = await asyncio.create_subprocess_exec(
+                        *probe.cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+
+                stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=probe.timeout)
+                result.returncode = proc.returncode
+                result.stdout = decode_output(stdout, probe.encodings)
+                result.stderr = decode_output(stderr, probe.encodings)
+            except asyncio.TimeoutError:
+                result.timed_out = True
+                await self._kill(proc)
+            except asyncio.CancelledError:
+                # 被总截止时间取消
+                result.timed_out = True
+                await self._kill(proc)
+                raise
+            except (OSError, ValueError) as e:
+                result.error = str(e)
+            finally:
+                result.elapsed = time.monotonic() - start
+                error = result.error
+                if error is None and result.returncode not in (None, 0):
+                    error = f"返回码 {result.returncode}"
+                scan_metrics.record_subprocess(probe.metric_name, result.elapsed, result.timed_out, error)
+
+    @staticmethod
+    async def _kill(proc) -> None:
+        if proc is None or proc.returncode is not None:
+            return
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            return
+        try:
+            await proc.wait()
+        except Exception:
+            pass
+
+
+# 进程内共享实例
+probe_runner = ProbeRunner()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描结果缓存
+进程内共享的 TTL 缓存，让同一时间窗口内的调用者共用一次探测，
+并通过代数计数器支持显式失效（例如收到热插拔事件时）
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+# 缓存项名称
+USB_DEVICES = 'usb_devices'
+MOUNTED_DRIVES = 'mounted_drives'
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'timestamp', 'generation')
+
+    def __init__(self, value: Any, timestamp: float, generation: int):
+        self.value = value
+        self.timestamp = timestamp
+        self.generation = generation
+
+
+class ScanCache:
+    """带 TTL 和代数计数器的扫描缓存"""
+
+    def __init__(self, ttl: float = 2.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl: 缓存有效期（秒），0 表示不缓存
+            clock: 时间函数，测试时可替换
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._last: Dict[str, Any] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    def generation(self, name: str) -> int:
+        """返回缓存项当前的代数，每次失效加一"""
+        with self._lock:
+            return self._generations.get(name, 0)
+
+    def get(self, name: str, loader: Callable[[], Any]) -> Any:
+        """
+        读取缓存，过期或已失效时调用 loader 重新探测
+
+        并发调用时只有一个线程执行 loader，其余线程等待并共享结果
+
+        Args:
+            name: 缓存项名称
+            loader: 无参数的探测函数
+
+        Returns:
+            缓存或新探测的结果
+        """
+        with self._lock:
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+
+        with key_lock:
+            entry = self._valid_entry(name)
+            if entry is not None:
+                return entry.value
+
+            generation = self.generation(name)
+            value = loader()
+            with self._lock:
+                self._last[name] = value
+                # 探测期间发生了失效，结果可能已经过时，不写入缓存
+                if self._generations.get(name, 0) == generation:
+                    self._entries[name] = _CacheEntry(value, self._clock(), generation)
+            return value
+
+    def peek(self, name: str) -> Optional[Any]:
+        """读取仍然有效的缓存值，不触发探测"""
+        entry = self._valid_entry(name)
+        return entry.value if entry is not None else None
+
+    def last(self, name: str) -> Optional[Any]:
+        """读取最近一次探测的结果（即使已过期或失效），不触发探测"""
+        with self._lock:
+            return self._last.get(name)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """
+        使缓存失效
+
+        Args:
+            name: 缓存项名称，None 表示全部失效
+        """
+        with self._lock:
+            names = [name] if name is not None else list(set(self._entries) | set(self._generations))
+            for item in names:
+                self._generations[item] = self._generations.get(item, 0) + 1
+                self._entries.pop(item, None)
+
+    def _valid_entry(self, name: str) -> Optional[_CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            if entry.generation != self._generations.get(name, 0):
+                return None
+            if self._clock() - entry.timestamp >= self.ttl:
+                return None
+            return entry
+
+
+# 进程内共享实例
+scan_cache = ScanCache()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+扫描性能统计
+为每个探测步骤（子进程、sysfs 读取、解析、合并、界面更新）记录耗时直方图、
+子进程次数、超时次数和错误次数，便于定位哪台主机的 WMI 或 lsusb 偏慢
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+
+# 直方图桶上界（毫秒），最后一个桶收集更慢的样本
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogram:
+    """固定桶的耗时直方图"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def add(self, elapsed_ms: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.min_ms = elapsed_ms if self.min_ms is None else min(self.min_ms, elapsed_ms)
+        self.max_ms = elapsed_ms if self.max_ms is None else max(self.max_ms, elapsed_ms)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """按桶估算分位数（返回所在桶的上界，最后一个桶返回最大值）"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return min(float(BUCKET_BOUNDS_MS[index]), self.max_ms)
+                return self.max_ms
+        return self.max_ms
+
+
+class ProbeStats:
+    """单个探测步骤的统计"""
+
+    def __init__(self):
+        self.histogram = Histogram()
+        self.subprocesses = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.last_error = ''
+
+    def to_dict(self) -> Dict[str, object]:
+        h = self.histogram
+        return {
+            'count': h.count,
+            'mean_ms': round(h.mean_ms, 2),
+            'p50_ms': h.percentile(0.5),
+            'p95_ms': h.percentile(0.95),
+            'max_ms': h.max_ms or 0.0,
+            'buckets': list(h.buckets),
+            'subprocesses': self.subprocesses,
+            'timeouts': self.timeouts,
+            'errors': self.errors,
+            'last_error': self.last_error,
+        }
+
+
+class ScanMetrics:
+    """线程安全的扫描统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ProbeStats] = {}
+
+    def _get(self, name: str) -> ProbeStats:
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = ProbeStats()
+        return stats
+
+    @contextmanager
+    def timer(self, name: str):
+        """
+        记录代码块的耗时；代码块抛出异常时计一次错误并继续抛出
+
+        用法:
+            with scan_metrics.timer('parse.wmic'):
+                ...
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(name, e)
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, elapsed: float) -> None:
+        """记录一次耗时（秒）"""
+        with self._lock:
+            self._get(name).histogram.add(elapsed * 1000)
+
+    def record_subprocess(self, name: str, elapsed: float, timed_out: bool = False,
+                          error: Optional[str] = None) -> None:
+        """记录一次子进程调用"""
+        with self._lock:
+            stats = self._get(name)
+            stats.histogram.add(elapsed * 1000)
+            stats.subprocesses += 1
+            if timed_out:
+                stats.timeouts += 1
+            if error:
+                stats.errors += 1
+                stats.last_error = error
+
+    def record_error(self, name: str, error=None) -> None:
+        """记录一次错误"""
+        with self._lock:
+            stats = self._get(name)
+            stats.errors += 1
+            if error is not None:
+                stats.last_error = str(error)
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        """返回所有步骤的统计数据 {名称: {...}}"""
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def summary_line(self, name: str = 'scan.usb') -> str:
+        """状态栏用的一行简要读数"""
+        data = self.snapshot()
+        main = data.get(name)
+        subprocesses = sum(item['subprocesses'] for item in data.values())
+        timeouts = sum(item['timeouts'] for item in data.values())
+        errors = sum(item['errors'] for item in data.values())
+        if main:
+            head = f"扫描 {main['mean_ms']:.0f}ms (p95 {main['p95_ms']:.0f}ms, {main['count']} 次)"
+        else:
+            head = "扫描 -"
+        return f"{head} · 子进程 {subprocesses} · 超时 {timeouts} · 错误 {errors}"
+
+    def report(self) -> str:
+        """多行诊断报告，每个步骤一行"""
+        lines: List[str] = []
+        for name, item in self.snapshot().items():
+            line = (f"{name}: {item['count']} 次, 平均 {item['mean_ms']:.1f}ms, "
+                    f"p50 {item['p50_ms']:.0f}ms, p95 {item['p95_ms']:.0f}ms, 最大 {item['max_ms']:.0f}ms")
+            if item['subprocesses']:
+                line += f", 子进程 {item['subprocesses']}"
+            if item['timeouts']:
+                line += f", 超时 {item['timeouts']}"
+            if item['errors']:
+                line += f", 错误 {item['errors']} ({item['last_error']})"
+            lines.append(line)
+        return '\n'.join(lines) if lines else "暂无扫描数据"
+
+
+# 进程内共享实例
+scan_metrics = ScanMetrics()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+小文件流水线复制
+大量小文件复制到 FAT/exFAT 时，耗时主要在每个文件的打开、创建、关闭上，而不是带宽:
+1. 目标目录树一次性预先创建（按路径排序后逐级 mkdir，已创建的目录不再检查）
+2. 一批文件交给小线程池并行执行 打开 → 读取 → 创建 → 写入 → 关闭，
+   让不同文件的元数据操作在设备上重叠
+3. 整批数据写完后再统一设置修改时间，每批只回报一次进度
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+# 不超过该大小的文件走小文件流水线
+SMALL_FILE_THRESHOLD = 256 * 1024
+
+# O_BINARY 只在 Windows 上存在
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+
+
+class SmallFileResult:
+    """一个文件的复制结果"""
+
+    __slots__ = ('source', 'destination', 'copied', 'error', 'mtime_ns')
+
+    def __init__(self, source: str, destination: str):
+        self.source = source
+        self.destination = destination
+        self.copied = 0
+        self.error = ''
+        self.mtime_ns: Optional[Tuple[int, int]] = None   # 源文件的 (atime_ns, mtime_ns)
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+class DirectoryPreparer:
+    """预先创建目标目录树，记住已存在的目录（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._created: Set[str] = set()
+
+    def prepare(self, directories: Iterable[str]) -> None:
+        """
+        一次创建全部目录：排序后父目录总在子目录之前，
+        每个目录只需一次 mkdir，不必像 os.makedirs 那样逐级检查
+        """
+        with self._lock:
+            missing = sorted(set(directories) - self._created)
+            for directory in missing:
+                if directory in self._created:
+                    continue
+                parent = os.path.dirname(directory)
+                if parent != directory and parent not in self._created and not os.path.isdir(parent):
+                    os.makedirs(parent, exist_ok=True)
+                    self._created.add(parent)
+                try:
+                    os.mkdir(directory)
+                except FileExistsError:
+                    pass
+                self._created.add(directory)
+
+    def forget(self) -> None:
+        with self._lock:
+            self._created.clear()
+
+
+class SmallFileCopier:
+    """小文件批量复制"""
+
+    def __init__(self, max_workers: int = 4, preserve_times: bool = True,
+                 directories: Optional[DirectoryPreparer] = None):
+        """
+        Args:
+            max_workers: 并行打开/写入的线程数
+            preserve_times: 是否把源文件的修改时间复制到目标文件
+            directories: 共享的目录预创建器（与大文件复制共用，避免重复检查目录）
+        """
+        self.max_workers = max_workers
+        self.preserve_times = preserve_times
+        self.directories = directories if directories is not None else DirectoryPreparer()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self) -> 'SmallFileCopier':
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._pool.shutdown(wait=True)
+        self._pool = None
+
+    def copy_batch(self, items: List[Tuple[str, str]],
+                   cancel_event: Optional[threading.Event] = None,
+                   progress: Optional[Callable[[List[SmallFileResult]], None]] = None) -> List[SmallFileResult]:
+        """
+        复制一批小文件，返回与 items 顺序一致的结果
+
+        Args:
+            items: (源文件, 目标文件) 列表
+            cancel_event: 被设置后尚未开始的文件不再复制（error 为“已取消”）
+            progress: 整批完成后回调一次
+        """
+        self.directories.prepare(os.path.dirname(destination) for _, destination in items)
+
+        def run(item: Tuple[str, str]) -> SmallFileResult:
+            return self._copy_one(item[0], item[1], cancel_event)
+
+        if self._pool is not None:
+            results = list(self._pool.map(run, items))
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(run, items))
+
+        # 元数据在整批数据写完后统一更新
+        if self.preserve_times:
+            for result in results:
+                if result.ok and result.mtime_ns is not None:
+                    try:
+                        os.utime(result.destination, ns=result.mtime_ns)
+                    except OSError:
+                        pass
+
+        if progress is not None:
+            progress(results)
+        return results
+
+    @staticmethod
+    def _copy_one(source: str, destination: str,
+                  cancel_event: Optional[threading.Event]) -> SmallFileResult:
+        result = SmallFileResult(source, destination)
+        if cancel_event is not None and cancel_event.is_set():
+            result.error = '已取消'
+            return result
+        created = False
+        try:
+            src_fd = os.open(source, _READ_FLAGS)
+            try:
+                st = os.fstat(src_fd)
+                result.mtime_ns = (st.st_atime_ns, st.st_mtime_ns)
+                # 小文件一次读完（多读 1 字节以发现读取期间增长的文件）
+                data = os.read(src_fd, st.st_size + 1)
+                while len(data) > st.st_size:
+                    more = os.read(src_fd, 1024 * 1024)
+                    if not more:
+                        break
+                    data += more
+            finally:
+                os.close(src_fd)
+
+            dst_fd = os.open(destination, _WRITE_FLAGS, 0o666)
+            created = True
+            try:
+                view = memoryview(data)
+                written = 0
+                while written < len(data):
+                    written += os.write(dst_fd, view[written:])
+            finally:
+                os.close(dst_fd)
+            result.copied = len(data)
+        except OSError as e:
+            result.error = str(e)
+            if created:
+                try:
+                    os.remove(destination)
+                except OSError:
+                    pass
+        return result
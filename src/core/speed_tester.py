@@ -14,6 +14,9 @@ import subprocess
 from pathlib import Path
 from PyQt6.QtCore import QThread, pyqtSignal
 
+from .drive_manager import DriveManager
+from .io_profile import aligned_buffer
+
 
 class SpeedTestThread(QThread):
     """磁盘测速线程类"""
@@ -40,11 +43,19 @@ class SpeedTestThread(QThread):
         
     def run(self):
         temp_file = self.target_path / f"speed_test_{uuid.uuid4().hex}.tmp"
-        # 使用 4MB 缓冲区 (需为扇区大小倍数，4MB通常安全)
-        buffer_size = 4 * 1024 * 1024 
-        data_chunk = os.urandom(buffer_size)
+        data_chunk = None
+        data_view = None
         
         try:
+            # 缓冲区大小按卷的扇区、簇和单次请求上限选择（至少 4MB，且为扇区大小的整数倍）
+            profile = DriveManager.get_io_profile(str(self.target_path))
+            buffer_size = profile.speed_test_buffer_size
+            # 测试大小取缓冲区的整数倍，保证无缓冲读取时每次都是扇区对齐的
+            self.test_size = max(buffer_size, self.test_size // buffer_size * buffer_size)
+            data_chunk = aligned_buffer(buffer_size)
+            data_chunk.write(os.urandom(buffer_size))
+            data_view = memoryview(data_chunk)
+            
             # --- 写入测试 ---
             self.progress_update.emit(f"正在准备写入测试 ({self.test_size // (1024*1024)}MB)...", 0)
             
@@ -59,7 +70,7 @@ class SpeedTestThread(QThread):
                     remaining = self.test_size - bytes_written
                     write_len = min(remaining, buffer_size)
                     
-                    f.write(data_chunk[:write_len])
+                    f.write(data_view[:write_len])
                     bytes_written += write_len
                     
                     # 更新进度 (0-50%)
@@ -137,6 +148,11 @@ class SpeedTestThread(QThread):
         except Exception as e:
             self.error_occurred.emit(f"测试失败: {str(e)}")
             self._cleanup(temp_file)
+        finally:
+            if data_view is not None:
+                data_view.release()
+            if data_chunk is not None:
+                data_chunk.close()
 
     def _read_standard(self, file_path, buffer_size):
         """标准读取方法 (Mac/Linux) - 使用多种方法绕过缓存"""
@@ -192,14 +208,15 @@ class SpeedTestThread(QThread):
                     self.progress_update.emit(f"警告: 缓存设置失败 - {str(e)}", 50)
             
             bytes_read = 0
-            while True:
-                if self._is_cancelled: break
-                chunk = f.read(buffer_size)
-                if not chunk: break
-                bytes_read += len(chunk)
-                
-                percent = 50 + int((bytes_read / self.test_size) * 50)
-                self.progress_update.emit(f"读取中... {(percent-50)*2}%", percent)
+            with aligned_buffer(buffer_size) as buffer:
+                while True:
+                    if self._is_cancelled: break
+                    count = f.readinto(buffer)
+                    if not count: break
+                    bytes_read += count
+                    
+                    percent = 50 + int((bytes_read / self.test_size) * 50)
+                    self.progress_update.emit(f"读取中... {(percent-50)*2}%", percent)
                 
         read_time = time.time() - start_time
         if read_time == 0: read_time = 0.001
@@ -349,7 +366,7 @@ class SpeedTestThread(QThread):
                     to_read = min(buffer_size, self.test_size - total_read)
                     
                     # 必须确保读取大小是扇区对齐的 (通常512或4096)
-                    # 由于 buffer_size (4MB) 和 test_size (300MB) 都是 4KB 的倍数，这里通常是安全的
+                    # buffer_size 已按卷的扇区大小对齐，test_size 是 buffer_size 的整数倍
                     
                     success = kernel32.ReadFile(
                         handle,
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Linux sysfs USB 扫描后端
+直接读取 /sys/bus/usb/devices/*，无需 fork lsusb
+"""
+
+import os
+from typing import List, Optional
+
+from .device_record import DeviceRecord, capability_from_version
+
+
+# USB 大容量存储类接口 (bInterfaceClass)
+MASS_STORAGE_CLASS = '08'
+
+
+class SysfsUSBScanner:
+    """基于 sysfs 的 USB 设备扫描器"""
+
+    def __init__(self, sysfs_root: str = '/sys'):
+        """
+        初始化扫描器
+
+        Args:
+            sysfs_root: sysfs 挂载根目录，测试时可指向夹具目录树
+        """
+        self.sysfs_root = sysfs_root
+        self.devices_dir = os.path.join(sysfs_root, 'bus', 'usb', 'devices')
+
+    def is_available(self) -> bool:
+        """当前系统是否提供 sysfs USB 设备目录"""
+        return os.path.isdir(self.devices_dir)
+
+    def scan_devices(self) -> List[DeviceRecord]:
+        """
+        扫描所有 USB 设备
+
+        Returns:
+            设备记录列表
+        """
+        devices = []
+
+        try:
+            entries = sorted(os.listdir(self.devices_dir))
+        except OSError:
+            return devices
+
+        for entry in entries:
+            # 形如 "1-1:1.0" 的是接口节点，不是设备
+            if ':' in entry:
+                continue
+
+            device = self._read_device(entry)
+            if device:
+                devices.append(device)
+
+        return devices
+
+    def _read_device(self, entry: str) -> Optional[DeviceRecord]:
+        """读取单个设备目录的属性"""
+        device_dir = os.path.join(self.devices_dir, entry)
+
+        vid = self._read_attr(device_dir, 'idVendor')
+        pid = self._read_attr(device_dir, 'idProduct')
+        if not vid or not pid:
+            return None
+
+        busnum = self._read_attr(device_dir, 'busnum')
+        speed = self._read_attr(device_dir, 'speed')
+        is_storage = self._has_mass_storage_interface(device_dir, entry)
+
+        if is_storage:
+            bus = 'USB Storage'
+        elif busnum:
+            bus = f"Bus {int(busnum):03d}" if busnum.isdigit() else f"Bus {busnum}"
+        else:
+            bus = 'USB'
+
+        return DeviceRecord(
+            name=self._read_attr(device_dir, 'product') or 'Unknown',
+            manufacturer=self._read_attr(device_dir, 'manufacturer') or 'N/A',
+            serial=self._read_attr(device_dir, 'serial') or 'N/A',
+            bus=bus,
+            speed=f"{speed} Mb/s" if speed else 'N/A',
+            vid_pid=f"{vid}:{pid}",
+            capability_mbps=capability_from_version(self._read_attr(device_dir, 'version')),
+            busnum=int(busnum) if busnum.isdigit() else None,
+            port_path=self._read_attr(device_dir, 'devpath')
+        )
+
+    def _has_mass_storage_interface(self, device_dir: str, entry: str) -> bool:
+        """检查设备的接口节点中是否有大容量存储类接口"""
+        prefix = f"{entry}:"
+        try:
+            children = os.listdir(device_dir)
+        except OSError:
+            return False
+
+        for child in children:
+            if child.startswith(prefix):
+                iface_class = self._read_attr(os.path.join(device_dir, child), 'bInterfaceClass')
+                if iface_class == MASS_STORAGE_CLASS:
+                    return True
+        return False
+
+    @staticmethod
+    def _read_attr(device_dir: str, name: str) -> str:
+        """读取 sysfs 属性文件，不存在或不可读时返回空字符串"""
+        try:
+            with open(os.path.join(device_dir, name), 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().strip()
+        except OSError:
+            return ''
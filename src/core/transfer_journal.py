@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+传输日志（断点续传）
+数据先写入 "<目标文件>.part"，复制完成后再用 os.replace 原子地重命名为目标文件，
+目标位置上不会出现只复制了一半的文件（覆盖已有文件时，旧文件在复制完成前保持不变）。
+复制大文件时定期记录检查点: 先 fsync .part 文件，再把源文件标识（大小、修改时间、inode）、
+已落盘的偏移量和该偏移量之前一段数据的哈希写入本地 SQLite。
+传输被取消、出错或 U 盘被拔出后，保留 .part 文件中已复制的部分；再次复制同一文件时，
+确认源文件未变、并重新哈希 .part 文件在检查点之前的尾部数据，一致则从检查点继续
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Optional
+
+from .copy_engine import CopyEngine, CopyResult
+from .file_index import default_db_path
+
+# 检查点校验的尾部数据长度
+TAIL_SIZE = 1024 * 1024
+# 检查点间隔（满足其一即记录）
+CHECKPOINT_BYTES = 64 * 1024 * 1024
+CHECKPOINT_SECONDS = 2.0
+# 小于该大小的文件不记录日志，失败后直接重新复制
+MIN_JOURNAL_SIZE = 8 * 1024 * 1024
+# 复制过程中数据所在文件的后缀
+PART_SUFFIX = '.part'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    destination TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    tail_hash TEXT NOT NULL,
+    updated_at REAL
+);
+"""
+
+
+def default_journal_path() -> str:
+    """传输日志数据库的默认位置（与文件索引在同一目录）"""
+    return os.path.join(os.path.dirname(default_db_path()), 'transfer_journal.sqlite3')
+
+
+def part_path(destination: str) -> str:
+    """复制过程中写入的临时文件（完成后重命名为 destination）"""
+    return destination + PART_SUFFIX
+
+
+def read_at(fd: int, length: int, offset: int) -> bytes:
+    """按位置读取，不改变文件位置（没有 os.pread 的平台上退回 lseek + read）"""
+    if hasattr(os, 'pread'):
+        chunks = []
+        while length > 0:
+            data = os.pread(fd, length, offset)
+            if not data:
+                break
+            chunks.append(data)
+            length -= len(data)
+            offset += len(data)
+        return b''.join(chunks)
+    position = os.lseek(fd, 0, os.SEEK_CUR)
+    try:
+        os.lseek(fd, offset, os.SEEK_SET)
+        chunks = []
+        while length > 0:
+            data = os.read(fd, length)
+            if not data:
+                break
+            chunks.append(data)
+            length -= len(data)
+        return b''.join(chunks)
+    finally:
+        os.lseek(fd, position, os.SEEK_SET)
+
+
+def tail_hash(fd: int, offset: int, tail_size: int = TAIL_SIZE) -> str:
+    """offset 之前 tail_size 字节（不足时从头开始）的哈希"""
+    start = max(0, offset - tail_size)
+    return hashlib.blake2b(read_at(fd, offset - start, start)).hexdigest()
+
+
+class TransferJournal:
+    """基于 SQLite 的传输日志（同一实例可在多个线程中使用）"""
+
+    def __init__(self, db_path: Optional[str] = None, tail_size: int = TAIL_SIZE):
+        self.db_path = db_path or default_journal_path()
+        self.tail_size = tail_size
+        if self.db_path != ':memory:':
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def covers(size: int) -> bool:
+        """该大小的文件是否记录日志（失败后保留部分文件以便续传）"""
+        return size >= MIN_JOURNAL_SIZE
+
+    def resume_offset(self, source: str, destination: str, src_fd: int, dst_fd: int) -> int:
+        """
+        可以续传的位置，不能续传时返回 0（并删除过期的记录）
+
+        条件: 日志中有该目标文件的记录、源文件路径与标识未变、.part 文件（dst_fd）长度不小于检查点，
+        且 .part 文件在检查点之前的尾部数据与记录的哈希一致
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT source, size, mtime_ns, inode, offset, tail_hash FROM transfers WHERE destination = ?',
+                (os.path.abspath(destination),)).fetchone()
+        if row is None:
+            return 0
+        recorded_source, size, mtime_ns, inode, offset, recorded_hash = row
+        try:
+            src_stat = os.fstat(src_fd)
+            dst_size = os.fstat(dst_fd).st_size
+            same_source = (recorded_source == os.path.abspath(source) and src_stat.st_size == size
+                           and src_stat.st_mtime_ns == mtime_ns and src_stat.st_ino == inode)
+            if same_source and 0 < offset <= dst_size and tail_hash(dst_fd, offset, self.tail_size) == recorded_hash:
+                return offset
+        except OSError as e:
+            print(f"校验续传位置失败: {str(e)}")
+        self.complete(destination)
+        return 0
+
+    def checkpoint(self, source: str, destination: str, src_fd: int, dst_fd: int, offset: int) -> None:
+        """.part 文件（dst_fd）数据落盘后记录检查点"""
+        os.fsync(dst_fd)
+        src_stat = os.fstat(src_fd)
+        digest = tail_hash(src_fd, offset, self.tail_size)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO transfers '
+                '(destination, source, size, mtime_ns, inode, offset, tail_hash, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(destination), os.path.abspath(source), src_stat.st_size,
+                 src_stat.st_mtime_ns, src_stat.st_ino, offset, digest, time.time()))
+            self._conn.commit()
+
+    def complete(self, destination: str) -> None:
+        """传输完成或放弃续传时删除记录"""
+        with self._lock:
+            self._conn.execute('DELETE FROM transfers WHERE destination = ?', (os.path.abspath(destination),))
+            self._conn.commit()
+
+    def pending(self) -> list:
+        """所有未完成的传输 [(目标文件, 源文件, 已落盘字节数, 总大小)]，数据在 part_path(目标文件) 中"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT destination, source, offset, size FROM transfers ORDER BY updated_at').fetchall()
+
+    def recover(self) -> int:
+        """
+        清理无法再续传的记录和 .part 文件，返回清理的条数
+
+        .part 文件已不存在，或源文件已删除、已修改时删除记录（及 .part 文件）；
+        源文件或目标所在的目录不存在（U 盘未插入）时保留，等再次插入后续传
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT destination, source, size, mtime_ns, inode FROM transfers').fetchall()
+
+        removed = 0
+        for destination, source, size, mtime_ns, inode in rows:
+            part = part_path(destination)
+            if not os.path.isdir(os.path.dirname(destination)) or not os.path.isdir(os.path.dirname(source)):
+                continue
+            try:
+                st = os.stat(source)
+                source_changed = (st.st_size, st.st_mtime_ns, st.st_ino) != (size, mtime_ns, inode)
+            except OSError:
+                source_changed = True
+            if os.path.exists(part) and not source_changed:
+                continue
+            try:
+                if os.path.exists(part):
+                    os.remove(part)
+            except OSError as e:
+                print(f"删除未完成的文件失败: {str(e)}")
+                continue
+            self.complete(destination)
+            removed += 1
+        return removed
+
+
+class Checkpointer:
+    """在复制进度回调中按字节数或时间间隔记录检查点"""
+
+    def __init__(self, journal: TransferJournal, source: str, destination: str,
+                 src_fd: int, dst_fd: int, start: int = 0,
+                 every_bytes: int = CHECKPOINT_BYTES, every_seconds: float = CHECKPOINT_SECONDS):
+        self.journal = journal
+        self.source = source
+        self.destination = destination
+        self.src_fd = src_fd
+        self.dst_fd = dst_fd
+        self.every_bytes = every_bytes
+        self.every_seconds = every_seconds
+        self._last_offset = start
+        self._last_time = time.monotonic()
+
+    def update(self, position: int) -> None:
+        if position - self._last_offset < self.every_bytes and \
+                time.monotonic() - self._last_time < self.every_seconds:
+            return
+        self.save(position)
+
+    def save(self, position: int) -> None:
+        """立即记录检查点（取消或出错时调用，尽量保住已复制的数据）"""
+        if position <= 0 or position == self._last_offset:
+            return
+        try:
+            self.journal.checkpoint(self.source, self.destination, self.src_fd, self.dst_fd, position)
+            self._last_offset = position
+        except (OSError, sqlite3.Error) as e:
+            # U 盘已拔出时 fsync 会失败，保留上一个检查点
+            print(f"记录传输检查点失败: {str(e)}")
+        self._last_time = time.monotonic()
+
+
+def resumable_copy(engine: CopyEngine, source: str, destination: str, size: int,
+                   journal: Optional[TransferJournal] = None, known_offset: int = 0,
+                   cancel_event: Optional[threading.Event] = None,
+                   progress: Optional[Callable[[int], None]] = None,
+                   on_start: Optional[Callable[[int], None]] = None) -> CopyResult:
+    """
+    复制一个文件，可从断点继续
+
+    数据写入 part_path(destination)，完成后截断多余数据、重命名为 destination 并删除日志记录。
+    起点依次取: known_offset（同一进程中暂停过的任务，已知可信）、日志中校验通过的检查点、0。
+    复制期间定期记录检查点；取消或出错时立即记录一次，保留 .part 文件中已复制的部分
+
+    Args:
+        engine: 复制引擎
+        source: 源文件路径
+        destination: 目标文件路径
+        size: 源文件大小
+        journal: 传输日志，None 或文件小于 MIN_JOURNAL_SIZE 时不记录
+        known_offset: .part 文件中已知可以直接继续的位置
+        cancel_event: 被设置后在当前分片结束时停止
+        progress: 每个分片后回调，参数为已复制到的位置
+        on_start: 确定起点后回调一次，参数为起点（0 表示从头复制）
+
+    Returns:
+        CopyResult（copied 为结束时的位置）
+    """
+    journal = journal if journal is not None and TransferJournal.covers(size) else None
+    part = part_path(destination)
+    with open(source, 'rb', buffering=0) as src:
+        with open(part, 'r+b' if os.path.exists(part) else 'w+b', buffering=0) as dst:
+            src_fd, dst_fd = src.fileno(), dst.fileno()
+            dst_size = os.fstat(dst_fd).st_size
+            if 0 < known_offset <= dst_size:
+                offset = known_offset
+            elif journal is not None and dst_size:
+                offset = journal.resume_offset(source, destination, src_fd, dst_fd)
+            else:
+                offset = 0
+            if offset == 0 and dst_size:
+                dst.truncate(0)
+            if on_start is not None:
+                on_start(offset)
+
+            checkpointer = None
+            if journal is not None:
+                checkpointer = Checkpointer(journal, source, destination, src_fd, dst_fd, offset)
+            position = [offset]
+
+            def on_progress(copied: int) -> None:
+                position[0] = copied
+                if checkpointer is not None:
+                    checkpointer.update(copied)
+                if progress is not None:
+                    progress(copied)
+
+            try:
+                result = engine.copy(src_fd, dst_fd, size, offset, cancel_event, on_progress)
+            except Exception:
+                if checkpointer is not None:
+                    checkpointer.save(position[0])
+                raise
+
+            if result.cancelled:
+                if checkpointer is not None:
+                    checkpointer.save(result.copied)
+                return result
+            dst.truncate(result.copied)
+
+    # 关闭后再重命名（Windows 上不能替换打开着的文件）
+    os.replace(part, destination)
+    if journal is not None:
+        journal.complete(destination)
+    return result
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+传输进度汇报
+复制线程每个分片都调用 update()，但只有距上次汇报超过最小间隔（默认 10 Hz）时才真正回调，
+避免高速传输时每秒数百次跨线程信号；汇报的都是数值（字节数、速度、剩余秒数），
+格式化交给界面
+"""
+
+import math
+import time
+from typing import Callable, Optional
+
+
+class TransferProgress:
+    """一次进度汇报"""
+
+    __slots__ = ('bytes_done', 'total_bytes', 'elapsed', 'speed', 'instant_speed', 'eta', 'finished', 'paused')
+
+    def __init__(self, bytes_done: int, total_bytes: int, elapsed: float, speed: float,
+                 instant_speed: float, eta: Optional[float], finished: bool = False, paused: bool = False):
+        """
+        Args:
+            bytes_done: 已传输字节数
+            total_bytes: 总字节数
+            elapsed: 已用时间（秒）
+            speed: 平滑后的速度（字节/秒，指数加权移动平均）
+            instant_speed: 最近一个汇报间隔内的速度（字节/秒）
+            eta: 预计剩余时间（秒），速度未知时为 None
+            finished: 是否为最后一次汇报
+            paused: 是否停在暂停状态（仍有未完成的任务）
+        """
+        self.bytes_done = bytes_done
+        self.total_bytes = total_bytes
+        self.elapsed = elapsed
+        self.speed = speed
+        self.instant_speed = instant_speed
+        self.eta = eta
+        self.finished = finished
+        self.paused = paused
+
+    @property
+    def percent(self) -> int:
+        if self.total_bytes <= 0:
+            return 100 if self.finished else 0
+        return min(100, int(self.bytes_done * 100 / self.total_bytes))
+
+    def __repr__(self) -> str:
+        return (f"TransferProgress({self.bytes_done}/{self.total_bytes} B, "
+                f"{self.speed / 1e6:.1f} MB/s, eta={self.eta})")
+
+
+class ProgressReporter:
+    """按时间合并进度汇报，并计算平滑速度与剩余时间"""
+
+    def __init__(self, total_bytes: int, callback: Callable[[TransferProgress], None],
+                 max_rate: float = 10.0, time_constant: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            total_bytes: 总字节数
+            callback: 汇报回调（在调用 update 的线程中执行）
+            max_rate: 每秒最多汇报次数
+            time_constant: 速度平滑的时间常数（秒），越大越平稳、对变化越迟钝
+            clock: 时钟函数
+        """
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.time_constant = time_constant
+        self.clock = clock
+        self.start_time = clock()
+        self._last_time = self.start_time
+        self._last_bytes = 0
+        self._bytes_done = 0
+        self._speed = 0.0
+        self._instant = 0.0
+
+    def set_total(self, total_bytes: int) -> None:
+        """总量变化（例如队列中加入了新文件）"""
+        self.total_bytes = total_bytes
+
+    def resume_from(self, bytes_done: int) -> None:
+        """从断点继续时设置已完成的字节数，这部分不计入速度"""
+        self._bytes_done = bytes_done
+        self._last_bytes = bytes_done
+
+    def rebase(self, delta: int) -> None:
+        """已完成字节数发生了不是复制产生的变化（续传起点、丢弃部分数据等），不计入速度"""
+        self._bytes_done += delta
+        self._last_bytes += delta
+
+    def update(self, bytes_done: int) -> bool:
+        """
+        记录新的进度，距上次汇报不足最小间隔时只保存数值
+
+        Returns:
+            本次是否触发了回调
+        """
+        self._bytes_done = bytes_done
+        now = self.clock()
+        if now - self._last_time < self.interval:
+            return False
+        self._sample(now)
+        self.callback(self._snapshot(now, False))
+        return True
+
+    def advance(self, delta: int) -> bool:
+        """在已有进度上增加 delta 字节"""
+        return self.update(self._bytes_done + delta)
+
+    def finish(self) -> TransferProgress:
+        """不论间隔，汇报最终进度"""
+        now = self.clock()
+        if now > self._last_time:
+            self._sample(now)
+        progress = self._snapshot(now, True)
+        self.callback(progress)
+        return progress
+
+    def pause(self) -> TransferProgress:
+        """不论间隔，汇报暂停状态（还有未完成的部分，剩余时间未知）"""
+        now = self.clock()
+        progress = TransferProgress(self._bytes_done, self.total_bytes, now - self.start_time,
+                                    0.0, 0.0, None, False, True)
+        self.callback(progress)
+        return progress
+
+    def _sample(self, now: float) -> None:
+        dt = now - self._last_time
+        if dt <= 0:
+            return
+        self._instant = (self._bytes_done - self._last_bytes) / dt
+        if self._speed == 0.0:
+            # 第一个样本直接作为初值，避免从 0 缓慢爬升
+            self._speed = self._instant
+        else:
+            # 按实际时间间隔计算权重，汇报间隔不均匀时平滑程度仍然一致
+            alpha = 1.0 - math.exp(-dt / self.time_constant)
+            self._speed += alpha * (self._instant - self._speed)
+        self._last_time = now
+        self._last_bytes = self._bytes_done
+
+    def _snapshot(self, now: float, finished: bool) -> TransferProgress:
+        remaining = max(0, self.total_bytes - self._bytes_done)
+        if finished or remaining == 0:
+            eta = 0.0
+        elif self._speed > 0:
+            eta = remaining / self._speed
+        else:
+            eta = None
+        return TransferProgress(self._bytes_done, self.total_bytes, now - self.start_time,
+                                self._speed, self._instant, eta, finished)
@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+传输队列
+一次加入多个文件和整个目录树，由固定数量的工作线程按队列顺序复制；
+同一目标设备上同时进行的任务数有上限（U 盘并发写入只会互相拖慢），
+不同设备之间可以并行。单个任务可以暂停、继续、取消和调整顺序，
+暂停的任务保留已复制的部分，继续时从断点接着复制；大文件的进度同时记录在传输日志中，
+取消、出错或 U 盘拔出后重新加入同一文件也能从检查点继续。
+小文件按批交给 SmallFileCopier 流水线复制，每批只汇报一次
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .copy_engine import CopyEngine
+from .file_listing import format_size
+from .io_profile import IOProfile
+from .small_files import SMALL_FILE_THRESHOLD, DirectoryPreparer, SmallFileCopier
+from .transfer_journal import TransferJournal, part_path, resumable_copy
+from .transfer_progress import ProgressReporter, TransferProgress
+
+# 任务状态
+PENDING = 'pending'
+RUNNING = 'running'
+PAUSED = 'paused'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# 已结束的状态
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class TransferJob:
+    """队列中的一个文件复制任务"""
+
+    def __init__(self, job_id: int, source: str, destination: str, size: int, device: int):
+        """
+        Args:
+            job_id: 任务编号（队列内唯一）
+            source: 源文件路径
+            destination: 目标文件路径
+            size: 源文件大小
+            device: 目标所在设备号（用于并发限制）
+        """
+        self.job_id = job_id
+        self.source = source
+        self.destination = destination
+        self.size = size
+        self.device = device
+        self.state = PENDING
+        self.copied = 0
+        self.error = ''
+        self.method = ''
+        self._stop_event = threading.Event()
+        self._stop_reason = ''   # PAUSED 或 CANCELLED
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.source)
+
+    @property
+    def percent(self) -> int:
+        return 100 if self.size <= 0 else min(100, int(self.copied * 100 / self.size))
+
+    def __repr__(self) -> str:
+        return f"TransferJob(#{self.job_id} {self.name!r}, {self.state}, {self.copied}/{self.size})"
+
+
+def expand_sources(sources: List[str], dest_dir: str) -> List[Tuple[str, str, int]]:
+    """
+    把文件和目录展开为 (源文件, 目标文件, 大小) 列表
+
+    目录按原有结构复制到 dest_dir 下的同名目录中；不跟随符号链接
+    """
+    items = []
+    for source in sources:
+        source = os.path.abspath(source)
+        base = os.path.basename(source.rstrip(os.sep)) or source
+        if not os.path.isdir(source) or os.path.islink(source):
+            try:
+                items.append((source, os.path.join(dest_dir, base), os.path.getsize(source)))
+            except OSError as e:
+                print(f"读取文件失败: {str(e)}")
+            continue
+
+        pending = [(source, os.path.join(dest_dir, base))]
+        while pending:
+            directory, target = pending.pop()
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError as e:
+                print(f"读取目录失败: {str(e)}")
+                continue
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append((entry.path, os.path.join(target, entry.name)))
+                    elif entry.is_file(follow_symlinks=False):
+                        items.append((entry.path, os.path.join(target, entry.name),
+                                      entry.stat(follow_symlinks=False).st_size))
+                except OSError:
+                    continue
+            # 倒序压栈，使子目录按名称顺序展开
+            pending.extend(reversed(subdirs))
+    return items
+
+
+class TransferQueue:
+    """多文件传输队列（线程安全）"""
+
+    def __init__(self, max_workers: int = 4, per_device: int = 1, chunk_size: Optional[int] = None,
+                 small_file_threshold: int = SMALL_FILE_THRESHOLD, small_batch_size: int = 64,
+                 preserve_times: bool = True, journal: Optional[TransferJournal] = None):
+        """
+        Args:
+            max_workers: 工作线程数（所有设备合计的并发上限）
+            per_device: 同一目标设备上同时进行的任务数上限（一批小文件算一个任务）
+            chunk_size: 复制分片大小，None 时按目标卷的 I/O 参数选择
+            small_file_threshold: 不超过该大小的文件按批流水线复制，0 表示不使用小文件模式
+            small_batch_size: 每批小文件的数量
+            preserve_times: 是否把源文件的修改时间复制到目标文件
+            journal: 断点续传日志，None 时在第一次执行时打开默认位置的日志
+        """
+        self.max_workers = max_workers
+        self.per_device = per_device
+        self.chunk_size = chunk_size
+        self.small_file_threshold = small_file_threshold
+        self.small_batch_size = small_batch_size
+        self.preserve_times = preserve_times
+        self.journal = journal
+        self._jobs: List[TransferJob] = []
+        self._next_id = 1
+        self._cond = threading.Condition()
+        self._running: Dict[int, int] = {}   # {设备号: 正在进行的任务数}
+        self._profiles: Dict[int, IOProfile] = {}
+        self._reporter: Optional[ProgressReporter] = None
+        self._bytes_done = 0                 # 未取消任务已复制的字节数合计
+        self._total_bytes = 0                # 未取消、未失败任务的字节数合计
+        self._scan_start = 0                 # 此前的任务都不是 PENDING，挑选任务时从这里开始
+        self._directories = DirectoryPreparer()
+
+    # ---------- 队列操作 ----------
+
+    def add(self, sources: List[str], dest_dir: str) -> List[TransferJob]:
+        """加入文件或目录，返回新建的任务"""
+        try:
+            device = os.stat(dest_dir).st_dev
+        except OSError as e:
+            print(f"读取目标目录失败: {str(e)}")
+            return []
+
+        # 遍历目录和读取卷参数较慢，不占用锁
+        items = expand_sources(sources, dest_dir)
+        profile = self._profiles.get(device) or IOProfile.probe(dest_dir)
+        jobs = []
+        with self._cond:
+            self._profiles[device] = profile
+            for source, destination, size in items:
+                jobs.append(TransferJob(self._next_id, source, destination, size, device))
+                self._next_id += 1
+            self._jobs.extend(jobs)
+            self._total_bytes += sum(job.size for job in jobs)
+            self._update_total()
+            self._cond.notify_all()
+        return jobs
+
+    def jobs(self) -> List[TransferJob]:
+        with self._cond:
+            return list(self._jobs)
+
+    def get(self, job_id: int) -> Optional[TransferJob]:
+        with self._cond:
+            return self._find(job_id)
+
+    def pause(self, job_id: int) -> bool:
+        """暂停任务（进行中的任务在当前分片结束后停下，保留已复制的部分）"""
+        with self._cond:
+            job = self._find(job_id)
+            if job is None or job.state not in (PENDING, RUNNING):
+                return False
+            if job.state == RUNNING:
+                job._stop_reason = PAUSED
+                job._stop_event.set()
+            else:
+                job.state = PAUSED
+            return True
+
+    def resume(self, job_id: int) -> bool:
+        """继续已暂停的任务，从已复制的位置接着复制"""
+        with self._cond:
+            job = self._find(job_id)
+            if job is None or job.state != PAUSED:
+                return False
+            job.state = PENDING
+            self._scan_start = 0
+            self._cond.notify_all()
+            return True
+
+    def cancel(self, job_id: int) -> bool:
+        """取消任务；记录了传输日志的大文件保留已复制的部分以便以后续传，其余删除"""
+        with self._cond:
+            job = self._find(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return False
+            if job.state == RUNNING:
+                job._stop_reason = CANCELLED
+                job._stop_event.set()
+            else:
+                if job.copied:
+                    self._discard_partial(job)
+                self._finish(job, CANCELLED)
+                self._cond.notify_all()
+            return True
+
+    def cancel_all(self) -> None:
+        for job in self.jobs():
+            self.cancel(job.job_id)
+
+    def move(self, job_id: int, offset: int) -> bool:
+        """在队列中前移 (offset < 0) 或后移任务，只影响尚未开始的任务的执行顺序"""
+        with self._cond:
+            job = self._find(job_id)
+            if job is None:
+                return False
+            index = self._jobs.index(job)
+            target = max(0, min(len(self._jobs) - 1, index + offset))
+            if target == index:
+                return False
+            self._jobs.insert(target, self._jobs.pop(index))
+            self._scan_start = 0
+            return True
+
+    def clear_finished(self) -> None:
+        """从列表中移除已结束的任务"""
+        with self._cond:
+            finished = [job for job in self._jobs if job.state in FINISHED_STATES]
+            self._jobs = [job for job in self._jobs if job.state not in FINISHED_STATES]
+            removed = sum(job.copied for job in finished)
+            self._bytes_done -= removed
+            if self._reporter is not None:
+                self._reporter.rebase(-removed)
+            self._total_bytes -= sum(job.size for job in finished if job.state == DONE)
+            self._scan_start = 0
+            self._update_total()
+
+    # ---------- 执行 ----------
+
+    def run(self, cancel_event: Optional[threading.Event] = None,
+            progress: Optional[Callable[[TransferProgress], None]] = None,
+            jobs_changed: Optional[Callable[[List[TransferJob]], None]] = None) -> None:
+        """
+        执行队列直到没有可执行的任务（暂停的任务不阻止结束）；执行期间可以继续加入任务
+
+        Args:
+            cancel_event: 被设置后取消所有任务
+            progress: 整批的汇总进度回调（在工作线程中执行，最多每秒 10 次）
+            jobs_changed: 任务状态变化回调，参数为状态变化的任务列表（在工作线程中执行）
+        """
+        def notify(jobs: List[TransferJob]) -> None:
+            if jobs_changed is not None and jobs:
+                jobs_changed(jobs)
+
+        if self.journal is None:
+            try:
+                self.journal = TransferJournal()
+                # 清理源文件已变化或已删除的未完成传输
+                self.journal.recover()
+            except (OSError, sqlite3.Error) as e:
+                print(f"打开传输日志失败，本次不支持断点续传: {str(e)}")
+
+        with self._cond:
+            # 从已复制的字节数开始（之前完成或暂停的任务），这部分不计入本次的速度
+            self._reporter = ProgressReporter(self._total_bytes, progress or (lambda _: None))
+            self._reporter.resume_from(self._bytes_done)
+            pending = [job for job in self._jobs if job.state == PENDING]
+
+        # 一次性创建所有待复制文件的目标目录
+        try:
+            self._directories.prepare(os.path.dirname(job.destination) for job in pending)
+        except OSError as e:
+            print(f"创建目标目录失败: {str(e)}")
+
+        def worker(copier: SmallFileCopier) -> None:
+            while True:
+                with self._cond:
+                    batch = self._next_batch(cancel_event)
+                    if not batch:
+                        return
+                    device = batch[0].device
+                    for job in batch:
+                        job.state = RUNNING
+                        job._stop_event.clear()
+                        job._stop_reason = ''
+                    self._running[device] = self._running.get(device, 0) + 1
+                notify(batch)
+                try:
+                    if len(batch) == 1 and not self._is_small(batch[0]):
+                        self._copy(batch[0], cancel_event)
+                    else:
+                        self._copy_small(batch, copier, cancel_event)
+                finally:
+                    with self._cond:
+                        self._running[device] -= 1
+                        self._cond.notify_all()
+                notify(batch)
+
+        with SmallFileCopier(self.max_workers, self.preserve_times, self._directories) as copier:
+            workers = [threading.Thread(target=worker, args=(copier,), daemon=True)
+                       for _ in range(self.max_workers)]
+            for thread in workers:
+                thread.start()
+            for thread in workers:
+                thread.join()
+
+        if cancel_event is not None and cancel_event.is_set():
+            notify([job for job in self.jobs() if self.cancel(job.job_id)])
+        with self._cond:
+            self._reporter.update(self._bytes_done)
+            if any(job.state in (PENDING, PAUSED) for job in self._jobs):
+                self._reporter.pause()
+            else:
+                self._reporter.finish()
+
+    def _is_small(self, job: TransferJob) -> bool:
+        # 暂停过的小文件也重新整份复制，不需要续传
+        return job.size <= self.small_file_threshold
+
+    def _next_batch(self, cancel_event: Optional[threading.Event]) -> List[TransferJob]:
+        """
+        等待并取出下一个可执行的任务（调用时持有锁）；没有剩余工作时返回空列表
+
+        小文件会连同队列中随后同一设备上的小文件一起取出，最多 small_batch_size 个
+        """
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                return []
+            # 跳过开头已经不是 PENDING 的任务（恢复、调整顺序时 _scan_start 会归零）
+            while self._scan_start < len(self._jobs) and self._jobs[self._scan_start].state != PENDING:
+                self._scan_start += 1
+            waiting = False
+            for index in range(self._scan_start, len(self._jobs)):
+                job = self._jobs[index]
+                if job.state != PENDING:
+                    continue
+                waiting = True
+                if self._running.get(job.device, 0) >= self.per_device:
+                    continue
+                if not self._is_small(job):
+                    return [job]
+                batch = [job]
+                for other in self._jobs[index + 1:]:
+                    if len(batch) >= self.small_batch_size:
+                        break
+                    if other.state == PENDING and other.device == job.device and self._is_small(other):
+                        batch.append(other)
+                return batch
+            if not waiting:
+                return []
+            # 有任务在等待设备空闲；超时醒来以便响应 cancel_event
+            self._cond.wait(0.2)
+
+    def _copy_small(self, batch: List[TransferJob], copier: SmallFileCopier,
+                    cancel_event: Optional[threading.Event]) -> None:
+        """流水线复制一批小文件，整批结束后统一更新状态和进度"""
+        results = copier.copy_batch([(job.source, job.destination) for job in batch], cancel_event)
+        with self._cond:
+            for job, result in zip(batch, results):
+                job.method = 'small_files'
+                if job._stop_reason == CANCELLED or (not result.ok and cancel_event is not None
+                                                     and cancel_event.is_set()):
+                    if result.ok:
+                        self._remove_partial(job, job.destination)
+                    self._finish(job, CANCELLED)
+                elif result.ok:
+                    # 复制期间被暂停的小文件已经复制完，直接算作完成
+                    self._set_copied(job, result.copied)
+                    job.state = DONE
+                else:
+                    job.error = result.error
+                    self._finish(job, FAILED)
+            self._reporter.update(self._bytes_done)
+
+    def _copy(self, job: TransferJob, cancel_event: Optional[threading.Event]) -> None:
+        profile = self._profiles.get(job.device)
+        if profile is not None and not profile.fits(job.size):
+            job.error = (f"{profile.fs_type} 文件系统的单个文件不能超过 "
+                         f"{format_size(profile.max_file_size)}")
+            self._finish(job, FAILED)
+            return
+
+        chunk_size = self.chunk_size or (profile.transfer_chunk_size if profile else 1024 * 1024)
+        engine = CopyEngine(chunk_size)
+
+        def on_progress(position: int) -> None:
+            if cancel_event is not None and cancel_event.is_set():
+                job._stop_reason = CANCELLED
+                job._stop_event.set()
+            with self._cond:
+                self._bytes_done += position - job.copied
+                job.copied = position
+                self._reporter.update(self._bytes_done)
+
+        try:
+            self._directories.prepare([os.path.dirname(job.destination)])
+            # 暂停过的任务从已复制的位置继续，否则由传输日志决定能否续传；
+            # 续传起点之前的数据不是本次复制的，只移动进度基准，不计入速度
+            result = resumable_copy(engine, job.source, job.destination, job.size, self.journal,
+                                    job.copied, job._stop_event, on_progress,
+                                    lambda offset: self._reset_copied(job, offset))
+            self._set_copied(job, result.copied)
+            job.method = result.method
+        except Exception as e:
+            job.error = str(e)
+            self._discard_partial(job)
+            self._finish(job, FAILED)
+            return
+
+        if result.cancelled:
+            if job._stop_reason == PAUSED:
+                job.state = PAUSED
+            else:
+                self._discard_partial(job)
+                self._finish(job, CANCELLED)
+        else:
+            if self.preserve_times:
+                self._copy_times(job)
+            job.state = DONE
+
+    # ---------- 内部工具 ----------
+
+    def _find(self, job_id: int) -> Optional[TransferJob]:
+        for job in self._jobs:
+            if job.job_id == job_id:
+                return job
+        return None
+
+    def _set_copied(self, job: TransferJob, copied: int) -> None:
+        with self._cond:
+            self._bytes_done += copied - job.copied
+            job.copied = copied
+
+    def _reset_copied(self, job: TransferJob, copied: int) -> None:
+        """修改已复制的字节数，但变化不是复制产生的（不计入速度）"""
+        with self._cond:
+            if self._reporter is not None:
+                self._reporter.rebase(copied - job.copied)
+            self._set_copied(job, copied)
+
+    def _finish(self, job: TransferJob, state: str) -> None:
+        """把任务标记为取消或失败，并从总量中扣除"""
+        with self._cond:
+            job.state = state
+            self._total_bytes -= job.size
+            self._update_total()
+
+    def _update_total(self) -> None:
+        if self._reporter is not None:
+            self._reporter.set_total(self._total_bytes)
+
+    @staticmethod
+    def _copy_times(job: TransferJob) -> None:
+        try:
+            st = os.stat(job.source)
+            os.utime(job.destination, ns=(st.st_atime_ns, st.st_mtime_ns))
+        except OSError:
+            pass
+
+    def _discard_partial(self, job: TransferJob) -> None:
+        """放弃任务的部分数据: 有传输日志的大文件保留 .part 文件以便续传，其余删除"""
+        if self.journal is not None and TransferJournal.covers(job.size):
+            self._reset_copied(job, 0)
+        else:
+            self._remove_partial(job, part_path(job.destination))
+
+    def _remove_partial(self, job: TransferJob, path: str) -> None:
+        self._reset_copied(job, 0)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            print(f"删除未完成的文件失败: {str(e)}")
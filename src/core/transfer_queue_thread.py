@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+传输队列线程
+在后台执行 TransferQueue，发出整批进度和单个任务的状态变化
+"""
+
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal
+
+from .transfer_queue import TransferQueue
+
+
+class TransferQueueThread(QThread):
+    """传输队列执行线程"""
+
+    # 信号定义
+    progress = pyqtSignal(object)  # 整批的 TransferProgress（最多每秒 10 次）
+    jobs_changed = pyqtSignal(list)  # 状态发生变化的 TransferJob 列表（小文件每批一次）
+    queue_finished = pyqtSignal()
+
+    def __init__(self, queue: TransferQueue):
+        """
+        Args:
+            queue: 要执行的传输队列（执行期间仍可加入、暂停、取消和调整任务）
+        """
+        super().__init__()
+        self.queue = queue
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        self.queue.run(self._cancel_event, self.progress.emit, self.jobs_changed.emit)
+        self.queue_finished.emit()
+
+    def cancel(self):
+        """取消队列中的所有任务"""
+        self._cancel_event.set()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内核 uevent 事件源
+通过 AF_NETLINK / NETLINK_KOBJECT_UEVENT 套接字接收热插拔事件，
+并提供可手动投递事件的替身事件源，便于在没有真实硬件时驱动上层逻辑
+"""
+
+import os
+import queue
+import select
+import socket
+from typing import List, Dict, Optional, Iterable
+
+
+NETLINK_KOBJECT_UEVENT = 15
+# 内核广播组（不经过 udev 重新处理的原始事件）
+UEVENT_KERNEL_GROUP = 1
+
+# 关心的子系统和动作
+WATCHED_SUBSYSTEMS = ('usb', 'block')
+WATCHED_ACTIONS = ('add', 'remove', 'change')
+
+
+def parse_uevent(data: bytes) -> Optional[Dict[str, str]]:
+    """
+    解析内核 uevent 报文
+
+    报文格式为 "action@devpath\\0KEY=VALUE\\0KEY=VALUE..."
+
+    Args:
+        data: 从 netlink 套接字读取到的原始字节
+
+    Returns:
+        包含 ACTION/DEVPATH/SUBSYSTEM 等键的字典，无法解析时返回 None
+    """
+    if not data:
+        return None
+
+    parts = data.split(b'\0')
+    header = parts[0].decode('utf-8', errors='replace')
+    # udev 重新广播的报文以 "libudev" 开头，是二进制格式，这里不处理
+    if '@' not in header:
+        return None
+
+    event = {}
+    for part in parts[1:]:
+        if not part:
+            continue
+        key, sep, value = part.decode('utf-8', errors='replace').partition('=')
+        if sep:
+            event[key] = value
+
+    action, _, devpath = header.partition('@')
+    event.setdefault('ACTION', action)
+    event.setdefault('DEVPATH', devpath)
+    return event
+
+
+def is_watched_event(event: Dict[str, str]) -> bool:
+    """判断事件是否属于关心的子系统和动作"""
+    return (event.get('SUBSYSTEM') in WATCHED_SUBSYSTEMS and
+            event.get('ACTION') in WATCHED_ACTIONS)
+
+
+class NetlinkUeventSource:
+    """基于 netlink 套接字的 uevent 事件源 (仅 Linux)"""
+
+    def __init__(self, recv_buffer_size: int = 1024 * 1024):
+        self.recv_buffer_size = recv_buffer_size
+        self._sock = None
+
+    def open(self) -> bool:
+        """
+        打开 netlink 套接字
+
+        Returns:
+            是否成功；非 Linux 系统或权限不足时返回 False
+        """
+        family = getattr(socket, 'AF_NETLINK', None)
+        if family is None:
+            return False
+
+        try:
+            sock = socket.socket(family, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+            except OSError:
+                pass
+            sock.bind((0, UEVENT_KERNEL_GROUP))
+        except OSError as e:
+            print(f"无法打开 netlink uevent 套接字: {str(e)}")
+            return False
+
+        self._sock = sock
+        return True
+
+    def read(self, timeout: float) -> List[Dict[str, str]]:
+        """
+        等待并读取事件
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            本次读取到的事件列表（可能为空）
+        """
+        if self._sock is None:
+            return []
+
+        events = []
+        try:
+            readable, _, _ = select.select([self._sock], [], [], timeout)
+            while readable:
+                data = self._sock.recv(65536)
+                event = parse_uevent(data)
+                if event:
+                    events.append(event)
+                # 一次性把已到达的报文读完，减少唤醒次数
+                readable, _, _ = select.select([self._sock], [], [], 0)
+        except (OSError, ValueError):
+            pass
+        return events
+
+    def close(self) -> None:
+        """关闭套接字"""
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+
+class FakeUeventSource:
+    """
+    替身事件源
+    通过 push() 手动投递事件，接口与 NetlinkUeventSource 相同
+    """
+
+    def __init__(self, events: Optional[Iterable[Dict[str, str]]] = None, available: bool = True):
+        """
+        Args:
+            events: 初始事件序列
+            available: open() 的返回值，设为 False 可模拟套接字打不开的情况
+        """
+        self.available = available
+        self._queue = queue.Queue()
+        for event in events or []:
+            self.push(event)
+
+    def open(self) -> bool:
+        return self.available
+
+    def push(self, event: Dict[str, str]) -> None:
+        """投递一个事件"""
+        self._queue.put(dict(event))
+
+    def read(self, timeout: float) -> List[Dict[str, str]]:
+        events = []
+        try:
+            events.append(self._queue.get(timeout=timeout))
+            while True:
+                events.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+def default_event_source():
+    """返回当前平台默认的事件源"""
+    if os.name == 'posix' and hasattr(socket, 'AF_NETLINK'):
+        return NetlinkUeventSource()
+    return FakeUeventSource(available=False)
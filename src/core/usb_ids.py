@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+usb.ids 厂商/产品名称查询
+以内存映射方式打开系统（或随程序附带的）usb.ids 文件，
+首次使用时生成持久化的二进制索引（定长记录、按 ID 排序），之后用二分查找，
+名称直接从映射的 usb.ids 中按偏移量读取，启动时不再逐行解析文本
+"""
+
+import mmap
+import os
+import struct
+from typing import Optional, Tuple
+
+
+# 常见的 usb.ids 位置（按优先级）
+USB_IDS_PATHS = [
+    '/usr/share/hwdata/usb.ids',
+    '/usr/share/misc/usb.ids',
+    '/usr/share/usb.ids',
+    '/var/lib/usbutils/usb.ids',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                 'resources', 'usb.ids'),
+]
+
+# 索引文件格式:
+#   头部: 魔数(8) + 源文件大小(Q) + 源文件 mtime_ns(q) + 厂商记录数(I) + 产品记录数(I)
+#   厂商记录: vid(I) + 名称偏移(I) + 名称长度(I)
+#   产品记录: (vid << 16 | pid)(I) + 名称偏移(I) + 名称长度(I)
+INDEX_MAGIC = b'USBIDX1\0'
+HEADER = struct.Struct('<8sQqII')
+RECORD = struct.Struct('<III')
+
+
+def default_index_path() -> str:
+    """索引文件的默认缓存位置"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'usb_monitor', 'usb_ids.idx')
+
+
+def find_usb_ids() -> Optional[str]:
+    """查找可用的 usb.ids 文件"""
+    for path in USB_IDS_PATHS:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _is_hex4(data: bytes, start: int) -> bool:
+    chunk = data[start:start + 4]
+    return len(chunk) == 4 and all(c in b'0123456789abcdefABCDEF' for c in chunk)
+
+
+def build_index(ids_path: str, index_path: str) -> None:
+    """
+    扫描一遍 usb.ids，生成二进制索引文件
+
+    Args:
+        ids_path: usb.ids 路径
+        index_path: 输出的索引文件路径
+    """
+    st = os.stat(ids_path)
+    vendors = []
+    products = []
+
+    with open(ids_path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b''
+        try:
+            pos = 0
+            size = len(data)
+            vid = None
+            while pos < size:
+                end = data.find(b'\n', pos)
+                if end == -1:
+                    end = size
+                first = data[pos:pos + 1]
+
+                if first == b'#' or end == pos:
+                    pass
+                elif first == b'\t':
+                    # 产品行: "\tpppp  Name"；两个制表符的是接口行，跳过
+                    if vid is not None and data[pos + 1:pos + 2] != b'\t' and _is_hex4(data, pos + 1):
+                        pid = int(data[pos + 1:pos + 5], 16)
+                        name_start = pos + 7
+                        products.append(((vid << 16) | pid, name_start, _name_length(data, name_start, end)))
+                elif _is_hex4(data, pos):
+                    # 厂商行: "vvvv  Name"
+                    vid = int(data[pos:pos + 4], 16)
+                    name_start = pos + 6
+                    vendors.append((vid, name_start, _name_length(data, name_start, end)))
+                else:
+                    # 进入设备类 (C)、HID 等其他段落，厂商列表结束
+                    break
+
+                pos = end + 1
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    vendors.sort()
+    products.sort()
+
+    os.makedirs(os.path.dirname(index_path) or '.', exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as out:
+        out.write(HEADER.pack(INDEX_MAGIC, st.st_size, st.st_mtime_ns, len(vendors), len(products)))
+        for record in vendors:
+            out.write(RECORD.pack(*record))
+        for record in products:
+            out.write(RECORD.pack(*record))
+    os.replace(tmp_path, index_path)
+
+
+def _name_length(data, start: int, end: int) -> int:
+    # 去掉行尾的 \r
+    if end > start and data[end - 1:end] == b'\r':
+        end -= 1
+    return max(0, end - start)
+
+
+class UsbIdsDatabase:
+    """usb.ids 名称查询（内存映射 + 二分查找）"""
+
+    def __init__(self, ids_path: Optional[str] = None, index_path: Optional[str] = None):
+        """
+        Args:
+            ids_path: usb.ids 路径，默认自动查找
+            index_path: 索引文件路径，默认放在用户缓存目录
+        """
+        self.ids_path = ids_path or find_usb_ids()
+        self.index_path = index_path or default_index_path()
+        self._ids_file = None
+        self._ids_map = None
+        self._index_file = None
+        self._index_map = None
+        self._vendor_count = 0
+        self._product_count = 0
+        self._opened = False
+
+    def open(self) -> bool:
+        """映射 usb.ids 和索引，索引缺失或过期时重新生成"""
+        if self._opened:
+            return self._ids_map is not None
+        self._opened = True
+
+        if not self.ids_path or not os.path.isfile(self.ids_path):
+            return False
+
+        try:
+            if not self._index_is_current():
+                build_index(self.ids_path, self.index_path)
+
+            self._ids_file = open(self.ids_path, 'rb')
+            self._ids_map = mmap.mmap(self._ids_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._index_file = open(self.index_path, 'rb')
+            self._index_map = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            _, _, _, self._vendor_count, self._product_count = HEADER.unpack_from(self._index_map, 0)
+            return True
+        except (OSError, ValueError, struct.error) as e:
+            print(f"加载 usb.ids 失败: {str(e)}")
+            self.close()
+            return False
+
+    def close(self) -> None:
+        """释放映射和文件句柄"""
+        for attr in ('_ids_map', '_index_map', '_ids_file', '_index_file'):
+            handle = getattr(self, attr)
+            if handle is not None:
+                handle.close()
+                setattr(self, attr, None)
+
+    def lookup_vendor(self, vid: int) -> Optional[str]:
+        """查询厂商名称"""
+        if not self.open():
+            return None
+        return self._search(HEADER.size, self._vendor_count, vid)
+
+    def lookup_product(self, vid: int, pid: int) -> Optional[str]:
+        """查询产品名称"""
+        if not self.open():
+            return None
+        base = HEADER.size + self._vendor_count * RECORD.size
+        return self._search(base, self._product_count, (vid << 16) | pid)
+
+    def lookup(self, vid_pid: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        按 "vvvv:pppp" 字符串查询（大小写不敏感）
+
+        Returns:
+            (厂商名称, 产品名称)，查不到的部分为 None
+        """
+        try:
+            vid_text, pid_text = vid_pid.split(':', 1)
+            vid, pid = int(vid_text, 16), int(pid_text, 16)
+        except (AttributeError, ValueError):
+            return None, None
+        return self.lookup_vendor(vid), self.lookup_product(vid, pid)
+
+    def _index_is_current(self) -> bool:
+        try:
+            st = os.stat(self.ids_path)
+            with open(self.index_path, 'rb') as f:
+                header = f.read(HEADER.size)
+            magic, size, mtime_ns, _, _ = HEADER.unpack(header)
+        except (OSError, struct.error):
+            return False
+        return magic == INDEX_MAGIC and size == st.st_size and mtime_ns == st.st_mtime_ns
+
+    def _search(self, base: int, count: int, key: int) -> Optional[str]:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_key, offset, length = RECORD.unpack_from(self._index_map, base + mid * RECORD.size)
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                return self._ids_map[offset:offset + length].decode('utf-8', errors='replace')
+        return None
+
+
+_database = None
+
+
+def get_usb_ids() -> UsbIdsDatabase:
+    """返回进程内共享的 usb.ids 数据库（延迟打开）"""
+    global _database
+    if _database is None:
+        _database = UsbIdsDatabase()
+    return _database
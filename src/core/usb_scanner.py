@@ -8,26 +8,46 @@ USB 设备扫描器
 import subprocess
 import json
 import platform
-import re
-from typing import List, Dict, Optional
+import time
+from typing import List, Optional
+
+from .device_record import DeviceRecord
+from .sysfs_scanner import SysfsUSBScanner
+from .scan_cache import scan_cache, USB_DEVICES
+from .usb_ids import get_usb_ids
+from .probe_runner import Probe, probe_runner
+from .scan_metrics import scan_metrics
+from .wmic_parser import (
+    DeviceMerger, iter_wmic_csv, iter_cim_json,
+    STORAGE_COLUMNS, PNP_COLUMNS, WMIC_EXCLUDED_KEYWORDS, CIM_EXCLUDED_KEYWORDS
+)
 
 
 class USBScanner:
     """USB 设备扫描器类"""
     
     @staticmethod
-    def scan_devices(timeout: int = 10) -> List[Dict[str, str]]:
+    def scan_devices(timeout: int = 10, use_cache: bool = True) -> List[DeviceRecord]:
         """
         扫描所有 USB 设备
         
         Args:
             timeout: 超时时间（秒）
+            use_cache: 是否允许复用 TTL 时间窗口内的扫描结果
             
         Returns:
-            设备信息列表
+            设备记录列表
         """
+        if not use_cache:
+            scan_cache.invalidate(USB_DEVICES)
+        return list(scan_cache.get(USB_DEVICES, lambda: USBScanner._scan_all_devices(timeout)))
+
+    @staticmethod
+    def _scan_all_devices(timeout: int) -> List[DeviceRecord]:
+        """实际执行扫描（不经过缓存）"""
         devices = []
         system = platform.system()
+        start = time.perf_counter()
         
         try:
             if system == "Darwin":  # macOS
@@ -38,338 +58,122 @@ class USBScanner:
                 USBScanner._scan_linux_devices(devices, timeout)
                 
         except Exception as e:
+            scan_metrics.record_error('scan.usb', e)
             print(f"扫描 USB 设备出错: {str(e)}")
-            
-        return devices
-
-    @staticmethod
-    def _extract_vid_pid(device_id: str) -> str:
-        """从设备 ID 中提取 VID:PID"""
-        if not device_id:
-            return 'N/A'
         
-        # 匹配 VID_xxxx 和 PID_xxxx
-        vid_match = re.search(r'VID_([0-9A-Fa-f]{4})', device_id, re.IGNORECASE)
-        pid_match = re.search(r'PID_([0-9A-Fa-f]{4})', device_id, re.IGNORECASE)
-        
-        if vid_match and pid_match:
-            return f"{vid_match.group(1)}:{pid_match.group(1)}".upper()
-        return 'N/A'
-
-    @staticmethod
-    def _extract_serial_from_pnp(device_id: str) -> str:
-        """尝试从 PNP Device ID 中提取序列号 (通常是最后一部分)"""
-        if not device_id:
-            return 'N/A'
-        try:
-            # 格式通常是 USB\VID_xxxx&PID_xxxx\SERIAL_NUMBER
-            parts = device_id.split('\\')
-            if len(parts) >= 3:
-                serial = parts[-1]
-                # 如果序列号包含 &，通常表示它是生成的实例 ID 而不是纯硬件序列号
-                if '&' not in serial:
-                    return serial
-        except:
-            pass
-        return 'N/A'
+        with scan_metrics.timer('lookup.usb_ids'):
+            USBScanner._fill_names_from_usb_ids(devices)
+        scan_metrics.record('scan.usb', time.perf_counter() - start)
+        return devices
 
     @staticmethod
-    def _parse_wmic_output(output: str, required_cols: List[str]) -> List[Dict[str, str]]:
-        """
-        通用解析 WMIC CSV 输出的方法
-        自动根据表头识别列索引，解决列顺序不一致的问题
-        """
-        results = []
-        # 过滤掉空行
-        lines = [line.strip() for line in output.strip().split('\n') if line.strip()]
-        
-        if len(lines) < 2:
-            return results
-            
-        # 1. 解析表头，建立 {列名: 索引} 映射
-        header = lines[0].split(',')
-        # 去除表头可能存在的 BOM 或空白
-        header = [h.strip() for h in header]
-        
-        col_indices = {}
-        for col in required_cols:
-            try:
-                # 查找列名位置
-                idx = header.index(col)
-                col_indices[col] = idx
-            except ValueError:
-                # 某些列可能不存在
-                col_indices[col] = -1
-        
-        # 2. 解析数据行
-        for line in lines[1:]:
-            parts = line.split(',')
-            
-            # 确保行长度足够
-            if not parts:
+    def _fill_names_from_usb_ids(devices: list) -> None:
+        """设备没有字符串描述符时，用 usb.ids 补全名称和制造商"""
+        usb_ids = None
+        for index, device in enumerate(devices):
+            missing_name = device.name in ('Unknown', 'Unknown Device')
+            missing_vendor = device.manufacturer in ('N/A', 'Generic')
+            if not (missing_name or missing_vendor) or device.vid_pid == 'N/A':
                 continue
-                
-            row_data = {}
-            for col, idx in col_indices.items():
-                if idx != -1 and idx < len(parts):
-                    row_data[col] = parts[idx].strip()
-                else:
-                    row_data[col] = ''
-            results.append(row_data)
             
-        return results
+            if usb_ids is None:
+                usb_ids = get_usb_ids()
+            vendor, product = usb_ids.lookup(device.vid_pid)
+            changes = {}
+            if missing_name and product:
+                changes['name'] = product
+            if missing_vendor and vendor:
+                changes['manufacturer'] = vendor
+            if changes:
+                devices[index] = device.replace(**changes)
 
     @staticmethod
     def _scan_windows_devices(devices: list, timeout: int) -> None:
         """
         在 Windows 上扫描外部 USB 设备
         优先尝试 wmic，如果失败或无结果，回退到 PowerShell
+        同一阶段内的查询并发执行，两个阶段共用 timeout 作为总截止时间
         """
         initial_count = len(devices)
+        start = time.monotonic()
         
         # --- 尝试 1: WMIC (速度快) ---
-        try:
-            # 1. 扫描存储设备 (Win32_DiskDrive)
-            result = subprocess.run(
-                'wmic diskdrive get Caption,Manufacturer,SerialNumber,PNPDeviceID,InterfaceType /format:csv',
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                shell=True,
-                encoding='gbk',
-                errors='ignore'
-            )
-            
-            if result.returncode == 0:
-                rows = USBScanner._parse_wmic_output(result.stdout, ['Caption', 'Manufacturer', 'SerialNumber', 'PNPDeviceID', 'InterfaceType'])
-                
-                for row in rows:
-                    name = row.get('Caption', 'Unknown')
-                    manufacturer = row.get('Manufacturer', 'N/A')
-                    pnp_id = row.get('PNPDeviceID', '')
-                    interface = row.get('InterfaceType', '').upper()
-                    
-                    # 核心判定逻辑：
-                    # 1. 接口类型明确为 USB
-                    # 2. PNP ID 包含 USBSTOR (传统 USB 大容量存储)
-                    # 3. PNP ID 包含 USB (某些 UAS 设备或复合设备)
-                    is_usb_device = 'USB' in interface or 'USB' in pnp_id.upper()
-                    
-                    if not is_usb_device:
-                        continue
-                    
-                    # 优先使用 wmic 返回的 SerialNumber
-                    serial = row.get('SerialNumber', '')
-                    if not serial or serial == '0' or len(serial) < 2:
-                         serial = USBScanner._extract_serial_from_pnp(pnp_id)
-                    
-                    vid_pid = USBScanner._extract_vid_pid(pnp_id)
-                    
-                    devices.append({
-                        'name': name,
-                        'manufacturer': manufacturer if manufacturer and manufacturer != '(Standard disk drives)' else 'Generic',
-                        'serial': serial,
-                        'bus': 'USB Storage',
-                        'speed': 'USB 3.0',
-                        'vid_pid': vid_pid
-                    })
-
-            # 2. 补充查询其他 USB 设备 (Win32_PnPEntity)
-            excluded_keywords = [
-                'root hub', 'generic usb hub', 'host controller', 
-                'pcie', 'pci express', 'intel(r)', 'amd',
-                'mass storage', 'usb printing support'
-            ]
+        # 存储设备 (Win32_DiskDrive) 和其他 USB 设备 (Win32_PnPEntity) 同时查询
+        results = probe_runner.run([
+            Probe('disk',
+                  'wmic diskdrive get Caption,Manufacturer,SerialNumber,PNPDeviceID,InterfaceType /format:csv',
+                  timeout=timeout, shell=True, encodings=('gbk',), metric_name='subprocess.wmic.diskdrive'),
+            Probe('pnp',
+                  'wmic path Win32_PnPEntity where "PNPClass=\'USB\'" get Name,Manufacturer,DeviceID /format:csv',
+                  timeout=5, shell=True, encodings=('gbk',), metric_name='subprocess.wmic.pnp'),
+        ], deadline=timeout)
+        
+        with scan_metrics.timer('parse.wmic'):
+            merger = DeviceMerger(devices)
+            if results['disk'].ok:
+                merger.add_storage_rows(iter_wmic_csv(results['disk'].stdout, STORAGE_COLUMNS))
             
-            # 如果存储设备很少，尝试扫描其他设备
-            if len(devices) < 20:
-                result2 = subprocess.run(
-                    'wmic path Win32_PnPEntity where "PNPClass=\'USB\'" get Name,Manufacturer,DeviceID /format:csv',
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    shell=True,
-                    encoding='gbk',
-                    errors='ignore'
-                )
-                
-                if result2.returncode == 0:
-                    rows = USBScanner._parse_wmic_output(result2.stdout, ['Name', 'Manufacturer', 'DeviceID'])
-                    for row in rows:
-                        name = row.get('Name', '')
-                        manufacturer = row.get('Manufacturer', 'N/A')
-                        device_id = row.get('DeviceID', '')
-                        
-                        if not name: continue
-                        name_lower = name.lower()
-                        
-                        # 去重：过滤掉已经作为存储设备添加过的设备
-                        vid_pid = USBScanner._extract_vid_pid(device_id)
-                        if any(d['vid_pid'] == vid_pid and d['vid_pid'] != 'N/A' for d in devices):
-                            continue
-
-                        # 白名单逻辑
-                        whitelist_keywords = ['keyboard', 'mouse', 'audio', 'video', 'camera', 'webcam', 'bluetooth', '键盘', '鼠标']
-                        is_whitelisted = any(k in name_lower for k in whitelist_keywords)
-
-                        if not is_whitelisted:
-                            if any(k in name_lower for k in excluded_keywords):
-                                continue
-                            if any(d['vid_pid'] == vid_pid and d['vid_pid'] != 'N/A' for d in devices):
-                                continue
-                        
-                        serial = USBScanner._extract_serial_from_pnp(device_id)
-                        
-                        devices.append({
-                            'name': name,
-                            'manufacturer': manufacturer if manufacturer else 'N/A',
-                            'serial': serial,
-                            'bus': 'USB',
-                            'speed': 'N/A',
-                            'vid_pid': vid_pid
-                        })
-        except Exception:
-            pass
+            # 补充其他 USB 设备 (Win32_PnPEntity)；如果存储设备很多则跳过
+            if len(devices) < 20 and results['pnp'].ok:
+                merger.add_pnp_rows(iter_wmic_csv(results['pnp'].stdout, PNP_COLUMNS), WMIC_EXCLUDED_KEYWORDS)
 
         # --- 尝试 2: PowerShell 回退 (如果 WMIC 未找到设备或兼容性差) ---
         # 如果 devices 列表没有变化（即 WMIC 可能失败了），尝试 PowerShell
-        if len(devices) == initial_count:
+        remaining = timeout - (time.monotonic() - start)
+        if len(devices) == initial_count and remaining > 0:
             try:
-                USBScanner._scan_windows_via_powershell(devices, timeout)
+                USBScanner._scan_windows_via_powershell(devices, remaining)
             except Exception as e:
+                scan_metrics.record_error('scan.usb.powershell', e)
                 print(f"PowerShell 扫描失败: {e}")
 
     @staticmethod
-    def _scan_windows_via_powershell(devices: list, timeout: int) -> None:
+    def _scan_windows_via_powershell(devices: list, timeout: float) -> None:
         """
         使用 PowerShell 扫描设备 (Win11 兼容性更好)
         """
-        # 1. 扫描磁盘驱动器
         cmd_disk = (
             "Get-CimInstance Win32_DiskDrive | "
             "Select-Object Caption,Manufacturer,SerialNumber,PNPDeviceID,InterfaceType | "
             "ConvertTo-Json -Compress"
         )
-        
-        try:
-            # PowerShell 输出一般是 UTF-8 或系统默认，JSON 解析更安全
-            result = subprocess.run(
-                ["powershell", "-Command", cmd_disk],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                encoding='gbk', # 尝试系统默认编码
-                errors='ignore'
-            )
-            
-            # 如果输出为空或失败，可能是编码问题，尝试 utf-8
-            if not result.stdout.strip():
-                 result = subprocess.run(
-                    ["powershell", "-Command", cmd_disk],
-                    capture_output=True,
-                    text=True,
-                    timeout=timeout,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
-
-            if result.returncode == 0 and result.stdout.strip():
-                try:
-                    data = json.loads(result.stdout)
-                    if isinstance(data, dict): data = [data] # 单个对象转列表
-                    
-                    for item in data:
-                        name = item.get('Caption', 'Unknown')
-                        manufacturer = item.get('Manufacturer', 'N/A')
-                        pnp_id = item.get('PNPDeviceID', '')
-                        interface = str(item.get('InterfaceType', '')).upper()
-                        
-                        is_usb_device = 'USB' in interface or 'USB' in str(pnp_id).upper()
-                        if not is_usb_device: continue
-                        
-                        serial = item.get('SerialNumber', '')
-                        if not serial or serial == '0':
-                            serial = USBScanner._extract_serial_from_pnp(pnp_id)
-                            
-                        vid_pid = USBScanner._extract_vid_pid(pnp_id)
-                        
-                        devices.append({
-                            'name': name,
-                            'manufacturer': manufacturer if manufacturer != '(Standard disk drives)' else 'Generic',
-                            'serial': serial,
-                            'bus': 'USB Storage',
-                            'speed': 'USB 3.0',
-                            'vid_pid': vid_pid
-                        })
-                except json.JSONDecodeError:
-                    pass
-        except Exception:
-            pass
-
-        # 2. 扫描 PNP 实体
         cmd_pnp = (
             "Get-CimInstance Win32_PnPEntity -Filter \"PNPClass='USB'\" | "
             "Select-Object Name,Manufacturer,DeviceID | "
             "ConvertTo-Json -Compress"
         )
         
+        # PowerShell 输出一般是系统默认编码 (gbk) 或 UTF-8，依次尝试解码
+        # JSON 解析更安全
+        results = probe_runner.run([
+            Probe('disk', ["powershell", "-Command", cmd_disk], timeout=timeout,
+                  encodings=('gbk', 'utf-8'), metric_name='subprocess.powershell.diskdrive'),
+            Probe('pnp', ["powershell", "-Command", cmd_pnp], timeout=min(5, timeout),
+                  encodings=('gbk', 'utf-8'), metric_name='subprocess.powershell.pnp'),
+        ], deadline=timeout)
+        
+        with scan_metrics.timer('parse.cim_json'):
+            merger = DeviceMerger(devices)
+            if results['disk'].ok:
+                merger.add_storage_rows(iter_cim_json(results['disk'].stdout))
+            if results['pnp'].ok:
+                merger.add_pnp_rows(iter_cim_json(results['pnp'].stdout), CIM_EXCLUDED_KEYWORDS)
+    
+    @staticmethod
+    def _run_command(cmd: List[str], timeout: float, metric_name: str) -> subprocess.CompletedProcess:
+        """执行命令并记录耗时、超时和错误，异常照常抛出"""
+        start = time.perf_counter()
         try:
-            result = subprocess.run(
-                ["powershell", "-Command", cmd_pnp],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                encoding='gbk',
-                errors='ignore'
-            )
-            
-            if not result.stdout.strip():
-                 result = subprocess.run(
-                    ["powershell", "-Command", cmd_pnp],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    encoding='utf-8',
-                    errors='ignore'
-                )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                try:
-                    data = json.loads(result.stdout)
-                    if isinstance(data, dict): data = [data]
-                    
-                    excluded_keywords = ['root hub', 'generic usb hub', 'host controller', 'pcie', 'intel(r)', 'amd']
-                    
-                    for item in data:
-                        name = item.get('Name', '')
-                        manufacturer = item.get('Manufacturer', 'N/A')
-                        device_id = item.get('DeviceID', '')
-                        
-                        if not name: continue
-                        name_lower = name.lower()
-                        
-                        vid_pid = USBScanner._extract_vid_pid(device_id)
-                        if any(d['vid_pid'] == vid_pid and d['vid_pid'] != 'N/A' for d in devices):
-                            continue
-                            
-                        whitelist = ['keyboard', 'mouse', 'audio', 'video', 'camera', 'webcam', 'bluetooth', '键盘', '鼠标']
-                        if not any(k in name_lower for k in whitelist):
-                            if any(k in name_lower for k in excluded_keywords): continue
-                        
-                        serial = USBScanner._extract_serial_from_pnp(device_id)
-                        
-                        devices.append({
-                            'name': name,
-                            'manufacturer': manufacturer,
-                            'serial': serial,
-                            'bus': 'USB',
-                            'speed': 'N/A',
-                            'vid_pid': vid_pid
-                        })
-                except json.JSONDecodeError:
-                    pass
-        except Exception:
-            pass
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            scan_metrics.record_subprocess(metric_name, time.perf_counter() - start, timed_out=True)
+            raise
+        except OSError as e:
+            scan_metrics.record_subprocess(metric_name, time.perf_counter() - start, error=str(e))
+            raise
+        error = f"返回码 {result.returncode}" if result.returncode != 0 else None
+        scan_metrics.record_subprocess(metric_name, time.perf_counter() - start, error=error)
+        return result
     
     @staticmethod
     def _scan_macos_devices(devices: list, timeout: int) -> None:
@@ -386,16 +190,13 @@ class USBScanner:
                     mounted_volumes.add(volume.name)
         
         try:
-            result = subprocess.run(
-                ['system_profiler', 'SPUSBDataType', '-json'],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            result = USBScanner._run_command(
+                ['system_profiler', 'SPUSBDataType', '-json'], timeout, 'subprocess.system_profiler')
             
             if result.returncode == 0:
-                data = json.loads(result.stdout)
-                USBScanner._parse_macos_usb_data(data, devices, mounted_volumes)
+                with scan_metrics.timer('parse.system_profiler'):
+                    data = json.loads(result.stdout)
+                    USBScanner._parse_macos_usb_data(data, devices, mounted_volumes)
                 
         except subprocess.TimeoutExpired:
             print(f"扫描超时（{timeout}秒）")
@@ -406,14 +207,18 @@ class USBScanner:
     def _scan_linux_devices(devices: list, timeout: int) -> None:
         """
         在 Linux 上扫描 USB 设备
+        优先直接读取 sysfs，不可用时回退到 lsusb
         """
+        sysfs_scanner = SysfsUSBScanner()
+        if sysfs_scanner.is_available():
+            with scan_metrics.timer('sysfs.usb'):
+                sysfs_devices = sysfs_scanner.scan_devices()
+            if sysfs_devices:
+                devices.extend(sysfs_devices)
+                return
+
         try:
-            result = subprocess.run(
-                ['lsusb'],
-                capture_output=True,
-                text=True,
-                timeout=timeout
-            )
+            result = USBScanner._run_command(['lsusb'], timeout, 'subprocess.lsusb')
             
             if result.returncode == 0:
                 for line in result.stdout.strip().split('\n'):
@@ -429,14 +234,12 @@ class USBScanner:
                                 
                                 bus_num = meta.split('Bus ')[1].split(' ')[0]
                                 
-                                devices.append({
-                                    'name': name.strip(),
-                                    'manufacturer': 'N/A',
-                                    'serial': 'N/A',
-                                    'bus': f"Bus {bus_num}",
-                                    'speed': 'N/A',
-                                    'vid_pid': vid_pid
-                                })
+                                devices.append(DeviceRecord(
+                                    name=name.strip(),
+                                    bus=f"Bus {bus_num}",
+                                    vid_pid=vid_pid,
+                                    busnum=int(bus_num) if bus_num.isdigit() else None
+                                ))
                         except:
                             pass
                             
@@ -480,14 +283,14 @@ class USBScanner:
             # 综合判断
             is_storage = has_storage_keyword or has_mounted_volume or has_bsd_name
             
-            device_info = {
-                'name': name,
-                'manufacturer': item.get('manufacturer', 'N/A'),
-                'serial': item.get('serial_num', 'N/A'),
-                'bus': 'USB Storage' if is_storage else bus_name,  # 标记存储设备
-                'speed': item.get('device_speed', 'N/A'),
-                'vid_pid': f"{item.get('vendor_id', 'N/A')}:{item.get('product_id', 'N/A')}"
-            }
+            device_info = DeviceRecord(
+                name=name,
+                manufacturer=item.get('manufacturer', 'N/A'),
+                serial=item.get('serial_num', 'N/A'),
+                bus='USB Storage' if is_storage else bus_name,  # 标记存储设备
+                speed=item.get('device_speed', 'N/A'),
+                vid_pid=f"{item.get('vendor_id', 'N/A')}:{item.get('product_id', 'N/A')}"
+            )
             devices.append(device_info)
             
             if '_items' in item:
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+USB 拓扑与协商速率分析
+根据 sysfs 中的 devpath / 端口链构建设备树，比较每个设备的协商速率 (speed)
+与描述符声明的能力 (bcdUSB，即 sysfs 的 version)，找出降速运行的设备，
+并按根集线器汇总
+"""
+
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from .device_record import capability_from_version, SUPER_SPEED_MBPS
+from .sysfs_scanner import SysfsUSBScanner
+
+
+def format_mbps(mbps: Optional[float]) -> str:
+    """把 Mbps 数值格式化为易读的文本"""
+    if mbps is None:
+        return 'N/A'
+    if mbps >= 1000:
+        return f"{mbps / 1000:g} Gb/s"
+    return f"{mbps:g} Mb/s"
+
+
+class TopologyNode:
+    """拓扑中的一个 USB 设备（包括集线器和根集线器）"""
+
+    def __init__(self, name: str, busnum: Optional[int], devpath: str, vid_pid: str,
+                 product: str, speed_mbps: Optional[float], version: str,
+                 is_hub: bool, controller: str):
+        self.name = name
+        self.busnum = busnum
+        self.devpath = devpath
+        self.vid_pid = vid_pid
+        self.product = product
+        self.speed_mbps = speed_mbps
+        self.version = version
+        self.capability_mbps = capability_from_version(version)
+        self.is_hub = is_hub
+        self.controller = controller
+        self.parent: Optional['TopologyNode'] = None
+        self.children: List['TopologyNode'] = []
+
+    @property
+    def is_root_hub(self) -> bool:
+        return self.name.startswith('usb')
+
+    @property
+    def is_degraded(self) -> bool:
+        """支持 SuperSpeed 却以更低速率运行（与 DeviceRecord.is_below_capability 判定一致）"""
+        return (self.capability_mbps is not None and self.speed_mbps is not None and
+                self.capability_mbps >= SUPER_SPEED_MBPS and self.speed_mbps < SUPER_SPEED_MBPS)
+
+    def upstream(self) -> List['TopologyNode']:
+        """从直接上级到根集线器的链路"""
+        chain = []
+        node = self.parent
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        return chain
+
+    def root(self) -> 'TopologyNode':
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def __repr__(self) -> str:
+        return f"TopologyNode({self.name!r}, {self.product!r}, {format_mbps(self.speed_mbps)})"
+
+
+class UsbTopology:
+    """USB 拓扑模型"""
+
+    def __init__(self):
+        self.nodes: Dict[str, TopologyNode] = {}
+        # 每个主控制器上各根集线器的速率，用于判断端口本身是否支持 USB 3
+        self._controller_speeds: Dict[str, List[float]] = {}
+        # 以 SuperSpeed 运行的集线器 {(主控制器, 端口路径)}
+        self._superspeed_hubs: Set[Tuple[str, str]] = set()
+
+    @classmethod
+    def from_sysfs(cls, sysfs_root: str = '/sys') -> 'UsbTopology':
+        """从 sysfs 构建拓扑；sysfs 不可用时返回空拓扑"""
+        topology = cls()
+        scanner = SysfsUSBScanner(sysfs_root)
+        try:
+            entries = sorted(os.listdir(scanner.devices_dir))
+        except OSError:
+            return topology
+
+        for entry in entries:
+            if ':' in entry:
+                continue
+            node = topology._read_node(scanner.devices_dir, entry)
+            if node is not None:
+                topology.nodes[entry] = node
+
+        topology._link()
+        return topology
+
+    def _read_node(self, devices_dir: str, entry: str) -> Optional[TopologyNode]:
+        device_dir = os.path.join(devices_dir, entry)
+        read = SysfsUSBScanner._read_attr
+
+        vid = read(device_dir, 'idVendor')
+        if not vid:
+            return None
+
+        busnum = read(device_dir, 'busnum')
+        speed = read(device_dir, 'speed')
+        try:
+            speed_mbps = float(speed) if speed else None
+        except ValueError:
+            speed_mbps = None
+
+        # 根集线器所在的主控制器目录，用于把同一控制器的 USB 2 / USB 3 总线归为一组
+        controller = os.path.dirname(os.path.realpath(device_dir)) if entry.startswith('usb') else ''
+
+        return TopologyNode(
+            name=entry,
+            busnum=int(busnum) if busnum.isdigit() else None,
+            devpath=read(device_dir, 'devpath'),
+            vid_pid=f"{vid}:{read(device_dir, 'idProduct')}",
+            product=read(device_dir, 'product') or 'Unknown',
+            speed_mbps=speed_mbps,
+            version=read(device_dir, 'version'),
+            is_hub=read(device_dir, 'bDeviceClass') == '09' or read(device_dir, 'maxchild') not in ('', '0'),
+            controller=controller
+        )
+
+    def _link(self) -> None:
+        for name, node in self.nodes.items():
+            if node.is_root_hub:
+                if node.speed_mbps is not None:
+                    self._controller_speeds.setdefault(node.controller, []).append(node.speed_mbps)
+                continue
+            # "1-1.2" 的上级是 "1-1"，"1-1" 的上级是根集线器 "usb1"
+            bus, _, path = name.partition('-')
+            parent_name = f"{bus}-{path.rsplit('.', 1)[0]}" if '.' in path else f"usb{bus}"
+            parent = self.nodes.get(parent_name)
+            if parent is not None:
+                node.parent = parent
+                parent.children.append(node)
+
+        for node in self.nodes.values():
+            if node.is_hub and not node.is_root_hub and node.speed_mbps is not None \
+                    and node.speed_mbps >= SUPER_SPEED_MBPS:
+                self._superspeed_hubs.add((node.root().controller, node.devpath))
+
+    def find(self, busnum: Optional[int], devpath: str) -> Optional[TopologyNode]:
+        """按总线号和端口路径查找节点（对应 DeviceRecord.busnum / port_path）"""
+        if busnum is None or not devpath:
+            return None
+        return self.nodes.get(f"{busnum}-{devpath}")
+
+    def degraded_devices(self) -> List[TopologyNode]:
+        """所有降速运行的非集线器设备"""
+        return [node for node in self.nodes.values() if node.is_degraded and not node.is_hub]
+
+    def has_superspeed_peer(self, hub: TopologyNode) -> bool:
+        """
+        USB 2 速率的集线器是否是某个 USB 3 集线器的 USB 2 部分
+
+        USB 3 集线器在同一主控制器的 USB 2 根总线和 USB 3 根总线上各出现一次，端口路径相同；
+        以 USB 2 协商的设备挂在 USB 2 那一半下面
+        """
+        return (hub.root().controller, hub.devpath) in self._superspeed_hubs
+
+    def limit_reason(self, node: TopologyNode) -> str:
+        """说明设备降速的可能原因"""
+        for upstream in node.upstream():
+            if upstream.is_root_hub:
+                break
+            if upstream.speed_mbps is not None and upstream.speed_mbps < SUPER_SPEED_MBPS:
+                if self.has_superspeed_peer(upstream):
+                    return (f"经由 USB 3 集线器 {upstream.product} ({upstream.name}) 连接，"
+                            f"但设备以 USB 2 协商（请检查线缆或设备接口）")
+                return f"经由 USB 2 集线器 {upstream.product} ({upstream.name}) 连接"
+
+        root = node.root()
+        speeds = self._controller_speeds.get(root.controller, [])
+        if speeds and max(speeds) < SUPER_SPEED_MBPS:
+            return "主机 USB 控制器仅支持 USB 2"
+        return "接口支持 USB 3，但以 USB 2 协商（请检查线缆或换用 USB 3 接口）"
+
+    def by_root_hub(self) -> Dict[str, Tuple[TopologyNode, List[TopologyNode]]]:
+        """
+        按根集线器汇总
+
+        Returns:
+            {根集线器名称: (根集线器节点, 其下所有设备)}
+        """
+        groups: Dict[str, Tuple[TopologyNode, List[TopologyNode]]] = {}
+        for node in self.nodes.values():
+            if node.is_root_hub:
+                groups.setdefault(node.name, (node, []))
+        for node in self.nodes.values():
+            if node.is_root_hub:
+                continue
+            root = node.root()
+            if root.is_root_hub:
+                groups.setdefault(root.name, (root, []))[1].append(node)
+        return groups
+
+    def summary(self) -> str:
+        """每个根集线器一行的文字汇总"""
+        lines = []
+        for name, (root, devices) in sorted(self.by_root_hub().items()):
+            degraded = sum(1 for node in devices if node.is_degraded and not node.is_hub)
+            line = f"{name} ({format_mbps(root.speed_mbps)}): {len(devices)} 个设备"
+            if degraded:
+                line += f"，{degraded} 个降速运行"
+            lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WMIC / CIM 输出解析与合并
+单次流式遍历 CSV 或 JSON 输出，正则预编译，按 VID:PID 建立索引去重，
+整体耗时与行数成线性关系
+"""
+
+import json
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .device_record import DeviceRecord
+
+
+_VID_PID_RE = re.compile(r'VID_([0-9A-F]{4}).*?PID_([0-9A-F]{4})', re.IGNORECASE)
+_VID_RE = re.compile(r'VID_([0-9A-F]{4})', re.IGNORECASE)
+_PID_RE = re.compile(r'PID_([0-9A-F]{4})', re.IGNORECASE)
+
+# 非白名单设备中需要排除的关键词（集线器、主控制器等）
+WMIC_EXCLUDED_KEYWORDS = (
+    'root hub', 'generic usb hub', 'host controller',
+    'pcie', 'pci express', 'intel(r)', 'amd',
+    'mass storage', 'usb printing support'
+)
+CIM_EXCLUDED_KEYWORDS = ('root hub', 'generic usb hub', 'host controller', 'pcie', 'intel(r)', 'amd')
+WHITELIST_KEYWORDS = ('keyboard', 'mouse', 'audio', 'video', 'camera', 'webcam', 'bluetooth', '键盘', '鼠标')
+
+STORAGE_COLUMNS = ['Caption', 'Manufacturer', 'SerialNumber', 'PNPDeviceID', 'InterfaceType']
+PNP_COLUMNS = ['Name', 'Manufacturer', 'DeviceID']
+
+
+def extract_vid_pid(device_id: str) -> str:
+    """从设备 ID 中提取 VID:PID（大写），找不到时返回 'N/A'"""
+    if not device_id:
+        return 'N/A'
+
+    match = _VID_PID_RE.search(device_id)
+    if match:
+        return f"{match.group(1)}:{match.group(2)}".upper()
+
+    # PID 出现在 VID 之前的少见格式
+    vid_match = _VID_RE.search(device_id)
+    pid_match = _PID_RE.search(device_id)
+    if vid_match and pid_match:
+        return f"{vid_match.group(1)}:{pid_match.group(1)}".upper()
+    return 'N/A'
+
+
+def extract_serial_from_pnp(device_id: str) -> str:
+    """尝试从 PNP Device ID 中提取序列号 (格式通常是 USB\\VID_xxxx&PID_xxxx\\SERIAL)"""
+    if not device_id:
+        return 'N/A'
+    parts = device_id.split('\\')
+    if len(parts) >= 3:
+        serial = parts[-1]
+        # 如果序列号包含 &，通常表示它是生成的实例 ID 而不是纯硬件序列号
+        if '&' not in serial:
+            return serial
+    return 'N/A'
+
+
+def iter_wmic_csv(output: str, required_cols: Sequence[str]) -> Iterator[Dict[str, str]]:
+    """
+    流式解析 WMIC /format:csv 输出
+
+    根据表头识别列索引（列顺序不固定），缺失的列返回空字符串。
+    WMIC 输出的值从不加引号，因此直接按逗号分割（引号原样保留），
+    并按表头的列数限制分割次数，值中多出的逗号归入最后一列
+
+    Args:
+        output: wmic 标准输出
+        required_cols: 需要的列名
+
+    Yields:
+        每一行的 {列名: 值}
+    """
+    lines = (line.strip() for line in output.splitlines())
+    lines = (line for line in lines if line)
+
+    header_line = next(lines, None)
+    if header_line is None:
+        return
+    # 去除表头可能存在的 BOM 或空白
+    header = [name.strip().lstrip('\ufeff') for name in header_line.split(',')]
+    positions = {name: idx for idx, name in enumerate(header)}
+    indices = [(col, positions.get(col, -1)) for col in required_cols]
+    max_split = len(header) - 1
+
+    for line in lines:
+        parts = line.split(',', max_split)
+        size = len(parts)
+        yield {col: (parts[idx].strip() if 0 <= idx < size else '') for col, idx in indices}
+
+
+def iter_cim_json(output: str) -> Iterator[Dict[str, str]]:
+    """
+    解析 PowerShell ConvertTo-Json 输出
+
+    单个对象会被包装成列表；值为 None 的字段转换为空字符串
+    """
+    if not output.strip():
+        return
+    try:
+        data = json.loads(output)
+    except json.JSONDecodeError:
+        return
+    if isinstance(data, dict):
+        data = [data]
+    for item in data:
+        if isinstance(item, dict):
+            yield {key: ('' if value is None else str(value)) for key, value in item.items()}
+
+
+class DeviceMerger:
+    """按 VID:PID 去重合并存储设备和 PnP 设备"""
+
+    def __init__(self, devices: Optional[List[DeviceRecord]] = None):
+        """
+        Args:
+            devices: 追加到的设备列表，默认新建
+        """
+        self.devices = devices if devices is not None else []
+        self._seen_vid_pid = {d.vid_pid for d in self.devices if d.vid_pid != 'N/A'}
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def add_storage_rows(self, rows: Iterable[Dict[str, str]]) -> None:
+        """合并 Win32_DiskDrive 行，只保留 USB 接口的磁盘"""
+        for row in rows:
+            pnp_id = row.get('PNPDeviceID', '')
+            interface = row.get('InterfaceType', '').upper()
+
+            # 接口类型为 USB，或 PNP ID 包含 USB / USBSTOR
+            if 'USB' not in interface and 'USB' not in pnp_id.upper():
+                continue
+
+            # 优先使用返回的 SerialNumber
+            serial = row.get('SerialNumber', '')
+            if not serial or serial == '0' or len(serial) < 2:
+                serial = extract_serial_from_pnp(pnp_id)
+
+            manufacturer = row.get('Manufacturer', '')
+            self._append(DeviceRecord(
+                name=row.get('Caption') or 'Unknown',
+                manufacturer=manufacturer if manufacturer and manufacturer != '(Standard disk drives)' else 'Generic',
+                serial=serial,
+                bus='USB Storage',
+                speed='USB 3.0',
+                vid_pid=extract_vid_pid(pnp_id)
+            ))
+
+    def add_pnp_rows(self, rows: Iterable[Dict[str, str]],
+                     excluded_keywords: Sequence[str] = WMIC_EXCLUDED_KEYWORDS) -> None:
+        """合并 Win32_PnPEntity 行，跳过已存在的 VID:PID 和集线器/控制器"""
+        for row in rows:
+            name = row.get('Name', '')
+            if not name:
+                continue
+
+            device_id = row.get('DeviceID', '')
+            vid_pid = extract_vid_pid(device_id)
+            if vid_pid in self._seen_vid_pid:
+                continue
+
+            name_lower = name.lower()
+            if not any(k in name_lower for k in WHITELIST_KEYWORDS):
+                if any(k in name_lower for k in excluded_keywords):
+                    continue
+
+            self._append(DeviceRecord(
+                name=name,
+                manufacturer=row.get('Manufacturer') or 'N/A',
+                serial=extract_serial_from_pnp(device_id),
+                bus='USB',
+                speed='N/A',
+                vid_pid=vid_pid
+            ))
+
+    def _append(self, device: DeviceRecord) -> None:
+        self.devices.append(device)
+        if device.vid_pid != 'N/A':
+            self._seen_vid_pid.add(device.vid_pid)
@@ -6,25 +6,48 @@
 """
 
 import getpass
+from datetime import datetime
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QMainWindow, QTableWidgetItem, QFileDialog, QMessageBox, 
-    QPushButton, QHeaderView, QWidget, QHBoxLayout, QLabel, QInputDialog, QApplication
+    QPushButton, QHeaderView, QWidget, QHBoxLayout, QLabel, QInputDialog, QApplication, QLineEdit,
+    QAbstractItemView, QTableWidget
 )
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 
 from .usb_manager_ui import Ui_MainWindow
 from ..core.usb_scanner import USBScanner
-from ..core.drive_manager import DriveManager
-from ..core.file_transfer import FileTransferThread
+from ..core.drive_manager import DriveManager, UNKNOWN_FILESYSTEM
+from ..core.transfer_queue import TransferQueue, PENDING, RUNNING, PAUSED, DONE, FAILED, CANCELLED
+from ..core.transfer_queue_thread import TransferQueueThread
+from ..core.file_list_thread import FileListThread
+from ..core.file_listing import FileEntry, format_size
+from ..core.folder_size_thread import FolderSizeThread
+from ..core.file_index import FileIndex
+from ..core.file_index_thread import FileIndexThread
+from ..core.file_search_thread import FileSearchThread
+from ..core.dedup_thread import DedupThread
+from ..core.bulk_delete_thread import BulkDeleteThread
 from ..core.speed_tester import SpeedTestThread
+from ..core.hotplug import HotplugWatcher
+from ..core.mount_watcher import MountWatcher
+from ..core.device_index import DeviceIndex
+from ..core.device_snapshot import DeviceSnapshot, diff
+from ..core.scan_cache import scan_cache, USB_DEVICES, MOUNTED_DRIVES
+from ..core.usb_topology import UsbTopology, format_mbps
+from ..core.scan_metrics import scan_metrics
 from .styles import AppStyles
 
 
 class USBManagerWindow(QMainWindow):
     """USB 设备管理器主窗口 - 使用 UI 文件版本"""
     
+    # 文件列表每页显示的条目数
+    FILES_PAGE_SIZE = 500
+    # 文件表格可排序的列 {列号: 排序键}
+    FILES_SORT_COLUMNS = {0: 'name', 1: 'type', 2: 'size'}
+    
     def __init__(self):
         super().__init__()
         
@@ -55,11 +78,75 @@ class USBManagerWindow(QMainWindow):
         # 将按钮添加到进度条布局中 (horizontalLayout_6 包含 progressBar 和 speedLabel)
         self.ui.horizontalLayout_6.addWidget(self.cancelBtn)
         
+        # 文件列表下方的“加载更多”按钮（大目录分页显示）
+        self.loadMoreFilesBtn = QPushButton("⬇ 加载更多")
+        self.loadMoreFilesBtn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.loadMoreFilesBtn.setVisible(False)
+        self.ui.verticalLayout_6.addWidget(self.loadMoreFilesBtn)
+        
+        # 文件列表上方的搜索框（在所有已挂载的卷中按文件名搜索）
+        self.fileSearchInput = QLineEdit()
+        self.fileSearchInput.setPlaceholderText("🔍 在所有已挂载的 U 盘中搜索文件名...")
+        self.fileSearchInput.setClearButtonEnabled(True)
+        self.ui.verticalLayout_6.insertWidget(1, self.fileSearchInput)
+        self.searchDebounceTimer = QTimer(self)
+        self.searchDebounceTimer.setSingleShot(True)
+        self.searchDebounceTimer.setInterval(250)
+        
+        # 文件操作区的“查找重复文件”按钮
+        self.findDuplicatesBtn = QPushButton("🧬 查找重复文件")
+        self.findDuplicatesBtn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.ui.horizontalLayout_5.insertWidget(3, self.findDuplicatesBtn)
+        
+        # 批量删除：文件表格支持多选，选中的文件和文件夹一次删除
+        self.ui.filesTable.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.deleteSelectedBtn = QPushButton("🗑️ 删除所选")
+        self.deleteSelectedBtn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.ui.horizontalLayout_5.insertWidget(4, self.deleteSelectedBtn)
+        
+        # 上传整个文件夹；上传的文件和文件夹都进入传输队列
+        self.uploadFolderBtn = QPushButton("📁 上传文件夹")
+        self.uploadFolderBtn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.ui.horizontalLayout_5.insertWidget(2, self.uploadFolderBtn)
+        
+        # 进度条下方的传输队列（有任务时才显示）
+        self.transferQueueTable = QTableWidget(0, 4)
+        self.transferQueueTable.setHorizontalHeaderLabels(["文件", "状态", "进度", "操作"])
+        self.transferQueueTable.verticalHeader().setVisible(False)
+        self.transferQueueTable.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.transferQueueTable.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.transferQueueTable.setMaximumHeight(180)
+        self.transferQueueTable.setVisible(False)
+        self.ui.verticalLayout_5.addWidget(self.transferQueueTable)
+        
+        # 4. 状态栏右侧的扫描性能读数，悬停显示各步骤的详细统计
+        self.scanMetricsLabel = QLabel(scan_metrics.summary_line())
+        self.scanMetricsLabel.setStyleSheet("color: #757575; margin-right: 6px;")
+        self.statusBar().addPermanentWidget(self.scanMetricsLabel)
+        
         # 数据
         self.selected_drive = None
-        self.transfer_thread = None
+        self.transfer_queue = TransferQueue()  # 多文件传输队列
+        self.transfer_queue_thread = None
+        self.transfer_rows = {}        # 传输队列表格中任务所在的行 {任务编号: 行号}
         self.speed_test_thread = None  # 测速线程
         self.speed_test_results = {}   # 新增：用于存储测速结果 {device_key: result_text}
+        self.usb_snapshot = None       # 上一次 USB 扫描的快照
+        self.usb_row_keys = []         # USB 表格每一行对应的设备 Key
+        self.usb_speed_warnings = {}   # 降速运行的设备 {DeviceRecord.key: 原因}
+        self.drive_rows = []           # 驱动器表格每一行对应的驱动器信息
+        self.file_list_thread = None   # 文件列表读取线程
+        self.file_listing = None       # 当前目录的 DirectoryListing
+        self.file_sort = ('name', False)  # 文件列表排序 (排序键, 是否倒序)
+        self.folder_size_thread = None # 文件夹大小统计线程
+        self.folder_sizes = {}         # 已统计完成的文件夹大小 {路径: 字节数}
+        self.file_rows = {}            # 文件表格中文件夹所在的行 {路径: 行号}
+        self.file_index = None         # 卷文件索引（首次使用时打开数据库）
+        self.file_index_thread = None  # 卷索引线程
+        self.file_search_thread = None # 文件搜索线程
+        self.dedup_thread = None       # 重复文件查找线程
+        self.delete_thread = None      # 批量删除线程
+        self.device_index = DeviceIndex()  # USB 设备 ↔ 块设备 ↔ 挂载点
         
         # 应用样式
         self.apply_styles()
@@ -70,12 +157,18 @@ class USBManagerWindow(QMainWindow):
         # 更新用户信息
         self.ui.userLabel.setText(f"👤 用户: {getpass.getuser()}")
         
-        # 启动定时器 - Windows上改为10秒，避免卡顿
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.auto_refresh)
-        self.timer.start(10000)  # 每10秒刷新（避免频繁扫描导致卡顿）
+        # 启动热插拔监听 - 有事件才刷新；事件源不可用时退回每10秒轮询
+        self.hotplug_watcher = HotplugWatcher(fallback_interval_ms=10000, parent=self)
+        self.hotplug_watcher.devices_changed.connect(self.on_devices_changed)
+        self.hotplug_watcher.start()
+        
+        # 启动挂载表监听 - 挂载/卸载后只增删对应的行（仅 Linux）
+        self.mount_watcher = MountWatcher(parent=self)
+        self.mount_watcher.volumes_changed.connect(self.on_volumes_changed)
+        self.mount_watcher.start()
         
         # 初始加载
+        self.device_index.refresh()
         self.refresh_all()
     
     def apply_styles(self):
@@ -150,15 +243,24 @@ class USBManagerWindow(QMainWindow):
         self.ui.filesTable.setColumnWidth(1, 120)  # 类型
         self.ui.filesTable.setColumnWidth(2, 100)  # 大小
         self.ui.filesTable.setColumnWidth(3, 100)  # 操作
+        file_header.setSortIndicatorShown(True)
+        file_header.setSortIndicator(0, Qt.SortOrder.AscendingOrder)
     
     def connect_signals(self):
         """连接信号和槽"""
-        self.ui.refreshUsbBtn.clicked.connect(self.scan_usb_devices)
-        self.ui.refreshDriveBtn.clicked.connect(self.scan_mounted_drives)
+        self.ui.refreshUsbBtn.clicked.connect(lambda: self.scan_usb_devices(force=True))
+        self.ui.refreshDriveBtn.clicked.connect(lambda: self.scan_mounted_drives(force=True))
         self.ui.writeTextBtn.clicked.connect(self.write_text_file)
         self.ui.uploadFileBtn.clicked.connect(self.upload_file)
+        self.uploadFolderBtn.clicked.connect(self.upload_folder)
         self.ui.showHiddenCheck.stateChanged.connect(self.refresh_file_list)
         self.ui.drivesTable.itemSelectionChanged.connect(self.on_drive_selected)
+        self.ui.filesTable.horizontalHeader().sectionClicked.connect(self.on_files_header_clicked)
+        self.loadMoreFilesBtn.clicked.connect(self.append_file_page)
+        self.fileSearchInput.textChanged.connect(lambda text: self.searchDebounceTimer.start())
+        self.searchDebounceTimer.timeout.connect(self.refresh_file_list)
+        self.findDuplicatesBtn.clicked.connect(self.find_duplicates)
+        self.deleteSelectedBtn.clicked.connect(self.delete_selected)
         
         # 连接取消按钮
         self.cancelBtn.clicked.connect(self.cancel_transfer)
@@ -214,8 +316,13 @@ class USBManagerWindow(QMainWindow):
         
         return widget
 
-    def scan_usb_devices(self):
-        """扫描 USB 设备"""
+    def scan_usb_devices(self, force=False):
+        """
+        扫描 USB 设备
+        
+        Args:
+            force: 是否跳过扫描缓存（用户手动刷新时）
+        """
         # 1. UI 状态：开始扫描
         self.ui.refreshUsbBtn.setEnabled(False)
         self.usbLoadingLabel.setVisible(True)
@@ -226,97 +333,169 @@ class USBManagerWindow(QMainWindow):
         
         try:
             # 2. 执行扫描
-            devices = USBScanner.scan_devices()
-            
-            # 3. 更新表格
-            self.ui.usbTable.setRowCount(len(devices))
+            devices = USBScanner.scan_devices(use_cache=not force)
+            if force:
+                self.device_index.refresh()
+            snapshot = DeviceSnapshot(devices)
+            self.usb_speed_warnings = self.analyze_link_speeds(devices)
             
-            for row, device in enumerate(devices):
-                self.ui.usbTable.setItem(row, 0, self.create_table_item(device['name']))
-                self.ui.usbTable.setItem(row, 1, self.create_table_item(device['manufacturer']))
-                self.ui.usbTable.setItem(row, 2, self.create_table_item(device['serial']))
-                self.ui.usbTable.setItem(row, 3, self.create_table_item(device['bus']))
-                
-                # 移除当前单元格的旧 Widget
-                self.ui.usbTable.removeCellWidget(row, 4)
-                
-                # 生成唯一的设备 Key
-                serial = device.get('serial', 'N/A')
-                if serial and serial != 'N/A':
-                    device_key = serial
-                else:
-                    device_key = f"{device['name']}_{device['vid_pid']}"
-                
-                # 如果是存储设备，显示测速按钮
-                device_name_lower = device['name'].lower()
-                is_storage_device = (device['bus'] == 'USB Storage' or 'Storage' in device['bus'] or
-                                   any(keyword in device_name_lower for keyword in ['mass storage', 'disk', 'storage', 'flash', 'card reader']))
-                
-                if is_storage_device:
-                    # 检查是否有历史测速结果
-                    display_text = self.speed_test_results.get(device_key, device['speed'])
-                    speed_widget = self.create_speed_test_widget(display_text, device, device_key)
-                    self.ui.usbTable.setCellWidget(row, 4, speed_widget)
-                    
-                    # 显式设置一个空的 Item，清除底层可能存在的文本
-                    self.ui.usbTable.setItem(row, 4, QTableWidgetItem(""))
-                else:
-                    # 普通设备只显示文本
-                    self.ui.usbTable.setItem(row, 4, self.create_table_item(device['speed']))
-                
-                self.ui.usbTable.setItem(row, 5, self.create_table_item(device['vid_pid']))
+            # 3. 只更新发生变化的行
+            with scan_metrics.timer('ui.apply_usb'):
+                self.apply_usb_diff(diff(self.usb_snapshot, snapshot))
+            self.usb_snapshot = snapshot
             
             # 4. 完成状态提示
             msg = f"✅ 刷新完成: 找到 {len(devices)} 个 USB 设备"
+            if self.usb_speed_warnings:
+                msg += f"，⚠️ {len(self.usb_speed_warnings)} 个设备低于其支持的速率运行"
             self.statusBar().showMessage(msg)
             
         finally:
             # 5. UI 状态：恢复
             self.usbLoadingLabel.setVisible(False)
             self.ui.refreshUsbBtn.setEnabled(True)
+            self.update_scan_metrics()
+    
+    def analyze_link_speeds(self, devices):
+        """
+        找出降速运行的设备（例如 USB 3 U 盘协商在 480 Mb/s）
+        
+        Returns:
+            {DeviceRecord.key: 原因说明}
+        """
+        degraded = [device for device in devices if device.is_below_capability]
+        if not degraded:
+            return {}
+        
+        topology = UsbTopology.from_sysfs()
+        # 附上各根集线器的设备数与降速数，便于判断问题出在哪个控制器 / 接口
+        summary = topology.summary()
+        warnings = {}
+        for device in degraded:
+            node = topology.find(device.busnum, device.port_path)
+            reason = topology.limit_reason(node) if node else "设备以低于其支持的速率运行"
+            warning = f"设备支持 {format_mbps(device.capability_mbps)}，当前 {device.speed}：{reason}"
+            if summary:
+                warning += f"\n\nUSB 根集线器:\n{summary}"
+            warnings[device.key] = warning
+        return warnings
+    
+    def apply_usb_diff(self, changes):
+        """把快照差异应用到 USB 表格，未变化的行和控件保持不动"""
+        table = self.ui.usbTable
+        
+        # 先删除（从后往前，避免行号错位）
+        removed = set(changes.removed)
+        for row in range(len(self.usb_row_keys) - 1, -1, -1):
+            if self.usb_row_keys[row] in removed:
+                table.removeRow(row)
+                del self.usb_row_keys[row]
+        
+        for key, device in changes.changed:
+            self.fill_usb_row(self.usb_row_keys.index(key), device, key)
+        
+        for key, device in changes.added:
+            row = table.rowCount()
+            table.insertRow(row)
+            self.usb_row_keys.append(key)
+            self.fill_usb_row(row, device, key)
+    
+    def fill_usb_row(self, row, device, device_key):
+        """填充 USB 表格中的一行"""
+        self.ui.usbTable.setItem(row, 0, self.create_table_item(device['name']))
+        self.ui.usbTable.setItem(row, 1, self.create_table_item(device['manufacturer']))
+        self.ui.usbTable.setItem(row, 2, self.create_table_item(device['serial']))
+        self.ui.usbTable.setItem(row, 3, self.create_table_item(device['bus']))
+        
+        # 移除当前单元格的旧 Widget
+        self.ui.usbTable.removeCellWidget(row, 4)
+        
+        # 如果是存储设备，显示测速按钮
+        device_name_lower = device['name'].lower()
+        is_storage_device = (device['bus'] == 'USB Storage' or 'Storage' in device['bus'] or
+                           any(keyword in device_name_lower for keyword in ['mass storage', 'disk', 'storage', 'flash', 'card reader']))
+        
+        # 降速运行的设备加上警告标记
+        speed_text = device['speed']
+        speed_warning = self.usb_speed_warnings.get(device.key)
+        if speed_warning:
+            speed_text = f"⚠️ {speed_text} (支持 {format_mbps(device.capability_mbps)})"
+        
+        if is_storage_device:
+            # 检查是否有历史测速结果
+            display_text = self.speed_test_results.get(device_key, speed_text)
+            speed_widget = self.create_speed_test_widget(display_text, device, device_key)
+            if speed_warning:
+                speed_widget.setToolTip(speed_warning)
+            self.ui.usbTable.setCellWidget(row, 4, speed_widget)
+            
+            # 显式设置一个空的 Item，清除底层可能存在的文本
+            self.ui.usbTable.setItem(row, 4, QTableWidgetItem(""))
+        else:
+            # 普通设备只显示文本
+            speed_item = self.create_table_item(speed_text)
+            if speed_warning:
+                speed_item.setToolTip(speed_warning)
+            self.ui.usbTable.setItem(row, 4, speed_item)
+        
+        self.ui.usbTable.setItem(row, 5, self.create_table_item(device['vid_pid']))
+    
+    def resolve_device_mount(self, device_info):
+        """
+        找出 USB 设备对应的挂载路径
+        
+        优先使用关联索引直接定位；索引无法确定时（非 Linux 或设备无挂载记录）再询问用户
+        
+        Returns:
+            挂载路径，用户取消或没有可用卷时返回 None
+        """
+        mounts = self.device_index.mounts_for_device(device_info)
+        if len(mounts) == 1:
+            return mounts[0]
+        
+        if mounts:
+            # 同一个 U 盘有多个分区被挂载
+            item, ok = QInputDialog.getItem(
+                self, "选择测速目标",
+                f"'{device_info['name']}' 有多个已挂载的分区，请选择:",
+                mounts, 0, False
+            )
+            return item if ok and item else None
+        
+        mounted_drives = DriveManager.scan_mounted_drives()
+        
+        if not mounted_drives:
+            QMessageBox.warning(self, "无法测速", "未检测到已挂载的 U 盘卷。\n请确保 U 盘已正确格式化并分配了盘符。")
+            return None
+        
+        if len(mounted_drives) == 1:
+            drive = mounted_drives[0]
+            reply = QMessageBox.question(
+                self, "确认测速目标", 
+                f"准备对以下磁盘进行测速，是否继续？\n\n名称: {drive['name']}\n路径: {drive['path']}",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            return drive['path'] if reply == QMessageBox.StandardButton.Yes else None
+        
+        drive_names = [f"{d['name']} ({d['path']})" for d in mounted_drives]
+        item, ok = QInputDialog.getItem(
+            self, "选择测速目标", 
+            f"检测到多个 U 盘，请选择对应 '{device_info['name']}' 的挂载路径:", 
+            drive_names, 0, False
+        )
+        if ok and item:
+            return mounted_drives[drive_names.index(item)]['path']
+        return None
     
     def start_speed_test(self, device_info, label_widget, btn_widget, device_key):
         """开始测速流程"""
-        self.timer.stop()
+        self._pause_auto_refresh()
         
         try:
-            mounted_drives = DriveManager.scan_mounted_drives()
+            target_path = self.resolve_device_mount(device_info)
             
-            if not mounted_drives:
-                QMessageBox.warning(self, "无法测速", "未检测到已挂载的 U 盘卷。\n请确保 U 盘已正确格式化并分配了盘符。")
-                self.timer.start(10000)
-                return
-
-            target_path = None
-            
-            if len(mounted_drives) == 1:
-                drive = mounted_drives[0]
-                reply = QMessageBox.question(
-                    self, "确认测速目标", 
-                    f"准备对以下磁盘进行测速，是否继续？\n\n名称: {drive['name']}\n路径: {drive['path']}",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-                )
-                if reply == QMessageBox.StandardButton.Yes:
-                    target_path = drive['path']
-                else:
-                    self.timer.start(10000)
-                    return
-            else:
-                drive_names = [f"{d['name']} ({d['path']})" for d in mounted_drives]
-                item, ok = QInputDialog.getItem(
-                    self, "选择测速目标", 
-                    f"检测到多个 U 盘，请选择对应 '{device_info['name']}' 的挂载路径:", 
-                    drive_names, 0, False
-                )
-                if ok and item:
-                    selected_idx = drive_names.index(item)
-                    target_path = mounted_drives[selected_idx]['path']
-                else:
-                    self.timer.start(10000)
-                    return
-
             if not target_path:
-                self.timer.start(10000)
+                self._resume_auto_refresh()
                 return
 
             try:
@@ -325,7 +504,7 @@ class USBManagerWindow(QMainWindow):
                 btn_widget.setText("测试中...")
                 label_widget.setText("准备中...")
             except RuntimeError:
-                self.timer.start(10000)
+                self._resume_auto_refresh()
                 return
             
             self.speed_test_thread = SpeedTestThread(target_path)
@@ -347,7 +526,7 @@ class USBManagerWindow(QMainWindow):
                 except RuntimeError:
                     pass
                 finally:
-                    self.timer.start(10000)
+                    self._resume_auto_refresh()
             
             def on_error(err_msg):
                 try:
@@ -358,7 +537,7 @@ class USBManagerWindow(QMainWindow):
                 except RuntimeError:
                     pass
                 finally:
-                    self.timer.start(10000)
+                    self._resume_auto_refresh()
 
             self.speed_test_thread.progress_update.connect(on_progress)
             self.speed_test_thread.test_finished.connect(on_finished)
@@ -368,10 +547,15 @@ class USBManagerWindow(QMainWindow):
             
         except Exception as e:
             print(f"Error starting speed test: {e}")
-            self.timer.start(10000)
+            self._resume_auto_refresh()
 
-    def scan_mounted_drives(self):
-        """扫描已挂载的驱动器"""
+    def scan_mounted_drives(self, force=False):
+        """
+        扫描已挂载的驱动器
+        
+        Args:
+            force: 是否跳过扫描缓存（用户手动刷新时）
+        """
         # 1. UI 状态：开始扫描
         self.ui.refreshDriveBtn.setEnabled(False)
         self.driveLoadingLabel.setVisible(True)
@@ -379,21 +563,13 @@ class USBManagerWindow(QMainWindow):
         QApplication.processEvents()
         
         try:
-            drives = DriveManager.scan_mounted_drives()
+            drives = DriveManager.scan_mounted_drives(use_cache=not force)
             
             self.ui.drivesTable.setRowCount(len(drives))
+            self.drive_rows = list(drives)
             
             for row, drive in enumerate(drives):
-                # 获取驱动器信息，如果为空则显示默认值
-                name = drive['name'] if drive['name'] else "未知设备"
-                fs = drive['filesystem'] if drive['filesystem'] else "未知"
-                
-                self.ui.drivesTable.setItem(row, 0, self.create_table_item(name))
-                self.ui.drivesTable.setItem(row, 1, self.create_table_item(drive['path']))
-                self.ui.drivesTable.setItem(row, 2, self.create_table_item(fs))
-                self.ui.drivesTable.setItem(row, 3, self.create_table_item(drive['total']))
-                self.ui.drivesTable.setItem(row, 4, self.create_table_item(drive['used']))
-                self.ui.drivesTable.setItem(row, 5, self.create_table_item(drive['free']))
+                self.fill_drive_row(row, drive)
             
             # 4. 完成状态提示
             msg = f"✅ 刷新完成: 找到 {len(drives)} 个存储卷"
@@ -403,6 +579,57 @@ class USBManagerWindow(QMainWindow):
             # 5. UI 状态：恢复
             self.driveLoadingLabel.setVisible(False)
             self.ui.refreshDriveBtn.setEnabled(True)
+            self.update_scan_metrics()
+    
+    def fill_drive_row(self, row, drive):
+        """填充驱动器表格的一行"""
+        # 获取驱动器信息，如果为空则显示默认值
+        name = drive['name'] if drive['name'] else "未知设备"
+        fs = drive['filesystem'] if drive['filesystem'] else UNKNOWN_FILESYSTEM
+        
+        self.ui.drivesTable.setItem(row, 0, self.create_table_item(name))
+        self.ui.drivesTable.setItem(row, 1, self.create_table_item(drive['path']))
+        self.ui.drivesTable.setItem(row, 2, self.create_table_item(fs))
+        self.ui.drivesTable.setItem(row, 3, self.create_table_item(drive['total']))
+        self.ui.drivesTable.setItem(row, 4, self.create_table_item(drive['used']))
+        self.ui.drivesTable.setItem(row, 5, self.create_table_item(drive['free']))
+    
+    def on_volumes_changed(self, added, removed):
+        """
+        挂载表变化：只删除已卸载的行、追加新挂载的行，不重新扫描其他卷
+        
+        Args:
+            added: 新增的挂载 (MountEntry 列表)
+            removed: 已卸载的挂载 (MountEntry 列表)
+        """
+        scan_cache.invalidate(MOUNTED_DRIVES)
+        self.device_index.apply_mount_changes(added, removed)
+        
+        removed_paths = {mount.mount_point for mount in removed}
+        for row in reversed(range(len(self.drive_rows))):
+            if self.drive_rows[row]['path'] in removed_paths:
+                self.ui.drivesTable.removeRow(row)
+                del self.drive_rows[row]
+        
+        new_drives = DriveManager.drives_from_mounts(added)
+        for drive in new_drives:
+            row = len(self.drive_rows)
+            self.ui.drivesTable.insertRow(row)
+            self.fill_drive_row(row, drive)
+            self.drive_rows.append(drive)
+        
+        parts = []
+        if new_drives:
+            parts.append(f"已挂载 {', '.join(drive['path'] for drive in new_drives)}")
+        if removed_paths:
+            parts.append(f"已卸载 {', '.join(sorted(removed_paths))}")
+        if parts:
+            self.statusBar().showMessage("💾 " + "；".join(parts))
+    
+    def update_scan_metrics(self):
+        """刷新状态栏中的扫描性能读数"""
+        self.scanMetricsLabel.setText(scan_metrics.summary_line())
+        self.scanMetricsLabel.setToolTip(scan_metrics.report())
     
     def on_drive_selected(self):
         """驱动器选中事件"""
@@ -414,6 +641,7 @@ class USBManagerWindow(QMainWindow):
             
             self.selected_drive = drive_path
             self.refresh_file_list()
+            self.start_volume_index(drive_path)
             
             if hasattr(self.ui, 'selectedDriveLabel1'):
                 status_text = f"📂 当前设备: {name} ({drive_path})"
@@ -425,7 +653,9 @@ class USBManagerWindow(QMainWindow):
             self.statusBar().showMessage(f"📁 已选择: {drive_path}")
         else:
             self.selected_drive = None
-            self.ui.filesTable.setRowCount(0)
+            self.file_listing = None
+            self.reset_file_table()
+            self.loadMoreFilesBtn.setVisible(False)
             
             if hasattr(self.ui, 'selectedDriveLabel1'):
                 reset_text = "当前设备: 未选择"
@@ -434,30 +664,274 @@ class USBManagerWindow(QMainWindow):
                 self.ui.selectedDriveLabel1.setStyleSheet("color: #666; font-weight: bold; padding-left: 5px;")
                 self.ui.selectedDriveLabel2.setStyleSheet("color: #666; font-weight: bold; padding-left: 5px;")
     
+    def start_volume_index(self, drive_path):
+        """在后台增量更新所选卷的文件索引"""
+        self.stop_volume_index()
+        index = self.get_file_index()
+        if index is None:
+            return
+        
+        self.file_index_thread = FileIndexThread(index, drive_path)
+        self.file_index_thread.index_finished.connect(self.on_volume_indexed)
+        self.file_index_thread.error_occurred.connect(lambda message: print(f"索引卷失败: {message}"))
+        self.file_index_thread.start()
+    
+    def get_file_index(self):
+        """共享的文件索引，首次使用时打开数据库；打开失败时返回 None"""
+        if self.file_index is None:
+            try:
+                self.file_index = FileIndex()
+            except Exception as e:
+                print(f"打开文件索引失败: {e}")
+        return self.file_index
+    
+    def stop_volume_index(self):
+        """取消正在进行的卷索引"""
+        if self.file_index_thread and self.file_index_thread.isRunning():
+            self.file_index_thread.cancel()
+            self.file_index_thread.wait()
+        self.file_index_thread = None
+    
+    def on_volume_indexed(self, stats):
+        """卷索引完成"""
+        if not stats.complete:
+            return
+        changes = stats.files_added + stats.files_changed + stats.files_removed
+        msg = (f"🗂 索引已更新 ({stats.elapsed:.1f}s): 读取 {stats.dirs_scanned} 个目录，"
+               f"跳过 {stats.dirs_skipped} 个未变化目录")
+        if changes:
+            msg += f"，新增 {stats.files_added} / 修改 {stats.files_changed} / 删除 {stats.files_removed} 个文件"
+        self.statusBar().showMessage(msg)
+    
     def refresh_file_list(self):
-        """刷新文件列表"""
+        """刷新文件列表（在后台线程读取目录，读取完成后显示第一页）；搜索框有内容时显示搜索结果"""
+        self.stop_file_search()
+        # 切换目录或重复刷新时，先取消尚未完成的读取
+        if self.file_list_thread and self.file_list_thread.isRunning():
+            self.file_list_thread.cancel()
+            self.file_list_thread.wait()
+        self.file_list_thread = None
+        
+        if self.fileSearchInput.text().strip():
+            self.start_file_search(self.fileSearchInput.text().strip())
+            return
+        
         if not self.selected_drive:
+            self.file_listing = None
+            self.reset_file_table()
+            self.loadMoreFilesBtn.setVisible(False)
             return
         
-        show_hidden = self.ui.showHiddenCheck.isChecked()
-        files = DriveManager.list_files(self.selected_drive, show_hidden)
+        sort_key, descending = self.file_sort
+        self.file_list_thread = FileListThread(
+            self.selected_drive, self.ui.showHiddenCheck.isChecked(), sort_key, descending)
+        self.file_list_thread.progress.connect(
+            lambda count: self.statusBar().showMessage(f"📂 正在读取文件列表: 已读取 {count} 项..."))
+        self.file_list_thread.listing_ready.connect(self.on_file_listing_ready)
+        self.file_list_thread.error_occurred.connect(
+            lambda message: self.statusBar().showMessage(f"❌ 读取文件列表失败: {message}"))
+        self.file_list_thread.start()
+    
+    def start_file_search(self, query):
+        """在所有已挂载的卷中搜索文件名，结果边找边追加到文件表格"""
+        volumes = [drive['path'] for drive in self.drive_rows]
+        self.file_listing = None
+        self.reset_file_table()
+        self.loadMoreFilesBtn.setVisible(False)
+        if not volumes:
+            self.statusBar().showMessage("🔍 没有已挂载的卷可供搜索")
+            return
         
-        self.ui.filesTable.setRowCount(len(files))
+        self.statusBar().showMessage(f"🔍 正在搜索 '{query}'...")
+        self.file_search_thread = FileSearchThread(query, volumes, self.get_file_index())
+        self.file_search_thread.results_found.connect(self.append_search_results)
+        self.file_search_thread.search_finished.connect(
+            lambda total, elapsed: self.statusBar().showMessage(
+                f"🔍 '{query}': 找到 {total} 个文件 ({elapsed * 1000:.0f} ms)"))
+        self.file_search_thread.start()
+    
+    def stop_file_search(self):
+        """取消正在进行的搜索"""
+        if self.file_search_thread and self.file_search_thread.isRunning():
+            self.file_search_thread.cancel()
+            self.file_search_thread.wait()
+        self.file_search_thread = None
+    
+    def append_search_results(self, hits):
+        """追加一批搜索结果（名称列显示完整路径）"""
+        if self.sender() is not self.file_search_thread:
+            return
+        start = self.ui.filesTable.rowCount()
+        self.ui.filesTable.setRowCount(start + len(hits))
+        for row, hit in enumerate(hits, start):
+            self.fill_file_row(row, FileEntry(hit.path, hit.path, False, hit.size, hit.mtime))
+    
+    def find_duplicates(self):
+        """在所有已挂载的卷（可再加一个本机文件夹）中查找重复文件；再次点击取消"""
+        if self.dedup_thread and self.dedup_thread.isRunning():
+            self.dedup_thread.cancel()
+            self.dedup_thread.wait()
+            self.dedup_thread = None
+            self.findDuplicatesBtn.setText("🧬 查找重复文件")
+            self.statusBar().showMessage("⚠️ 已取消查找重复文件")
+            return
         
-        for row, file_info in enumerate(files):
-            self.ui.filesTable.setItem(row, 0, self.create_table_item(file_info['name']))
-            self.ui.filesTable.setItem(row, 1, self.create_table_item(file_info['type']))
-            self.ui.filesTable.setItem(row, 2, self.create_table_item(file_info['size']))
-            
-            # 无论是不是文件，都先移除可能存在的旧按钮
-            self.ui.filesTable.removeCellWidget(row, 3)
-            
-            if not file_info['is_dir']:
-                delete_btn = QPushButton("🗑️ 删除")
-                delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
-                # 使用 lambda 参数默认值 path=file_info['path'] 确保绑定的是当前循环的文件路径
-                delete_btn.clicked.connect(lambda checked, path=file_info['path']: self.delete_file(path))
-                self.ui.filesTable.setCellWidget(row, 3, delete_btn)
+        roots = [drive['path'] for drive in self.drive_rows]
+        reply = QMessageBox.question(
+            self, "查找重复文件",
+            f"将在 {len(roots)} 个已挂载的卷中查找重复文件。\n是否同时与本机的某个文件夹比较？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No | QMessageBox.StandardButton.Cancel
+        )
+        if reply == QMessageBox.StandardButton.Cancel:
+            return
+        if reply == QMessageBox.StandardButton.Yes:
+            folder = QFileDialog.getExistingDirectory(self, "选择要比较的本机文件夹")
+            if folder:
+                roots.append(folder)
+        if not roots:
+            QMessageBox.warning(self, "警告", "没有可比较的卷或文件夹")
+            return
+        
+        stage_names = {'size': '按大小分组', 'partial': '比较首尾数据', 'full': '计算完整哈希', 'done': '完成'}
+        self.dedup_thread = DedupThread(roots)
+        self.dedup_thread.progress.connect(
+            lambda stage, files: self.statusBar().showMessage(
+                f"🧬 查找重复文件: {stage_names.get(stage, stage)}（已扫描 {files} 个文件）"))
+        self.dedup_thread.dedup_finished.connect(self.show_duplicates)
+        self.dedup_thread.finished.connect(lambda: self.findDuplicatesBtn.setText("🧬 查找重复文件"))
+        self.findDuplicatesBtn.setText("✖ 停止查找")
+        self.dedup_thread.start()
+    
+    def show_duplicates(self, groups, stats):
+        """在文件表格中按组列出重复文件"""
+        self.stop_file_search()
+        self.file_listing = None
+        self.reset_file_table()
+        self.loadMoreFilesBtn.setVisible(False)
+        
+        rows = sum(len(group.paths) for group in groups)
+        self.ui.filesTable.setRowCount(rows)
+        row = 0
+        for number, group in enumerate(groups, 1):
+            for path in group.paths:
+                self.fill_file_row(row, FileEntry(path, path, False, group.size, None))
+                self.ui.filesTable.setItem(row, 1, self.create_table_item(f"🧬 重复组 #{number}"))
+                row += 1
+        
+        wasted = sum(group.wasted_bytes for group in groups)
+        self.statusBar().showMessage(
+            f"🧬 找到 {len(groups)} 组重复文件，可释放 {format_size(wasted)}；"
+            f"实际读取 {format_size(stats.bytes_read)}，少读 {format_size(stats.bytes_avoided)}")
+    
+    def on_file_listing_ready(self, listing):
+        """目录读取完成，显示第一页"""
+        if self.sender() is not self.file_list_thread:
+            return
+        self.file_listing = listing
+        self.folder_sizes = {}
+        self.reset_file_table()
+        self.append_file_page()
+        if listing.total > self.FILES_PAGE_SIZE:
+            self.statusBar().showMessage(f"📂 共 {listing.total} 项，已显示前 {self.ui.filesTable.rowCount()} 项")
+    
+    def append_file_page(self):
+        """在文件表格末尾追加下一页"""
+        if self.file_listing is None:
+            return
+        
+        start = self.ui.filesTable.rowCount()
+        page = self.file_listing.page(start, self.FILES_PAGE_SIZE)
+        self.ui.filesTable.setRowCount(start + len(page.entries))
+        for row, entry in enumerate(page.entries, start):
+            self.fill_file_row(row, entry)
+            if entry.is_dir:
+                self.file_rows[entry.path] = row
+        
+        remaining = page.total - (start + len(page.entries))
+        self.loadMoreFilesBtn.setVisible(remaining > 0)
+        self.loadMoreFilesBtn.setText(f"⬇ 加载更多（剩余 {remaining} 项）")
+        
+        self.start_folder_sizes()
+    
+    def reset_file_table(self):
+        """清空文件表格并停止正在进行的文件夹大小统计"""
+        self.stop_folder_sizes()
+        self.file_rows = {}
+        self.ui.filesTable.setRowCount(0)
+    
+    def start_folder_sizes(self):
+        """在后台统计表格中尚未得到大小的文件夹"""
+        self.stop_folder_sizes()
+        folders = [path for path in self.file_rows if path not in self.folder_sizes]
+        if not folders:
+            return
+        
+        self.folder_size_thread = FolderSizeThread(folders)
+        self.folder_size_thread.size_updated.connect(self.on_folder_size_updated)
+        self.folder_size_thread.start()
+    
+    def stop_folder_sizes(self):
+        """取消正在进行的文件夹大小统计"""
+        if self.folder_size_thread and self.folder_size_thread.isRunning():
+            self.folder_size_thread.cancel()
+            self.folder_size_thread.wait()
+        self.folder_size_thread = None
+    
+    def on_folder_size_updated(self, path, size_bytes, files, complete):
+        """文件夹大小的部分结果或最终结果"""
+        row = self.file_rows.get(path)
+        if row is None:
+            return
+        if complete:
+            self.folder_sizes[path] = size_bytes
+            text = format_size(size_bytes)
+        else:
+            text = f"≥ {format_size(size_bytes)}…"
+        item = self.create_table_item(text)
+        item.setToolTip(f"{text}（{files} 个文件）")
+        self.ui.filesTable.setItem(row, 2, item)
+    
+    def fill_file_row(self, row, entry):
+        """填充文件表格的一行（FileEntry 只含原始数值，这里负责格式化）"""
+        name_item = self.create_table_item(entry.name)
+        if entry.mtime is not None:
+            modified = datetime.fromtimestamp(entry.mtime).strftime('%Y-%m-%d %H:%M:%S')
+            name_item.setToolTip(f"{entry.name}\n修改时间: {modified}")
+        name_item.setData(Qt.ItemDataRole.UserRole, entry.path)
+        self.ui.filesTable.setItem(row, 0, name_item)
+        self.ui.filesTable.setItem(row, 1, self.create_table_item("📁 文件夹" if entry.is_dir else "📄 文件"))
+        if entry.is_dir:
+            size_bytes = self.folder_sizes.get(entry.path)
+            size_text = format_size(size_bytes) if size_bytes is not None else "计算中..."
+        else:
+            size_text = format_size(entry.size)
+        self.ui.filesTable.setItem(row, 2, self.create_table_item(size_text))
+        
+        # 先移除可能存在的旧按钮；文件和文件夹都可以删除
+        self.ui.filesTable.removeCellWidget(row, 3)
+        
+        delete_btn = QPushButton("🗑️ 删除")
+        delete_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        # 使用 lambda 参数默认值 path=entry.path 确保绑定的是当前循环的文件路径
+        delete_btn.clicked.connect(lambda checked, path=entry.path: self.delete_paths([path]))
+        self.ui.filesTable.setCellWidget(row, 3, delete_btn)
+    
+    def on_files_header_clicked(self, section):
+        """点击表头排序：同一列再次点击切换升降序；只在内存中重新排序"""
+        sort_key = self.FILES_SORT_COLUMNS.get(section)
+        if sort_key is None:
+            return
+        
+        old_key, descending = self.file_sort
+        descending = not descending if sort_key == old_key else False
+        self.file_sort = (sort_key, descending)
+        self.ui.filesTable.horizontalHeader().setSortIndicator(
+            section, Qt.SortOrder.DescendingOrder if descending else Qt.SortOrder.AscendingOrder)
+        
+        if self.file_listing is not None:
+            self.file_listing.sort(sort_key, descending)
+            self.reset_file_table()
+            self.append_file_page()
     
     def write_text_file(self):
         """写入文本文件"""
@@ -481,95 +955,324 @@ class USBManagerWindow(QMainWindow):
             self.statusBar().showMessage("❌ 文件写入失败")
     
     def upload_file(self):
-        """上传文件到 U 盘"""
+        """选择一个或多个文件加入传输队列"""
         if not self.selected_drive:
             QMessageBox.warning(self, "警告", "请先选择一个 U 盘")
             return
         
-        file_path, _ = QFileDialog.getOpenFileName(
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self, "选择要上传的文件", "", "所有文件 (*.*)"
         )
+        if file_paths:
+            self.enqueue_transfers(file_paths)
+    
+    def upload_folder(self):
+        """选择一个文件夹，连同其中的所有内容加入传输队列"""
+        if not self.selected_drive:
+            QMessageBox.warning(self, "警告", "请先选择一个 U 盘")
+            return
         
-        if not file_path:
+        folder = QFileDialog.getExistingDirectory(self, "选择要上传的文件夹")
+        if folder:
+            self.enqueue_transfers([folder])
+    
+    def enqueue_transfers(self, sources):
+        """把文件或文件夹加入传输队列，队列未在执行时启动它"""
+        jobs = self.transfer_queue.add(sources, self.selected_drive)
+        if not jobs:
+            QMessageBox.warning(self, "警告", "没有可上传的文件")
             return
         
-        source_path = Path(file_path)
-        dest_path = Path(self.selected_drive) / source_path.name
+        self.rebuild_transfer_table()
         
         # 显示进度条和取消按钮
         self.ui.progressBar.setVisible(True)
         self.ui.speedLabel.setVisible(True)
         self.cancelBtn.setVisible(True)
         self.cancelBtn.setEnabled(True)
-        self.cancelBtn.setText("✖ 取消")
-        self.ui.progressBar.setValue(0)
-        
-        # 禁用上传按钮防止重复操作
-        self.ui.uploadFileBtn.setEnabled(False)
-        
-        # 创建传输线程
-        self.transfer_thread = FileTransferThread(str(source_path), str(dest_path))
-        self.transfer_thread.progress.connect(self.update_progress)
-        self.transfer_thread.finished.connect(self.transfer_finished)
-        self.transfer_thread.start()
+        self.cancelBtn.setText("✖ 全部取消")
         
-        self.statusBar().showMessage(f"📤 正在上传: {source_path.name}")
+        self.start_transfer_queue()
+        self.statusBar().showMessage(f"📤 已加入传输队列: {len(jobs)} 个文件")
+    
+    def start_transfer_queue(self):
+        """启动传输队列线程（已在执行时新任务会被自动接上）"""
+        if self.transfer_queue_thread and self.transfer_queue_thread.isRunning():
+            return
+        self.transfer_queue_thread = TransferQueueThread(self.transfer_queue)
+        self.transfer_queue_thread.progress.connect(self.update_progress)
+        self.transfer_queue_thread.jobs_changed.connect(self.update_transfer_rows)
+        self.transfer_queue_thread.queue_finished.connect(self.transfer_finished)
+        self.transfer_queue_thread.start()
     
     def cancel_transfer(self):
-        """取消当前传输"""
-        if self.transfer_thread and self.transfer_thread.isRunning():
+        """取消队列中的所有传输"""
+        if self.transfer_queue_thread and self.transfer_queue_thread.isRunning():
             self.cancelBtn.setText("正在停止...")
             self.cancelBtn.setEnabled(False)
-            self.transfer_thread.cancel()
+            self.transfer_queue_thread.cancel()
             self.statusBar().showMessage("正在取消传输...")
+        else:
+            # 队列未在执行（只剩暂停的任务）时直接取消
+            self.transfer_queue.cancel_all()
+            self.rebuild_transfer_table()
+    
+    def rebuild_transfer_table(self):
+        """按队列顺序重建传输队列表格"""
+        jobs = self.transfer_queue.jobs()
+        self.transferQueueTable.setRowCount(len(jobs))
+        self.transfer_rows = {}
+        for row, job in enumerate(jobs):
+            self.transfer_rows[job.job_id] = row
+            self.fill_transfer_row(row, job)
+        self.transferQueueTable.setVisible(bool(jobs))
+    
+    def update_transfer_rows(self, jobs):
+        """任务状态变化时更新对应行"""
+        for job in jobs:
+            row = self.transfer_rows.get(job.job_id)
+            if row is not None:
+                self.fill_transfer_row(row, job)
+    
+    def fill_transfer_row(self, row, job):
+        """填充传输队列表格的一行"""
+        state_names = {
+            PENDING: "⏳ 等待中", RUNNING: "📤 传输中", PAUSED: "⏸ 已暂停",
+            DONE: "✅ 完成", FAILED: "❌ 失败", CANCELLED: "✖ 已取消",
+        }
+        name_item = self.create_table_item(job.name)
+        name_item.setToolTip(f"{job.source}\n→ {job.destination}")
+        self.transferQueueTable.setItem(row, 0, name_item)
+        state_item = self.create_table_item(state_names.get(job.state, job.state))
+        if job.error:
+            state_item.setToolTip(job.error)
+        self.transferQueueTable.setItem(row, 1, state_item)
+        self.transferQueueTable.setItem(
+            row, 2, self.create_table_item(f"{job.percent}% / {format_size(job.size)}"))
+        
+        self.transferQueueTable.removeCellWidget(row, 3)
+        if job.state in (DONE, FAILED, CANCELLED):
+            return
+        
+        widget = QWidget()
+        layout = QHBoxLayout(widget)
+        layout.setContentsMargins(2, 0, 2, 0)
+        layout.setSpacing(2)
+        buttons = [
+            ("▶" if job.state == PAUSED else "⏸", "继续" if job.state == PAUSED else "暂停",
+             lambda checked, job_id=job.job_id: self.toggle_transfer_pause(job_id)),
+            ("⬆", "前移", lambda checked, job_id=job.job_id: self.move_transfer(job_id, -1)),
+            ("⬇", "后移", lambda checked, job_id=job.job_id: self.move_transfer(job_id, 1)),
+            ("✖", "取消", lambda checked, job_id=job.job_id: self.cancel_transfer_job(job_id)),
+        ]
+        for text, tip, handler in buttons:
+            btn = QPushButton(text)
+            btn.setToolTip(tip)
+            btn.setFixedSize(26, 22)
+            btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            btn.clicked.connect(handler)
+            layout.addWidget(btn)
+        self.transferQueueTable.setCellWidget(row, 3, widget)
+    
+    def toggle_transfer_pause(self, job_id):
+        """暂停或继续单个任务"""
+        job = self.transfer_queue.get(job_id)
+        if job is None:
+            return
+        if job.state == PAUSED:
+            self.transfer_queue.resume(job_id)
+            self.ui.progressBar.setVisible(True)
+            self.ui.speedLabel.setVisible(True)
+            self.cancelBtn.setVisible(True)
+            self.cancelBtn.setEnabled(True)
+            self.start_transfer_queue()
+        else:
+            # 进行中的任务在当前分片结束后由队列线程更新状态
+            self.transfer_queue.pause(job_id)
+        self.update_transfer_rows([job])
+    
+    def move_transfer(self, job_id, offset):
+        """调整任务在队列中的顺序"""
+        if self.transfer_queue.move(job_id, offset):
+            self.rebuild_transfer_table()
+    
+    def cancel_transfer_job(self, job_id):
+        """取消单个任务"""
+        job = self.transfer_queue.get(job_id)
+        if job is not None and self.transfer_queue.cancel(job_id):
+            self.update_transfer_rows([job])
 
-    def update_progress(self, value, speed):
-        """更新进度"""
-        self.ui.progressBar.setValue(value)
-        self.ui.speedLabel.setText(f"传输速度: {speed}")
+    def update_progress(self, progress):
+        """更新整批进度（TransferProgress 只含数值，这里负责格式化）"""
+        self.ui.progressBar.setValue(progress.percent)
+        self.update_transfer_rows([job for job in self.transfer_queue.jobs() if job.state == RUNNING])
+        text = (f"传输速度: {format_size(int(progress.speed))}/s"
+                f"（瞬时 {format_size(int(progress.instant_speed))}/s）"
+                f" | {format_size(progress.bytes_done)} / {format_size(progress.total_bytes)}")
+        if progress.paused:
+            text += " | 已暂停"
+        elif progress.eta is not None and not progress.finished:
+            text += f" | 剩余 {self.format_duration(progress.eta)}"
+        self.ui.speedLabel.setText(text)
+    
+    @staticmethod
+    def format_duration(seconds):
+        """把秒数格式化为 h:mm:ss 或 m:ss"""
+        seconds = int(round(seconds))
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
     
-    def transfer_finished(self, success, message):
-        """传输完成"""
+    def transfer_finished(self):
+        """传输队列执行结束（暂停的任务保留在队列中）"""
+        # 队列线程发出结束信号后 run() 即返回；工作线程退出后才加入或继续的任务
+        # 在 start_transfer_queue 中因线程仍在运行而没有启动，这里接着执行
+        self.transfer_queue_thread.wait()
+        if any(job.state == PENDING for job in self.transfer_queue.jobs()):
+            self.start_transfer_queue()
+            return
+        
         self.ui.progressBar.setVisible(False)
         self.ui.speedLabel.setVisible(False)
         self.cancelBtn.setVisible(False)
-        self.ui.uploadFileBtn.setEnabled(True)
+        self.refresh_file_list()
         
-        if success:
-            self.refresh_file_list()
-            QMessageBox.information(self, "成功", "文件上传成功！")
-            self.statusBar().showMessage("✅ 文件上传成功")
+        counts = {}
+        for job in self.transfer_queue.jobs():
+            counts[job.state] = counts.get(job.state, 0) + 1
+        summary = (f"完成 {counts.get(DONE, 0)} 个，失败 {counts.get(FAILED, 0)} 个，"
+                   f"取消 {counts.get(CANCELLED, 0)} 个，暂停 {counts.get(PAUSED, 0)} 个")
+        if counts.get(FAILED):
+            failed = [job for job in self.transfer_queue.jobs() if job.state == FAILED]
+            details = "\n".join(f"{job.name}: {job.error}" for job in failed[:10])
+            QMessageBox.critical(self, "错误", f"部分文件上传失败（{summary}）:\n{details}")
+            self.statusBar().showMessage(f"❌ 传输结束: {summary}")
+        elif counts.get(CANCELLED):
+            self.statusBar().showMessage(f"⚠️ 传输结束: {summary}")
         else:
-            # 如果是用户取消的，提示不同
-            if "取消" in message:
-                self.statusBar().showMessage(f"⚠️ {message}")
-                QMessageBox.information(self, "已取消", "文件传输已取消")
-            else:
-                QMessageBox.critical(self, "错误", f"文件上传失败: {message}")
-                self.statusBar().showMessage(f"❌ 上传失败: {message}")
-            self.refresh_file_list() # 刷新以移除可能残留的部分文件
-    
-    def delete_file(self, file_path):
-        """删除文件"""
+            self.statusBar().showMessage(f"✅ 传输结束: {summary}")
+        
+        # 清掉已完成的任务，只保留暂停的
+        self.transfer_queue.clear_finished()
+        self.rebuild_transfer_table()
+    
+    def delete_selected(self):
+        """删除文件表格中选中的所有文件和文件夹；删除进行中再次点击取消"""
+        if self.delete_thread and self.delete_thread.isRunning():
+            self.delete_thread.cancel()
+            self.statusBar().showMessage("⚠️ 正在停止删除...")
+            return
+        
+        paths = []
+        for index in self.ui.filesTable.selectionModel().selectedRows(0):
+            item = self.ui.filesTable.item(index.row(), 0)
+            path = item.data(Qt.ItemDataRole.UserRole) if item else None
+            if path:
+                paths.append(path)
+        if not paths:
+            QMessageBox.warning(self, "警告", "请先选择要删除的文件或文件夹")
+            return
+        self.delete_paths(paths)
+    
+    def delete_paths(self, paths):
+        """确认后在后台删除文件和文件夹，全部完成后只刷新一次文件列表"""
+        if self.delete_thread and self.delete_thread.isRunning():
+            QMessageBox.warning(self, "警告", "正在删除其他文件，请稍候")
+            return
+        
+        if len(paths) == 1:
+            kind = "文件夹及其中的所有内容" if Path(paths[0]).is_dir() else "文件"
+            prompt = f"确定要删除{kind}吗？\n{paths[0]}"
+        else:
+            prompt = f"确定要删除选中的 {len(paths)} 项吗？\n文件夹会连同其中的所有内容一起删除。"
         reply = QMessageBox.question(
-            self, "确认删除",
-            f"确定要删除文件吗？\n{file_path}",
+            self, "确认删除", prompt,
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
         
-        if reply == QMessageBox.StandardButton.Yes:
-            if DriveManager.delete_file(file_path):
-                self.refresh_file_list()
-                self.statusBar().showMessage(f"✅ 文件已删除: {Path(file_path).name}")
-            else:
-                QMessageBox.critical(self, "错误", "文件删除失败")
-                self.statusBar().showMessage("❌ 文件删除失败")
+        # 正在进行的列表读取和文件夹统计会与删除争用设备，先停止
+        self.stop_folder_sizes()
+        self.delete_thread = BulkDeleteThread(paths)
+        self.delete_thread.progress.connect(
+            lambda files, dirs: self.statusBar().showMessage(
+                f"🗑️ 正在删除: 已删除 {files} 个文件、{dirs} 个文件夹"))
+        self.delete_thread.delete_finished.connect(self.on_delete_finished)
+        self.delete_thread.finished.connect(lambda: self.deleteSelectedBtn.setText("🗑️ 删除所选"))
+        self.deleteSelectedBtn.setText("✖ 停止删除")
+        self.delete_thread.start()
+    
+    def on_delete_finished(self, stats):
+        """批量删除结束"""
+        self.refresh_file_list()
+        summary = f"{stats.files_deleted} 个文件、{stats.dirs_deleted} 个文件夹，用时 {stats.elapsed:.1f} 秒"
+        if stats.cancelled:
+            self.statusBar().showMessage(f"⚠️ 删除已取消，已删除 {summary}")
+        elif stats.errors:
+            details = "\n".join(f"{path}: {error}" for path, error in stats.errors[:10])
+            QMessageBox.critical(self, "错误", f"有 {len(stats.errors)} 项删除失败:\n{details}")
+            self.statusBar().showMessage(f"❌ 部分删除失败，已删除 {summary}")
+        else:
+            self.statusBar().showMessage(f"✅ 已删除 {summary}")
     
     def auto_refresh(self):
         """自动刷新"""
         # 如果当前在 USB 设备标签页，刷新 USB 设备
         if self.ui.tabWidget.currentIndex() == 0:
             self.scan_usb_devices()
+
+    def on_devices_changed(self, events):
+        """热插拔事件（已去抖）；定时回退模式下 events 为空，暂停期间的事件在恢复时一起送达"""
+        if not events:
+            self.device_index.refresh()
+            self.auto_refresh()
+            return
+
+        self.device_index.apply_uevents(events)
+        subsystems = {event.get('SUBSYSTEM') for event in events}
+        # 设备已变化，之前的扫描结果作废
+        if 'usb' in subsystems:
+            scan_cache.invalidate(USB_DEVICES)
+        if 'block' in subsystems:
+            scan_cache.invalidate(MOUNTED_DRIVES)
+        
+        if 'usb' in subsystems:
+            self.scan_usb_devices()
+        # 挂载监听可用时由它负责驱动器表格（块设备事件早于自动挂载，此时扫描也看不到新卷）
+        if 'block' in subsystems and not self.mount_watcher.is_active:
+            self.scan_mounted_drives()
+
+    def _pause_auto_refresh(self):
+        """暂停自动刷新（测速期间避免表格重建销毁按钮）"""
+        self.hotplug_watcher.pause()
+
+    def _resume_auto_refresh(self):
+        """恢复自动刷新，补上暂停期间的设备变化"""
+        self.hotplug_watcher.resume()
+
+    def closeEvent(self, event):
+        """关闭窗口时停止后台监听线程"""
+        self.hotplug_watcher.stop()
+        self.mount_watcher.stop()
+        if self.file_list_thread and self.file_list_thread.isRunning():
+            self.file_list_thread.cancel()
+            self.file_list_thread.wait()
+        self.stop_folder_sizes()
+        self.stop_volume_index()
+        self.stop_file_search()
+        if self.dedup_thread and self.dedup_thread.isRunning():
+            self.dedup_thread.cancel()
+            self.dedup_thread.wait()
+        if self.delete_thread and self.delete_thread.isRunning():
+            self.delete_thread.cancel()
+            self.delete_thread.wait()
+        if self.transfer_queue_thread and self.transfer_queue_thread.isRunning():
+            self.transfer_queue_thread.cancel()
+            self.transfer_queue_thread.wait()
+        if self.file_index is not None:
+            self.file_index.close()
+        super().closeEvent(event)
     
     def refresh_all(self):
         """刷新所有数据"""
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+伪造的 sysfs USB 目录树
+与真实 sysfs 相同: 设备目录按端口链嵌套在主控制器目录下
+（/sys/devices/pci0000:00/<控制器>/usb1/1-1/1-1.2），
+/sys/bus/usb/devices/ 中是指向这些目录的符号链接，接口节点（1-1:1.0）同样列在其中
+"""
+
+import os
+from typing import Dict, Optional
+
+
+class FakeSysfs:
+    """在临时目录中构建 sysfs USB 设备树"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.devices_dir = os.path.join(root, 'bus', 'usb', 'devices')
+        os.makedirs(self.devices_dir, exist_ok=True)
+
+    def add_device(self, name: str, controller: str = '0000:00:14.0',
+                   interfaces: Optional[Dict[str, str]] = None, **attrs: str) -> str:
+        """
+        添加一个设备（上级设备需先添加）
+
+        Args:
+            name: 设备名，根集线器为 "usb1"，其他为 "1-1"、"1-1.2" 等
+            controller: 根集线器所在的主控制器（PCI 地址）
+            interfaces: {接口编号: bInterfaceClass}，例如 {'1.0': '08'}
+            **attrs: 属性文件 (idVendor、speed、version、devpath 等)
+
+        Returns:
+            设备的实际目录
+        """
+        device_dir = os.path.join(self._parent_dir(name, controller), name)
+        os.makedirs(device_dir)
+        for attr, value in attrs.items():
+            self._write(device_dir, attr, value)
+        self._link(name, device_dir)
+
+        for number, iface_class in (interfaces or {}).items():
+            iface = f"{name}:{number}"
+            iface_dir = os.path.join(device_dir, iface)
+            os.makedirs(iface_dir)
+            self._write(iface_dir, 'bInterfaceClass', iface_class)
+            self._link(iface, iface_dir)
+        return device_dir
+
+    def _parent_dir(self, name: str, controller: str) -> str:
+        if name.startswith('usb'):
+            return os.path.join(self.root, 'devices', 'pci0000:00', controller)
+        bus, _, path = name.partition('-')
+        parent = f"{bus}-{path.rsplit('.', 1)[0]}" if '.' in path else f"usb{bus}"
+        return os.path.realpath(os.path.join(self.devices_dir, parent))
+
+    def _link(self, name: str, target: str) -> None:
+        os.symlink(os.path.relpath(target, self.devices_dir), os.path.join(self.devices_dir, name))
+
+    @staticmethod
+    def _write(directory: str, name: str, value: str) -> None:
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(f"{value}\n")
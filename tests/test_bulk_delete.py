@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""BulkDeleter 递归删除、符号链接与错误汇报的测试"""
+
+import os
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from src.core import bulk_delete
+from src.core.bulk_delete import BulkDeleter, DeleteStats
+
+
+class BulkDeleterTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self._tmp.name, 'tree')
+        self.outside = os.path.join(self._tmp.name, 'outside')
+        os.makedirs(os.path.join(self.outside, 'keep'))
+        self.write(os.path.join(self.outside, 'keep', 'important.txt'))
+
+        for parts in (('a', 'b', 'c'), ('a', 'd'), ('e',)):
+            os.makedirs(os.path.join(self.root, *parts))
+        for name in ('top.txt', 'a/1.txt', 'a/b/2.txt', 'a/b/c/3.txt', 'a/b/c/4.txt', 'a/d/5.txt'):
+            self.write(os.path.join(self.root, name))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    @staticmethod
+    def write(path: str) -> None:
+        with open(path, 'wb') as f:
+            f.write(b'data')
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def test_nested_tree(self):
+        stats = BulkDeleter(max_workers=3).delete([self.root])
+        self.assertTrue(stats.ok, stats.errors)
+        self.assertEqual((stats.files_deleted, stats.dirs_deleted), (6, 6))
+        self.assertFalse(os.path.exists(self.root))
+
+    def test_multiple_top_level_paths(self):
+        stats = BulkDeleter().delete([self.path('top.txt'), self.path('a'), self.path('e')])
+        self.assertTrue(stats.ok, stats.errors)
+        self.assertEqual((stats.files_deleted, stats.dirs_deleted), (6, 5))
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_read_only_files(self):
+        for name in ('top.txt', 'a/b/2.txt'):
+            os.chmod(self.path(*name.split('/')), stat.S_IREAD)
+        stats = BulkDeleter().delete([self.root])
+        self.assertTrue(stats.ok, stats.errors)
+        self.assertFalse(os.path.exists(self.root))
+
+    def test_symlink_to_outside_directory_is_not_followed(self):
+        os.symlink(self.outside, self.path('a', 'b', 'link'))
+        os.symlink(self.outside, self.path('top-link'))
+
+        stats = BulkDeleter().delete([self.root])
+        self.assertTrue(stats.ok, stats.errors)
+        self.assertFalse(os.path.exists(self.root))
+        # 只删除链接本身
+        self.assertEqual(stats.files_deleted, 8)
+        self.assertTrue(os.path.isfile(os.path.join(self.outside, 'keep', 'important.txt')))
+
+    def test_top_level_symlink_removes_only_the_link(self):
+        link = os.path.join(self._tmp.name, 'link')
+        os.symlink(self.outside, link)
+        stats = BulkDeleter().delete([link])
+        self.assertTrue(stats.ok, stats.errors)
+        self.assertFalse(os.path.lexists(link))
+        self.assertTrue(os.path.isfile(os.path.join(self.outside, 'keep', 'important.txt')))
+
+    @unittest.skipUnless(bulk_delete._HAS_DIR_FD, "需要 dir_fd 支持")
+    def test_directory_swapped_for_symlink_is_not_followed(self):
+        # 模拟扫描之后目录被换成指向树外的符号链接
+        st = os.stat(self.path('a', 'd'))
+        os.rename(self.path('a', 'd'), self.path('moved'))
+        os.symlink(self.outside, self.path('a', 'd'))
+
+        stats = DeleteStats()
+        base_fd = os.open(self._tmp.name, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            subdirs = BulkDeleter()._clear_files(base_fd, (self._tmp.name, ('tree', 'a', 'd')),
+                                                 (st.st_dev, st.st_ino), stats, threading.Lock(), None)
+        finally:
+            os.close(base_fd)
+        self.assertEqual(subdirs, [])
+        self.assertEqual(len(stats.errors), 1)
+        self.assertTrue(os.path.isfile(os.path.join(self.outside, 'keep', 'important.txt')))
+
+    @unittest.skipUnless(bulk_delete._HAS_DIR_FD, "需要 dir_fd 支持")
+    def test_directory_replaced_by_other_directory_is_rejected(self):
+        st = os.stat(self.path('a', 'd'))
+        os.rename(self.path('a', 'd'), self.path('moved'))
+        os.rename(self.outside, self.path('a', 'd'))
+
+        stats = DeleteStats()
+        base_fd = os.open(self._tmp.name, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            BulkDeleter()._clear_files(base_fd, (self._tmp.name, ('tree', 'a', 'd')),
+                                       (st.st_dev, st.st_ino), stats, threading.Lock(), None)
+        finally:
+            os.close(base_fd)
+        self.assertEqual(len(stats.errors), 1)
+        self.assertTrue(os.path.isfile(self.path('a', 'd', 'keep', 'important.txt')))
+
+    def test_partial_failure_is_reported(self):
+        real_unlink = os.unlink
+
+        def unlink(path, *args, **kwargs):
+            if path == '3.txt':
+                raise PermissionError(13, 'Permission denied')
+            return real_unlink(path, *args, **kwargs)
+
+        missing = os.path.join(self._tmp.name, 'missing')
+        with mock.patch('os.unlink', side_effect=unlink):
+            stats = BulkDeleter().delete([missing, self.root])
+
+        self.assertFalse(stats.ok)
+        failed = sorted(path for path, _ in stats.errors)
+        # 失败的文件、无法删除的非空目录链及不存在的路径都被报告
+        self.assertEqual(failed, sorted([missing, self.path('a', 'b', 'c', '3.txt'), self.path('a', 'b', 'c'),
+                                         self.path('a', 'b'), self.path('a'), self.root]))
+        self.assertEqual(stats.files_deleted, 5)
+        self.assertEqual(os.listdir(self.root), ['a'])
+        self.assertEqual(os.listdir(self.path('a', 'b', 'c')), ['3.txt'])
+
+    def test_cancel_before_start(self):
+        cancel = threading.Event()
+        cancel.set()
+        stats = BulkDeleter().delete([self.root], cancel_event=cancel)
+        self.assertTrue(stats.cancelled)
+        self.assertTrue(os.path.isfile(self.path('a', 'b', 'c', '3.txt')))
+
+
+if __name__ == '__main__':
+    unittest.main()
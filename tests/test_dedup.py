@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""DuplicateFinder 分阶段查找与进度汇报的测试"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.dedup import PARTIAL_SIZE, DuplicateFinder
+
+
+class DuplicateFinderTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        os.mkdir(os.path.join(self.root, 'sub'))
+        big = os.urandom(3 * PARTIAL_SIZE)
+        self.write('a.bin', big)
+        self.write('sub/a copy.bin', big)
+        # 同大小、首尾相同但中间不同，只有完整哈希能区分
+        self.write('b.bin', big[:PARTIAL_SIZE] + os.urandom(PARTIAL_SIZE) + big[-PARTIAL_SIZE:])
+        self.write('small1.txt', b'hello')
+        self.write('sub/small2.txt', b'hello')
+        self.write('unique.txt', b'only one of these')
+        os.link(os.path.join(self.root, 'unique.txt'), os.path.join(self.root, 'sub', 'hardlink.txt'))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name: str, data: bytes) -> None:
+        with open(os.path.join(self.root, name), 'wb') as f:
+            f.write(data)
+
+    def test_groups(self):
+        groups, stats = DuplicateFinder(max_workers=2).find([self.root])
+        self.assertTrue(stats.complete)
+        self.assertEqual([sorted(os.path.basename(path) for path in group.paths) for group in groups],
+                         [['a copy.bin', 'a.bin'], ['small1.txt', 'small2.txt']])
+        # 硬链接只算一个文件
+        self.assertEqual(stats.files_scanned, 6)
+        self.assertEqual(stats.size_candidates, 5)
+        self.assertEqual(stats.partial_candidates, 3)
+
+    def test_progress_during_walk(self):
+        reports = []
+        DuplicateFinder().find([self.root], progress=lambda stats: reports.append((stats.stage, stats.files_scanned)),
+                               progress_interval=0)
+        walk = [files for stage, files in reports if stage == 'size']
+        # 阶段开始时一次，之后每个文件一次
+        self.assertEqual(walk, list(range(0, 7)))
+        self.assertEqual([stage for stage, _ in reports[-3:]], ['partial', 'full', 'done'])
+
+    def test_walk_progress_is_throttled(self):
+        reports = []
+        DuplicateFinder().find([self.root], progress=lambda stats: reports.append(stats.stage),
+                               progress_interval=60)
+        self.assertEqual(reports, ['size', 'partial', 'full', 'done'])
+
+
+if __name__ == '__main__':
+    unittest.main()
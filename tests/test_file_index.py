@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FileIndex 增量扫描与文件名三元组搜索的测试"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.core.file_index import FileIndex
+
+UUID = 'TEST-UUID'
+
+
+class FileIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        # 数据库放在卷外，避免扫描到它自身
+        self.index = FileIndex(os.path.join(self._tmp.name, 'index.sqlite3'))
+        self.volume = os.path.join(self._tmp.name, 'volume')
+        for name in ('docs', 'docs/old', 'photos'):
+            os.makedirs(os.path.join(self.volume, name))
+        self.write('readme.txt', 10)
+        self.write('docs/Annual Report.PDF', 100)
+        self.write('docs/old/report-2019.pdf', 50)
+        self.write('photos/IMG_0001.jpg', 1000)
+
+    def tearDown(self):
+        self.index.close()
+        self._tmp.cleanup()
+
+    def write(self, name: str, size: int) -> None:
+        with open(os.path.join(self.volume, name), 'wb') as f:
+            f.write(b'x' * size)
+
+    def touch_dir(self, rel_dir: str) -> None:
+        """确保目录的修改时间与索引中的不同（文件系统时间粒度可能较粗）"""
+        path = os.path.join(self.volume, rel_dir)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def search(self, query: str):
+        return sorted(path for batch in self.index.search(UUID, query) for path, _, _ in batch)
+
+    def test_full_then_incremental_scan(self):
+        stats = self.index.scan(self.volume, UUID)
+        self.assertTrue(stats.complete)
+        self.assertEqual((stats.dirs_scanned, stats.files_added), (4, 4))
+        self.assertEqual(self.index.volume_info(UUID)['files'], 4)
+        self.assertEqual(self.index.volume_info(UUID)['bytes'], 1160)
+
+        # 没有变化时所有目录都直接沿用索引
+        stats = self.index.scan(self.volume, UUID)
+        self.assertEqual((stats.dirs_scanned, stats.dirs_skipped), (0, 4))
+        self.assertEqual((stats.files_added, stats.files_changed, stats.files_removed), (0, 0, 0))
+
+    def test_incremental_scan_reads_only_changed_dirs(self):
+        self.index.scan(self.volume, UUID)
+        self.write('docs/old/notes.txt', 3)
+        self.touch_dir('docs/old')
+
+        stats = self.index.scan(self.volume, UUID)
+        self.assertEqual((stats.dirs_scanned, stats.dirs_skipped), (1, 3))
+        self.assertEqual(stats.files_added, 1)
+        self.assertEqual(self.search('notes'), ['docs/old/notes.txt'])
+
+    def test_removed_subtree_is_dropped(self):
+        self.index.scan(self.volume, UUID)
+        shutil.rmtree(os.path.join(self.volume, 'docs'))
+        self.touch_dir('')
+
+        stats = self.index.scan(self.volume, UUID)
+        self.assertEqual(stats.files_removed, 2)
+        self.assertEqual(self.search('report'), [])
+        self.assertEqual(self.index.volume_info(UUID)['files'], 2)
+
+    def test_in_place_change_needs_full_scan(self):
+        self.index.scan(self.volume, UUID)
+        path = os.path.join(self.volume, 'photos', 'IMG_0001.jpg')
+        # 原地改写不改变所在目录的修改时间
+        with open(path, 'ab') as f:
+            f.write(b'more')
+
+        self.assertEqual(self.index.scan(self.volume, UUID).files_changed, 0)
+        stats = self.index.scan(self.volume, UUID, full=True)
+        self.assertEqual((stats.dirs_scanned, stats.files_changed), (4, 1))
+        # 改写的文件在文件名索引中仍然只出现一次
+        self.assertEqual(self.search('img_0001'), ['photos/IMG_0001.jpg'])
+
+    def test_trigram_search(self):
+        self.index.scan(self.volume, UUID)
+        if not self.index.has_trigram:
+            self.skipTest("SQLite 不支持 FTS5 trigram")
+        # 不区分大小写的子串匹配
+        self.assertEqual(self.search('REPORT'), ['docs/Annual Report.PDF', 'docs/old/report-2019.pdf'])
+        self.assertEqual(self.search('port-20'), ['docs/old/report-2019.pdf'])
+        self.assertEqual(self.search('"x'), [])
+        # 其他卷的记录不会出现在结果中
+        self.assertEqual(list(self.index.search('OTHER-UUID', 'report')), [])
+
+    def test_short_query_falls_back_to_like(self):
+        self.index.scan(self.volume, UUID)
+        self.assertEqual(self.search('MG'), ['photos/IMG_0001.jpg'])
+        self.assertEqual(self.search('_0'), ['photos/IMG_0001.jpg'])
+        self.assertEqual(self.search(''), [])
+
+    def test_search_batches(self):
+        self.index.scan(self.volume, UUID)
+        batches = list(self.index.search(UUID, 'e', batch_size=1))
+        self.assertEqual(len(batches), 3)
+        self.assertTrue(all(len(batch) == 1 for batch in batches))
+
+
+if __name__ == '__main__':
+    unittest.main()
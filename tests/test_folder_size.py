@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""FolderSizeEngine 硬链接去重与目录缓存的测试"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.folder_size import FolderSizeCache, FolderSizeEngine
+
+
+class FolderSizeEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        for name in ('a', 'b', os.path.join('b', 'c')):
+            os.mkdir(os.path.join(self.root, name))
+        self.write('a/plain', 100)
+        self.write('a/shared', 1000)
+        os.link(os.path.join(self.root, 'a', 'shared'), os.path.join(self.root, 'b', 'c', 'shared'))
+        self.write('b/plain', 10)
+        self.cache = FolderSizeCache()
+        self.engine = FolderSizeEngine(max_workers=2, cache=self.cache)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name: str, size: int) -> None:
+        with open(os.path.join(self.root, name), 'wb') as f:
+            f.write(b'x' * size)
+
+    def size(self, *parts: str):
+        result = self.engine.compute(os.path.join(self.root, *parts))
+        self.assertTrue(result.complete)
+        return result.bytes, result.files
+
+    def test_hardlink_counted_once_per_walk(self):
+        self.assertEqual(self.size(), (1110, 3))
+
+    def test_cached_subtrees_still_count_shared_inodes(self):
+        self.assertEqual(self.size(), (1110, 3))
+        # 两个子树都包含同一个 inode，分别统计时都要计入
+        self.assertEqual(self.size('a'), (1100, 2))
+        self.assertEqual(self.size('b'), (1010, 2))
+        self.assertEqual(self.size('b', 'c'), (1000, 1))
+        self.assertGreater(self.cache.hits, 0)
+        self.assertEqual(self.size(), (1110, 3))
+
+    def test_cache_invalidated_by_directory_change(self):
+        self.assertEqual(self.size('b'), (1010, 2))
+        self.write('b/new', 5)
+        self.assertEqual(self.size('b'), (1015, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""用 FakeUeventSource 驱动 HotplugWatcher 的测试（去抖与定时回退）"""
+
+import time
+import unittest
+
+from PyQt6.QtCore import QCoreApplication
+
+from src.core.hotplug import HotplugWatcher
+from src.core.uevent import FakeUeventSource
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def process_events(seconds: float) -> None:
+    """运行事件循环一段时间，让跨线程信号和定时器得到处理"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def usb_event(action: str, devpath: str, subsystem: str = 'usb') -> dict:
+    return {'ACTION': action, 'DEVPATH': devpath, 'SUBSYSTEM': subsystem}
+
+
+class HotplugWatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.changes = []
+        self.watcher = None
+
+    def tearDown(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def make_watcher(self, source: FakeUeventSource, **kwargs) -> HotplugWatcher:
+        self.watcher = HotplugWatcher(source, **kwargs)
+        self.watcher.devices_changed.connect(self.changes.append)
+        return self.watcher
+
+    def test_burst_is_debounced_into_one_change(self):
+        source = FakeUeventSource()
+        watcher = self.make_watcher(source)
+        self.assertTrue(watcher.start())
+        self.assertTrue(watcher.is_event_driven)
+
+        # 插入一个 U 盘时的典型事件序列: USB 设备、接口、块设备、分区
+        burst = [usb_event('add', '/devices/pci0000:00/0000:00:14.0/usb2/2-1'),
+                 usb_event('add', '/devices/pci0000:00/0000:00:14.0/usb2/2-1/2-1:1.0')]
+        burst += [usb_event('add', f'/devices/virtual/block/sdb{i}', 'block') for i in range(10)]
+        for event in burst:
+            source.push(event)
+        # 不关心的子系统被过滤掉
+        source.push(usb_event('add', '/devices/virtual/input/input9', 'input'))
+
+        process_events(0.15)
+        self.assertEqual(self.changes, [], "去抖窗口 (300 ms) 结束前不应通知")
+
+        process_events(0.6)
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(self.changes[0], burst)
+
+    def test_events_keep_extending_the_window(self):
+        source = FakeUeventSource()
+        self.make_watcher(source, debounce_ms=200)
+        self.watcher.start()
+
+        # 间隔小于去抖时间的事件合并为一次
+        for i in range(4):
+            source.push(usb_event('change', f'/devices/virtual/block/sdb{i}', 'block'))
+            process_events(0.1)
+        self.assertEqual(self.changes, [])
+        process_events(0.4)
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(len(self.changes[0]), 4)
+
+        # 安静之后的下一次插拔单独通知
+        source.push(usb_event('remove', '/devices/pci0000:00/0000:00:14.0/usb2/2-1'))
+        process_events(0.5)
+        self.assertEqual(len(self.changes), 2)
+        self.assertEqual(self.changes[1][0]['ACTION'], 'remove')
+
+    def test_falls_back_to_polling_when_source_unavailable(self):
+        watcher = self.make_watcher(FakeUeventSource(available=False), fallback_interval_ms=100)
+        self.assertFalse(watcher.start())
+        self.assertFalse(watcher.is_event_driven)
+
+        process_events(0.35)
+        self.assertGreaterEqual(len(self.changes), 2)
+        self.assertTrue(all(events == [] for events in self.changes))
+
+        watcher.stop()
+        count = len(self.changes)
+        process_events(0.25)
+        self.assertEqual(len(self.changes), count)
+
+    def test_events_while_paused_are_delivered_on_resume(self):
+        source = FakeUeventSource()
+        watcher = self.make_watcher(source, debounce_ms=50)
+        watcher.start()
+        watcher.pause()
+
+        plugged = usb_event('add', '/devices/pci0000:00/0000:00:14.0/usb2/2-1')
+        removed = usb_event('remove', '/devices/virtual/block/sdc', 'block')
+        source.push(plugged)
+        process_events(0.2)
+        source.push(removed)
+        process_events(0.2)
+        self.assertEqual(self.changes, [], "暂停期间不应通知")
+
+        watcher.resume()
+        self.assertEqual(self.changes, [[plugged, removed]])
+        process_events(0.2)
+        self.assertEqual(len(self.changes), 1)
+
+    def test_resume_without_events_does_not_notify(self):
+        watcher = self.make_watcher(FakeUeventSource(), debounce_ms=50)
+        watcher.start()
+        watcher.pause()
+        process_events(0.1)
+        watcher.resume()
+        process_events(0.1)
+        self.assertEqual(self.changes, [])
+
+    def test_missed_poll_while_paused_triggers_one_rescan(self):
+        watcher = self.make_watcher(FakeUeventSource(available=False), fallback_interval_ms=50)
+        watcher.start()
+        watcher.pause()
+        process_events(0.3)
+        self.assertEqual(self.changes, [])
+        watcher.resume()
+        self.assertEqual(self.changes, [[]])
+
+    def test_default_intervals(self):
+        watcher = self.make_watcher(FakeUeventSource(available=False))
+        self.assertEqual(watcher._debounce_timer.interval(), 300)
+        watcher.start()
+        self.assertTrue(watcher._fallback_timer.isActive())
+        self.assertEqual(watcher._fallback_timer.interval(), 10000)
+
+
+if __name__ == '__main__':
+    unittest.main()
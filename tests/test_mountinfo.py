@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""mountinfo 解析与 MountTable 在样例挂载表、伪造 sysfs 块设备目录上的测试"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.mountinfo import MountTable, parse_mountinfo_line, unescape_mount_path
+
+PCI = 'devices/pci0000:00'
+
+# 系统盘、/proc、/run、带空格的 U 盘挂载点（两个可选字段）、同一分区的 bind mount、
+# 非 USB 的 SD 卡（removable=1，挂载点含反斜杠）、挂在非常规位置的 U 盘、内置数据盘
+SAMPLE_MOUNTINFO = r"""22 1 8:2 / / rw,relatime shared:1 - ext4 /dev/sda2 rw,errors=remount-ro
+35 22 8:1 / /boot/efi rw,relatime shared:3 - vfat /dev/sda1 rw,fmask=0077,dmask=0077
+40 22 0:21 / /proc rw,nosuid,nodev,noexec,relatime shared:12 - proc proc rw
+41 22 0:25 / /run rw,nosuid,nodev,noexec,relatime shared:13 - tmpfs tmpfs rw,size=1631928k,mode=755
+90 41 8:17 / /run/media/user/My\040Stick rw,nosuid,nodev,relatime shared:150 master:1 - vfat /dev/sdb1 rw,uid=1000,iocharset=utf8
+91 22 8:17 /photos /srv/photos rw,relatime shared:150 - vfat /dev/sdb1 rw,uid=1000,iocharset=utf8
+95 22 179:1 / /srv/sd\134card rw,relatime - exfat /dev/mmcblk0p1 rw
+96 22 8:33 / /srv/backup ro,relatime - exfat /dev/sdc1 ro
+97 22 259:2 / /data rw,relatime shared:160 - ext4 /dev/nvme0n1p2 rw
+"""
+
+
+class FakeBlockSysfs:
+    """伪造 /sys/dev/block 与 /sys/class/block 下的块设备"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def add_partition(self, number: str, disk_path: str, partition: str, removable: bool = False) -> None:
+        """
+        Args:
+            number: "主:次"
+            disk_path: 整盘在 sysfs 中的目录（相对 sysfs 根目录）
+            partition: 分区名
+            removable: 整盘的 removable 属性
+        """
+        disk_dir = os.path.join(self.root, disk_path)
+        part_dir = os.path.join(disk_dir, partition)
+        os.makedirs(part_dir)
+        with open(os.path.join(disk_dir, 'removable'), 'w') as f:
+            f.write('1\n' if removable else '0\n')
+        with open(os.path.join(part_dir, 'partition'), 'w') as f:
+            f.write('1\n')
+        for link_dir, name in (('dev/block', number), ('class/block', partition)):
+            directory = os.path.join(self.root, link_dir)
+            os.makedirs(directory, exist_ok=True)
+            os.symlink(os.path.relpath(part_dir, directory), os.path.join(directory, name))
+
+
+class ParseMountinfoLineTest(unittest.TestCase):
+
+    def test_octal_escapes(self):
+        self.assertEqual(unescape_mount_path(r'/run/media/user/My\040Stick'), '/run/media/user/My Stick')
+        self.assertEqual(unescape_mount_path(r'/mnt/a\011b\012c\134d'), '/mnt/a\tb\nc\\d')
+        # 不是合法八进制的序列原样保留
+        self.assertEqual(unescape_mount_path(r'/mnt/x\089'), r'/mnt/x\089')
+        self.assertEqual(unescape_mount_path('/plain'), '/plain')
+
+    def test_optional_fields(self):
+        lines = SAMPLE_MOUNTINFO.splitlines()
+        two_fields = parse_mountinfo_line(lines[4])
+        self.assertEqual(two_fields.mount_id, 90)
+        self.assertEqual(two_fields.parent_id, 41)
+        self.assertEqual(two_fields.device_number, '8:17')
+        self.assertEqual(two_fields.mount_point, '/run/media/user/My Stick')
+        self.assertEqual(two_fields.fs_type, 'vfat')
+        self.assertEqual(two_fields.source, '/dev/sdb1')
+        self.assertEqual(two_fields.super_options, 'rw,uid=1000,iocharset=utf8')
+
+        no_fields = parse_mountinfo_line(lines[6])
+        self.assertEqual(no_fields.mount_point, '/srv/sd\\card')
+        self.assertEqual(no_fields.fs_type, 'exfat')
+        self.assertEqual(no_fields.source, '/dev/mmcblk0p1')
+
+    def test_bind_mount_root(self):
+        bind = parse_mountinfo_line(SAMPLE_MOUNTINFO.splitlines()[5])
+        self.assertEqual(bind.root, '/photos')
+        self.assertEqual(bind.mount_point, '/srv/photos')
+        self.assertEqual(bind.device_number, '8:17')
+
+    def test_flags(self):
+        lines = SAMPLE_MOUNTINFO.splitlines()
+        self.assertFalse(parse_mountinfo_line(lines[2]).is_block_device)
+        self.assertTrue(parse_mountinfo_line(lines[0]).is_block_device)
+        self.assertTrue(parse_mountinfo_line(lines[7]).is_read_only)
+        self.assertFalse(parse_mountinfo_line(lines[0]).is_read_only)
+
+    def test_malformed(self):
+        self.assertIsNone(parse_mountinfo_line(''))
+        self.assertIsNone(parse_mountinfo_line('22 1 8:2 / / rw,relatime shared:1 ext4 /dev/sda2 rw'))
+        self.assertIsNone(parse_mountinfo_line('x 1 8:2 / / rw - ext4 /dev/sda2 rw'))
+
+
+class MountTableTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.proc_root = os.path.join(self._tmp.name, 'proc')
+        self.sysfs_root = os.path.join(self._tmp.name, 'sys')
+        self.write_mountinfo(SAMPLE_MOUNTINFO)
+
+        sysfs = FakeBlockSysfs(self.sysfs_root)
+        sata = f'{PCI}/0000:00:17.0/ata1/host0/target0:0:0/0:0:0:0/block/sda'
+        sysfs.add_partition('8:1', sata, 'sda1')
+        sysfs.add_partition('8:2', sata, 'sda2')
+        # U 盘: 位于 USB 总线下，即使 removable 为 0 也算可移动设备
+        sysfs.add_partition('8:17', f'{PCI}/0000:00:14.0/usb2/2-1/2-1:1.0/host6/target6:0:0/6:0:0:0/block/sdb',
+                            'sdb1')
+        sysfs.add_partition('8:33', f'{PCI}/0000:00:14.0/usb2/2-2/2-2:1.0/host7/target7:0:0/7:0:0:0/block/sdc',
+                            'sdc1')
+        # 读卡器: 不在 USB 总线下，但 removable 为 1
+        sysfs.add_partition('179:1', f'{PCI}/0000:00:1c.0/mmc_host/mmc0/mmc0:aaaa/block/mmcblk0', 'mmcblk0p1',
+                            removable=True)
+        sysfs.add_partition('259:2', f'{PCI}/0000:00:1d.0/nvme/nvme0/nvme0n1', 'nvme0n1p2')
+        self.table = MountTable(self.proc_root, self.sysfs_root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_mountinfo(self, text: str) -> None:
+        os.makedirs(os.path.join(self.proc_root, 'self'), exist_ok=True)
+        with open(os.path.join(self.proc_root, 'self', 'mountinfo'), 'w') as f:
+            f.write(text)
+
+    def test_read(self):
+        self.assertTrue(self.table.is_available())
+        self.assertEqual([entry.mount_id for entry in self.table.read()], [22, 35, 40, 41, 90, 91, 95, 96, 97])
+
+    def test_removable_mounts(self):
+        mounts = self.table.removable_mounts()
+        # bind mount (91) 与第一个挂载是同一设备，只保留第一个；系统盘和内置硬盘不包括在内
+        self.assertEqual([entry.mount_id for entry in mounts], [90, 95, 96])
+        self.assertEqual(mounts[0].mount_point, '/run/media/user/My Stick')
+
+    def test_disk_dir(self):
+        stick = self.table.find('/run/media/user/My Stick')
+        self.assertEqual(os.path.basename(self.table.block_device_dir(stick)), 'sdb1')
+        self.assertEqual(os.path.basename(self.table.disk_dir(stick)), 'sdb')
+
+    def test_find_longest_prefix(self):
+        self.assertEqual(self.table.find('/run/media/user/My Stick/docs/a.txt').mount_id, 90)
+        self.assertEqual(self.table.find('/run/media/user/My Stick').mount_id, 90)
+        self.assertEqual(self.table.find('/run/media/user/My Sticker').mount_id, 41)
+        self.assertEqual(self.table.find('/srv/photos/2024').mount_id, 91)
+        self.assertEqual(self.table.find('/home/user').mount_id, 22)
+
+    def test_find_later_mount_wins_with_trailing_slash(self):
+        # 同一挂载点的第二次挂载覆盖第一次，即使第一次的挂载点带有结尾的斜杠
+        self.write_mountinfo(SAMPLE_MOUNTINFO +
+                             "100 22 8:33 / /mnt/usb/ rw - exfat /dev/sdc1 rw\n"
+                             "101 100 8:17 / /mnt/usb rw - vfat /dev/sdb1 rw\n")
+        self.assertEqual(self.table.find('/mnt/usb/file').mount_id, 101)
+
+    def test_missing_proc(self):
+        table = MountTable(os.path.join(self._tmp.name, 'missing'), self.sysfs_root)
+        self.assertFalse(table.is_available())
+        self.assertEqual(table.read(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
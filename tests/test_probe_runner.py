@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ProbeRunner 并发执行、超时与错误处理的测试（用 sys.executable 充当外部命令）"""
+
+import sys
+import time
+import unittest
+
+from src.core.probe_runner import Probe, ProbeRunner
+
+
+def python_probe(name: str, code: str, **kwargs) -> Probe:
+    return Probe(name, [sys.executable, '-c', code], **kwargs)
+
+
+class ProbeRunnerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = ProbeRunner()
+
+    def test_successful_probes_run_concurrently(self):
+        probes = [python_probe(f'p{i}', f'import time; time.sleep(0.3); print("out{i}")') for i in range(3)]
+        start = time.monotonic()
+        results = self.runner.run(probes)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual(sorted(results), ['p0', 'p1', 'p2'])
+        for i in range(3):
+            result = results[f'p{i}']
+            self.assertTrue(result.ok, result)
+            self.assertEqual(result.stdout.strip(), f'out{i}')
+        # 并发执行：总耗时接近单条命令，而不是三条之和
+        self.assertLess(elapsed, 0.85)
+
+    def test_single_probe_timeout(self):
+        results = self.runner.run([
+            python_probe('slow', 'import time; time.sleep(10)', timeout=0.3),
+            python_probe('fast', 'print("done")'),
+        ])
+        self.assertTrue(results['slow'].timed_out)
+        self.assertFalse(results['slow'].ok)
+        self.assertIsNone(results['slow'].returncode)
+        self.assertLess(results['slow'].elapsed, 2)
+        self.assertTrue(results['fast'].ok)
+        self.assertEqual(results['fast'].stdout.strip(), 'done')
+
+    def test_overall_deadline(self):
+        start = time.monotonic()
+        results = self.runner.run([
+            python_probe('hung', 'import time; time.sleep(10)', timeout=30),
+            python_probe('quick', 'print("ok")', timeout=30),
+        ], deadline=0.5)
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertTrue(results['hung'].timed_out)
+        self.assertTrue(results['quick'].ok)
+
+    def test_nonzero_exit(self):
+        result = self.runner.run([
+            python_probe('fail', 'import sys; sys.stderr.write("boom"); sys.exit(3)')
+        ])['fail']
+        self.assertEqual(result.returncode, 3)
+        self.assertFalse(result.timed_out)
+        self.assertIsNone(result.error)
+        self.assertFalse(result.ok)
+        self.assertEqual(result.stderr, 'boom')
+
+    def test_missing_binary(self):
+        results = self.runner.run([
+            Probe('missing', ['/nonexistent/definitely-not-a-binary']),
+            python_probe('present', 'print(1)'),
+        ])
+        self.assertIsNotNone(results['missing'].error)
+        self.assertFalse(results['missing'].ok)
+        self.assertTrue(results['present'].ok)
+
+    def test_output_decoding_fallback(self):
+        code = 'import sys; sys.stdout.buffer.write("中文".encode("gbk"))'
+        result = self.runner.run([python_probe('gbk', code, encodings=('utf-8', 'gbk'))])['gbk']
+        self.assertEqual(result.stdout, '中文')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""ScanCache 缓存失效与 DeviceSnapshot 扫描差异的测试"""
+
+import unittest
+
+from src.core.device_record import DeviceRecord
+from src.core.device_snapshot import DeviceSnapshot, diff
+from src.core.scan_cache import ScanCache, USB_DEVICES
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class ScanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ScanCache(ttl=2.0, clock=self.clock)
+        self.calls = 0
+
+    def load(self):
+        self.calls += 1
+        return [DeviceRecord('Stick', serial=f'S{self.calls}')]
+
+    def test_ttl(self):
+        first = self.cache.get(USB_DEVICES, self.load)
+        self.clock.now += 1.9
+        self.assertIs(self.cache.get(USB_DEVICES, self.load), first)
+        self.assertIs(self.cache.peek(USB_DEVICES), first)
+        self.assertEqual(self.calls, 1)
+
+        self.clock.now += 0.1
+        self.assertIsNone(self.cache.peek(USB_DEVICES))
+        self.assertIsNot(self.cache.get(USB_DEVICES, self.load), first)
+        self.assertEqual(self.calls, 2)
+
+    def test_invalidate_keeps_last_result(self):
+        first = self.cache.get(USB_DEVICES, self.load)
+        self.cache.invalidate(USB_DEVICES)
+        self.assertEqual(self.cache.generation(USB_DEVICES), 1)
+        self.assertIsNone(self.cache.peek(USB_DEVICES))
+        self.assertIs(self.cache.last(USB_DEVICES), first)
+        self.cache.get(USB_DEVICES, self.load)
+        self.assertEqual(self.calls, 2)
+
+    def test_invalidation_during_load_is_not_cached(self):
+        def load():
+            self.cache.invalidate(USB_DEVICES)
+            return self.load()
+
+        value = self.cache.get(USB_DEVICES, load)
+        self.assertIsNone(self.cache.peek(USB_DEVICES))
+        self.assertIs(self.cache.last(USB_DEVICES), value)
+
+
+class SnapshotDiffTest(unittest.TestCase):
+
+    def setUp(self):
+        self.stick = DeviceRecord('Ultra', 'SanDisk', serial='4C530001', bus='USB Storage', speed='480 Mb/s',
+                                  vid_pid='0781:5581', busnum=1, port_path='2')
+        self.mouse = DeviceRecord('Mouse', 'Logitech', vid_pid='046d:c077', busnum=1, port_path='3')
+        self.keyboard = DeviceRecord('Keyboard', 'Logitech', vid_pid='046d:c31c', busnum=1, port_path='4')
+
+    def test_first_scan_adds_everything(self):
+        changes = diff(None, DeviceSnapshot([self.stick, self.mouse]))
+        self.assertEqual([key for key, _ in changes.added], ['4C530001', 'Mouse_046d:c077@1-3'])
+        self.assertEqual((changes.removed, changes.changed), ([], []))
+
+    def test_added_removed_changed(self):
+        previous = DeviceSnapshot([self.stick, self.mouse])
+        # U 盘换到 USB 3 接口（序列号不变），鼠标拔出，键盘插入
+        replugged = self.stick.replace(speed='5000 Mb/s', busnum=2, port_path='1')
+        changes = diff(previous, DeviceSnapshot([replugged, self.keyboard]))
+
+        self.assertEqual(changes.added, [('Keyboard_046d:c31c@1-4', self.keyboard)])
+        self.assertEqual(changes.removed, ['Mouse_046d:c077@1-3'])
+        self.assertEqual(changes.changed, [('4C530001', replugged)])
+        self.assertEqual(changes.changed[0][1].speed_mbps, 5000)
+
+    def test_unchanged_scan_is_empty(self):
+        previous = DeviceSnapshot([self.stick, self.mouse])
+        # 内容相同的新对象不算变化
+        current = DeviceSnapshot([self.stick.replace(), self.mouse.replace()])
+        self.assertTrue(diff(previous, current).is_empty())
+
+    def test_identical_devices_without_serial(self):
+        twin = DeviceRecord('Hub', vid_pid='05e3:0610')
+        snapshot = DeviceSnapshot([twin, twin.replace()])
+        self.assertEqual(snapshot.keys(), ['Hub_05e3:0610', 'Hub_05e3:0610#2'])
+
+        changes = diff(snapshot, DeviceSnapshot([twin]))
+        self.assertEqual(changes.removed, ['Hub_05e3:0610#2'])
+        self.assertEqual((changes.added, changes.changed), ([], []))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SysfsUSBScanner 在伪造 sysfs 目录树上的测试"""
+
+import os
+import tempfile
+import unittest
+
+from src.core.sysfs_scanner import SysfsUSBScanner
+from tests.sysfs_fixture import FakeSysfs
+
+
+class SysfsUSBScannerTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.sysfs = FakeSysfs(self._tmp.name)
+        self.sysfs.add_device('usb1', idVendor='1d6b', idProduct='0002', busnum='1', devpath='0',
+                              speed='480', version=' 2.00', product='EHCI Host Controller')
+        self.sysfs.add_device('1-1', idVendor='05e3', idProduct='0610', busnum='1', devpath='1',
+                              speed='480', version=' 2.10', product='USB2.1 Hub',
+                              interfaces={'1.0': '09'})
+        self.sysfs.add_device('1-1.2', idVendor='046d', idProduct='c31c', busnum='1', devpath='1.2',
+                              speed='1.5', version=' 1.10', product='USB Keyboard',
+                              manufacturer='Logitech', interfaces={'1.0': '03', '1.1': '03'})
+        self.sysfs.add_device('1-1.4', idVendor='0781', idProduct='5581', busnum='1', devpath='1.4',
+                              speed='480', version=' 3.20', product='Ultra', manufacturer='SanDisk',
+                              serial='4C530001230101115263', interfaces={'1.0': '08'})
+        # 没有 idVendor 的目录（例如正在枚举的设备）应被跳过
+        self.sysfs.add_device('1-3', busnum='1', devpath='3')
+        self.scanner = SysfsUSBScanner(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def scan(self):
+        return {device.vid_pid: device for device in self.scanner.scan_devices()}
+
+    def test_skips_interfaces_and_incomplete_devices(self):
+        self.assertTrue(self.scanner.is_available())
+        self.assertEqual(set(self.scan()), {'1d6b:0002', '05e3:0610', '046d:c31c', '0781:5581'})
+
+    def test_mass_storage_interface_marks_storage(self):
+        devices = self.scan()
+        self.assertTrue(devices['0781:5581'].is_storage)
+        self.assertEqual(devices['0781:5581'].bus, 'USB Storage')
+        # HID 和集线器接口不是存储设备
+        self.assertFalse(devices['046d:c31c'].is_storage)
+        self.assertEqual(devices['046d:c31c'].bus, 'Bus 001')
+        self.assertFalse(devices['05e3:0610'].is_storage)
+
+    def test_port_path_and_bus_number(self):
+        keyboard = self.scan()['046d:c31c']
+        self.assertEqual(keyboard.busnum, 1)
+        self.assertEqual(keyboard.port_path, '1.2')
+        # 没有序列号时用端口位置区分同型号设备
+        self.assertEqual(keyboard.key, 'USB Keyboard_046d:c31c@1-1.2')
+
+    def test_attributes(self):
+        stick = self.scan()['0781:5581']
+        self.assertEqual(stick.name, 'Ultra')
+        self.assertEqual(stick.manufacturer, 'SanDisk')
+        self.assertEqual(stick.key, '4C530001230101115263')
+        self.assertEqual(stick.speed, '480 Mb/s')
+        self.assertEqual(stick.speed_mbps, 480.0)
+        self.assertTrue(stick.is_below_capability)
+        self.assertEqual(self.scan()['046d:c31c'].speed_mbps, 1.5)
+
+    def test_missing_sysfs(self):
+        scanner = SysfsUSBScanner(os.path.join(self._tmp.name, 'missing'))
+        self.assertFalse(scanner.is_available())
+        self.assertEqual(scanner.scan_devices(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""resumable_copy 的 .part 文件、断点续传与日志清理的测试"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from src.core.copy_engine import CopyEngine
+from src.core.transfer_journal import MIN_JOURNAL_SIZE, TransferJournal, part_path, resumable_copy
+
+CHUNK = 1024 * 1024
+
+
+class ResumableCopyTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        self.journal = TransferJournal(os.path.join(self.root, 'journal.sqlite3'))
+        self.engine = CopyEngine(CHUNK)
+        self.data = os.urandom(MIN_JOURNAL_SIZE + 3 * CHUNK)
+        self.source = os.path.join(self.root, 'source.bin')
+        with open(self.source, 'wb') as f:
+            f.write(self.data)
+        self.destination = os.path.join(self.root, 'dest.bin')
+
+    def tearDown(self):
+        self.journal.close()
+        self._tmp.cleanup()
+
+    def copy(self, cancel_after=None, known_offset=0):
+        """复制源文件；cancel_after 不为 None 时在复制到该位置后取消"""
+        cancel = threading.Event()
+        starts = []
+
+        def progress(position):
+            if cancel_after is not None and position >= cancel_after:
+                cancel.set()
+
+        result = resumable_copy(self.engine, self.source, self.destination, len(self.data), self.journal,
+                                known_offset, cancel, progress, starts.append)
+        return result, starts[0]
+
+    def read(self, path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_complete_copy_replaces_part_file(self):
+        result, start = self.copy()
+        self.assertFalse(result.cancelled)
+        self.assertEqual(start, 0)
+        self.assertEqual(self.read(self.destination), self.data)
+        self.assertFalse(os.path.exists(part_path(self.destination)))
+        self.assertEqual(self.journal.pending(), [])
+
+    def test_cancelled_copy_keeps_old_destination_and_resumes(self):
+        with open(self.destination, 'wb') as f:
+            f.write(b'old version')
+
+        result, _ = self.copy(cancel_after=4 * CHUNK)
+        self.assertTrue(result.cancelled)
+        # 目标位置上的旧文件在复制完成前保持不变
+        self.assertEqual(self.read(self.destination), b'old version')
+        self.assertTrue(os.path.exists(part_path(self.destination)))
+        [(destination, source, offset, size)] = self.journal.pending()
+        self.assertEqual((destination, source, offset, size),
+                         (self.destination, self.source, result.copied, len(self.data)))
+
+        result, start = self.copy()
+        self.assertEqual(start, offset)
+        self.assertFalse(result.cancelled)
+        self.assertEqual(self.read(self.destination), self.data)
+        self.assertFalse(os.path.exists(part_path(self.destination)))
+        self.assertEqual(self.journal.pending(), [])
+
+    def test_corrupted_part_file_restarts(self):
+        result, _ = self.copy(cancel_after=4 * CHUNK)
+        with open(part_path(self.destination), 'r+b') as f:
+            f.seek(result.copied - 10)
+            f.write(b'garbage!!!')
+
+        result, start = self.copy()
+        self.assertEqual(start, 0)
+        self.assertEqual(self.read(self.destination), self.data)
+
+    def test_recover_keeps_resumable_part_files(self):
+        self.copy(cancel_after=4 * CHUNK)
+        self.assertEqual(self.journal.recover(), 0)
+        self.assertEqual(len(self.journal.pending()), 1)
+        self.assertTrue(os.path.exists(part_path(self.destination)))
+
+    def test_recover_removes_stale_part_files(self):
+        self.copy(cancel_after=4 * CHUNK)
+        # 源文件被修改后无法续传
+        with open(self.source, 'ab') as f:
+            f.write(b'appended')
+        self.assertEqual(self.journal.recover(), 1)
+        self.assertEqual(self.journal.pending(), [])
+        self.assertFalse(os.path.exists(part_path(self.destination)))
+
+    def test_recover_drops_records_without_part_file(self):
+        self.copy(cancel_after=4 * CHUNK)
+        os.remove(part_path(self.destination))
+        self.assertEqual(self.journal.recover(), 1)
+        self.assertEqual(self.journal.pending(), [])
+
+    def test_recover_keeps_records_for_missing_volume(self):
+        self.copy(cancel_after=4 * CHUNK)
+        # 记录指向一个当前不存在的目录（U 盘未插入）
+        missing = os.path.join(self.root, 'unplugged', 'dest.bin')
+        with self.journal._lock:
+            self.journal._conn.execute('UPDATE transfers SET destination = ?', (missing,))
+            self.journal._conn.commit()
+        self.assertEqual(self.journal.recover(), 0)
+        self.assertEqual(len(self.journal.pending()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
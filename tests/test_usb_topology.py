@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""UsbTopology 降速原因判断的测试"""
+
+import tempfile
+import unittest
+
+from src.core.usb_topology import UsbTopology
+from tests.sysfs_fixture import FakeSysfs
+
+XHCI = '0000:00:14.0'
+EHCI = '0000:00:1d.0'
+
+
+class UsbTopologyTest(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        sysfs = FakeSysfs(self._tmp.name)
+
+        def root_hub(bus, speed, version, controller=XHCI):
+            sysfs.add_device(f'usb{bus}', controller=controller, idVendor='1d6b',
+                             idProduct='0003' if speed == '5000' else '0002', busnum=str(bus), devpath='0',
+                             speed=speed, version=version, bDeviceClass='09', maxchild='4')
+
+        def hub(name, speed, version, product):
+            bus, devpath = name.split('-')
+            sysfs.add_device(name, idVendor='05e3', idProduct='0620' if speed == '5000' else '0610',
+                             busnum=bus, devpath=devpath, speed=speed, version=version,
+                             bDeviceClass='09', maxchild='4', product=product)
+
+        def stick(name, speed='480'):
+            bus, devpath = name.split('-')
+            sysfs.add_device(name, idVendor='0781', idProduct='5581', busnum=bus, devpath=devpath, speed=speed,
+                             version=' 3.20', bDeviceClass='00', maxchild='0', product='Ultra',
+                             interfaces={'1.0': '08'})
+
+        # xHCI 控制器: USB 2 根总线 1 与 USB 3 根总线 2
+        root_hub(1, '480', ' 2.00')
+        root_hub(2, '5000', ' 3.00')
+        # USB 3 集线器: 在两条根总线上都出现，端口路径相同
+        hub('1-2', '480', ' 2.10', 'USB3.0 Hub')
+        hub('2-2', '5000', ' 3.10', 'USB3.0 Hub')
+        stick('1-2.1')
+        stick('2-2.3', speed='5000')
+        # 纯 USB 2 集线器
+        hub('1-3', '480', ' 2.00', 'USB2.0 Hub')
+        stick('1-3.1')
+        # 直接插在主机端口上
+        stick('1-4')
+        # 只有 USB 2 的控制器
+        root_hub(3, '480', ' 2.00', controller=EHCI)
+        stick('3-1')
+
+        self.topology = UsbTopology.from_sysfs(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def reason(self, name: str) -> str:
+        return self.topology.limit_reason(self.topology.nodes[name])
+
+    def test_degraded_devices(self):
+        names = sorted(node.name for node in self.topology.degraded_devices())
+        self.assertEqual(names, ['1-2.1', '1-3.1', '1-4', '3-1'])
+
+    def test_usb3_hub_companion_is_not_blamed(self):
+        hub = self.topology.nodes['1-2']
+        self.assertTrue(self.topology.has_superspeed_peer(hub))
+        reason = self.reason('1-2.1')
+        self.assertIn('USB 3 集线器', reason)
+        self.assertIn('线缆', reason)
+
+    def test_usb2_hub_is_blamed(self):
+        self.assertFalse(self.topology.has_superspeed_peer(self.topology.nodes['1-3']))
+        self.assertEqual(self.reason('1-3.1'), '经由 USB 2 集线器 USB2.0 Hub (1-3) 连接')
+
+    def test_direct_port(self):
+        self.assertIn('接口支持 USB 3', self.reason('1-4'))
+
+    def test_usb2_only_controller(self):
+        self.assertEqual(self.reason('3-1'), '主机 USB 控制器仅支持 USB 2')
+
+    def test_by_root_hub(self):
+        groups = self.topology.by_root_hub()
+        self.assertEqual({name: sorted(node.name for node in devices) for name, (_, devices) in groups.items()},
+                         {'usb1': ['1-2', '1-2.1', '1-3', '1-3.1', '1-4'],
+                          'usb2': ['2-2', '2-2.3'],
+                          'usb3': ['3-1']})
+        self.assertEqual(groups['usb2'][0].speed_mbps, 5000)
+        # USB 3 集线器的两半分属同一控制器的两条根总线
+        self.assertEqual(groups['usb1'][0].controller, groups['usb2'][0].controller)
+        self.assertNotEqual(groups['usb1'][0].controller, groups['usb3'][0].controller)
+
+    def test_summary(self):
+        self.assertEqual(self.topology.summary().splitlines(),
+                         ['usb1 (480 Mb/s): 5 个设备，3 个降速运行',
+                          'usb2 (5 Gb/s): 2 个设备',
+                          'usb3 (480 Mb/s): 1 个设备，1 个降速运行'])
+
+
+if __name__ == '__main__':
+    unittest.main()
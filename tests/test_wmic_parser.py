@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""WMIC CSV 解析与设备合并的测试"""
+
+import unittest
+
+from src.core.wmic_parser import DeviceMerger, PNP_COLUMNS, STORAGE_COLUMNS, iter_wmic_csv
+
+DISK_CSV = (
+    '\ufeffNode,Caption,InterfaceType,Manufacturer,PNPDeviceID,SerialNumber\r\n'
+    '\r\n'
+    'PC,SanDisk "Ultra" USB Device,USB,(Standard disk drives),USBSTOR\\DISK&VEN_SANDISK\\4C530001,4C530001\r\n'
+    'PC,Samsung SSD 970,SCSI,(Standard disk drives),SCSI\\DISK&VEN_NVME\\5&1,S4EWNX0\r\n'
+)
+
+
+class WmicCsvTest(unittest.TestCase):
+
+    def test_quotes_are_kept(self):
+        rows = list(iter_wmic_csv(DISK_CSV, STORAGE_COLUMNS))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['Caption'], 'SanDisk "Ultra" USB Device')
+        self.assertEqual(rows[0]['SerialNumber'], '4C530001')
+
+    def test_column_order_and_missing_columns(self):
+        output = 'Node,DeviceID,Name\nPC,USB\\VID_046D&PID_C52B\\5&2,"Receiver"\n'
+        rows = list(iter_wmic_csv(output, PNP_COLUMNS))
+        self.assertEqual(rows, [{'Name': '"Receiver"', 'Manufacturer': '',
+                                 'DeviceID': 'USB\\VID_046D&PID_C52B\\5&2'}])
+
+    def test_extra_commas_go_to_last_column(self):
+        output = 'Node,Name,DeviceID\nPC,Hub,USB\\ROOT,EXTRA\n'
+        rows = list(iter_wmic_csv(output, ['Name', 'DeviceID']))
+        self.assertEqual(rows, [{'Name': 'Hub', 'DeviceID': 'USB\\ROOT,EXTRA'}])
+
+    def test_empty_output(self):
+        self.assertEqual(list(iter_wmic_csv('', STORAGE_COLUMNS)), [])
+        self.assertEqual(list(iter_wmic_csv('\r\n\r\n', STORAGE_COLUMNS)), [])
+
+
+class DeviceMergerTest(unittest.TestCase):
+
+    def test_storage_rows(self):
+        merger = DeviceMerger()
+        merger.add_storage_rows(iter_wmic_csv(DISK_CSV, STORAGE_COLUMNS))
+        self.assertEqual(len(merger), 1)
+        device = merger.devices[0]
+        self.assertEqual((device.name, device.manufacturer, device.serial, device.speed),
+                         ('SanDisk "Ultra" USB Device', 'Generic', '4C530001', 'USB 3.0'))
+
+
+if __name__ == '__main__':
+    unittest.main()